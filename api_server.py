@@ -3,22 +3,43 @@ FastAPI server to bridge the React frontend with OmniMind backend.
 Provides REST API endpoints for the holographic UI to interact with the AI.
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 import json
+import re
+import time
 import asyncio
 from typing import Optional
 import os
 
-from brain.ollama_interface import OllamaInterface
+from brain import llm_metrics
+from brain.llm_scheduler import INTERACTIVE
+from brain.model_router import model_router
+from brain.ollama_interface import context_length, estimate_tokens
 from system_monitor import SystemMonitor
+from telemetry_hub import TelemetryHub, clamp_interval
 from skills_manager import skills_manager
-from skills.real_time_search import search_anything, get_current_news
-from skills.enhanced_news import get_detailed_news, get_breaking_news
-from skills.conversation_enhancer import ConversationEnhancer, get_smart_suggestions
-from skills.multi_engine_search import search_web_multi_engine
-from skills.memory_enhancer import get_memory_context, save_memory_markers
+from intent_matcher import IntentMatcher
+from brain.intent_classifier import classify
+from skills.registry import skill_registry
+from utils.config import get as config_get
+from utils.metrics import metrics, track
+from utils.tracing import annotate, bind, span, tracer
+
+# Skill modules are imported on first use, not at startup
+search_anything = skill_registry.lazy("skills.real_time_search:search_anything")
+get_current_news = skill_registry.lazy("skills.real_time_search:get_current_news")
+get_detailed_news = skill_registry.lazy("skills.enhanced_news:get_detailed_news")
+get_breaking_news = skill_registry.lazy("skills.enhanced_news:get_breaking_news")
+ConversationEnhancer = skill_registry.lazy("skills.conversation_enhancer:ConversationEnhancer")
+get_smart_suggestions = skill_registry.lazy("skills.conversation_enhancer:get_smart_suggestions")
+search_web_multi_engine = skill_registry.lazy("skills.multi_engine_search:search_web_multi_engine")
+get_memory_context = skill_registry.lazy("skills.memory_enhancer:get_memory_context")
+save_memory_markers = skill_registry.lazy("skills.memory_enhancer:save_memory_markers")
+direct_link_status = skill_registry.lazy("skills.media_player:direct_link_status")
+lookup_offline = skill_registry.lazy("skills.offline_wiki:lookup_offline")
 
 app = FastAPI(title="OmniMind API")
 
@@ -34,17 +55,206 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize AI with available model
-ollama = OllamaInterface(model="qwen2.5:3b")
+http_seconds = metrics.histogram("http_request_duration_seconds", "API request latency by route template")
+http_requests = metrics.counter("http_requests_total", "API requests by route template and status")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template (/api/status/history), not raw path, to keep series bounded
+        route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+        http_seconds.observe(time.perf_counter() - start, method=request.method, route=route)
+        http_requests.inc(method=request.method, route=route, status=status)
+
+# AI calls go through the model router, which picks a model per request class
 
 # Initialize conversation enhancer (after MEMORY_DIR is defined)
 # conv_enhancer will be initialized in the chat function
 
-MEMORY_DIR = os.path.join(os.path.dirname(__file__), 'memory')
+MEMORY_DIR = config_get('memory_dir') or os.path.join(os.path.dirname(__file__), 'memory')
 PROFILE_PATH = os.path.join(MEMORY_DIR, 'user_profile.json')
 CONV_PATH = os.path.join(MEMORY_DIR, 'conversations.json')
 
 
+# Memory store (conversations.json, user_profile.json) I/O, timed for /metrics
+store_seconds = metrics.histogram("memory_store_seconds", "Memory store file reads and writes")
+store_bytes = metrics.counter("memory_store_bytes_total", "Bytes read from and written to the memory store")
+
+
+def load_store(path: str):
+    """Parsed JSON of a memory file; raises like open()/json.load()"""
+    labels = {"op": "read", "store": os.path.basename(path)}
+    with track(store_seconds, **labels), span("store.read", store=labels["store"]):
+        with open(path, 'rb') as f:
+            raw = f.read()
+    store_bytes.inc(len(raw), **labels)
+    return json.loads(raw.decode('utf-8'))
+
+
+def save_store(path: str, data):
+    labels = {"op": "write", "store": os.path.basename(path)}
+    with span("store.write", store=labels["store"]):
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        with track(store_seconds, **labels):
+            with open(path, 'wb') as f:
+                f.write(raw)
+    store_bytes.inc(len(raw), **labels)
+
+
+# Text-to-speech runs in daemon threads; the gauge shows how many are still speaking
+tts_queue_depth = metrics.gauge("tts_queue_depth", "Responses being spoken or waiting for the TTS engine")
+tts_seconds = metrics.histogram("tts_speak_seconds", "Time to speak one response")
+
+
+def speak_in_background(text: str, female_voice: bool = False) -> int:
+    """Speak `text` with pyttsx3 in a daemon thread; returns the estimated duration in ms"""
+    duration_ms = int((len(text.split()) / 2.9) * 1000)  # ~2.9 words per second
+    if config_get('tts_enabled') is False:
+        return duration_ms  # Muted (config.json "tts_enabled": false), e.g. while benchmarking
+    try:
+        import pyttsx3
+        import threading
+    except Exception as e:
+        print(f"TTS initialization failed: {e}")
+        return 3000  # Default 3 seconds
+
+    def speak_response():
+        try:
+            with track(tts_seconds):
+                engine = pyttsx3.init()
+                engine.setProperty('rate', 175)
+                if female_voice:
+                    engine.setProperty('volume', 1.0)
+                    voices = engine.getProperty('voices')
+                    if len(voices) > 1:
+                        engine.setProperty('voice', voices[1].id)
+                engine.say(text)
+                engine.runAndWait()
+                engine.stop()
+        except Exception as e:
+            print(f"TTS Error: {e}")
+        finally:
+            tts_queue_depth.dec()
+
+    with span("tts.spawn"):
+        tts_queue_depth.inc()
+        threading.Thread(target=speak_response, daemon=True).start()
+    return duration_ms
+
+
+# Routing cues for /api/chat, compiled once and checked in a single pass per message
+chat_intents = IntentMatcher()
+chat_intents.add("news", ["news", "headlines", "current events", "latest news"])
+chat_intents.add("ai", ["ai", "artificial intelligence"])
+chat_intents.add("detailed", ["detailed", "summary", "analyze"])
+chat_intents.add("breaking", ["breaking", "urgent"])
+chat_intents.add("india", ["india"])
+chat_intents.add("world", ["world"])
+chat_intents.add("knowledge", patterns=[r"^(?:what is|who is|define|explain|tell me about|describe)\s"])
+chat_intents.add("search", ["search"], patterns=[r"^(?:search for|find|look up|google)\s"])
+chat_intents.compile()
+
+KNOWLEDGE_PREFIX = re.compile(r"^(?:what is|who is|define|explain|tell me about|describe)\s+(?:(?:a|an|the)\s+)?")
+
+
+def knowledge_topic(text: str) -> str:
+    """Topic of a knowledge question: 'what is the Eiffel Tower?' -> 'eiffel tower'"""
+    return KNOWLEDGE_PREFIX.sub("", text.lower().strip()).strip(" ?.!")
+
+
+# Identical bytes on every turn so Ollama can reuse its cached prefix; per-turn
+# data goes in later messages, never in here. Only the profile summary varies,
+# and it changes when the profile is re-summarized, not per message.
+CHAT_SYSTEM_PROMPT = (
+    "You are OmniMind — an advanced AI assistant with exceptional memory and contextual understanding. "
+    "You are running locally on the user's device for complete privacy. "
+    "\n\nCORE MEMORY ABILITIES:\n"
+    "- ALWAYS remember and reference previous messages in our conversation\n"
+    "- Build upon topics we've discussed before\n"
+    "- Notice patterns in the user's questions and interests\n"
+    "- Maintain conversation continuity across multiple exchanges\n"
+    "- Connect current questions to previous context when relevant\n\n"
+    "Your enhanced capabilities:\n"
+    "- Contextual conversations that flow naturally\n"
+    "- Deep understanding of user's communication style\n"
+    "- Ability to recall and reference earlier topics\n"
+    "- Intelligent follow-up questions based on conversation history\n"
+    "- Adaptive responses based on user's demonstrated interests\n\n"
+    "User profile & preferences: {user_summary}\n"
+    "CONVERSATION GUIDELINES:\n"
+    "- Always check if current question relates to previous messages\n"
+    "- Reference earlier topics when they're relevant\n"
+    "- Build upon the conversation thread naturally\n"
+    "- Show that you remember what we've discussed\n"
+    "- Ask clarifying questions that show contextual understanding\n"
+    "- If a message continues a previous topic, acknowledge that connection"
+)
+
+HISTORY_WINDOW = 10  # Exchanges; the window start only moves every HISTORY_WINDOW turns
+CHAT_REPLY_TOKENS = 600  # Longer responses for detailed context
+
+
+def exchange_messages(h: dict) -> list:
+    if h.get('user') and h.get('assistant'):
+        return [{"role": "user", "content": h['user']}, {"role": "assistant", "content": h['assistant']}]
+    return []
+
+
+def history_window(history: list, size: int = HISTORY_WINDOW, budget: Optional[float] = None) -> list:
+    """
+    The last `size` to `2*size - 1` exchanges, starting at a multiple of `size`.
+    A plain last-N window drops the oldest exchange every turn, which changes
+    the prompt right after the system message and defeats the prefix cache;
+    this window keeps the same start for `size` turns at a time.
+
+    If the window is over `budget` (estimated tokens), whole blocks of `size`
+    are dropped from the front, then single exchanges: Ollama would otherwise
+    truncate the front of the prompt, system message first.
+    """
+    start = max(0, (len(history) - size) // size * size)
+    if budget is not None:
+        costs = [estimate_tokens(exchange_messages(h)) for h in history[start:]]
+        total = sum(costs)
+        dropped = 0
+        while total > budget and dropped < len(costs):
+            step = size if len(costs) - dropped > size else 1
+            total -= sum(costs[dropped:dropped + step])
+            dropped += step
+        start += dropped
+    return history[start:]
+
+
+def chat_messages(user_summary: str, history: list, message: str, budget: Optional[float] = None) -> list:
+    """
+    System prompt, past exchanges as real turns, then the new message (for
+    /api/chat); `budget` is the prompt's token allowance, if any.
+    """
+    system = {"role": "system", "content": CHAT_SYSTEM_PROMPT.format(user_summary=user_summary)}
+    current = {"role": "user", "content": message}
+    if budget is not None:
+        budget -= estimate_tokens([system, current])
+    messages = [system]
+    for h in history_window(history, budget=budget):
+        messages.extend(exchange_messages(h))
+    messages.append(current)
+    return messages
+
+
+async def off_loop(fn, *args, **kwargs):
+    """
+    Run a blocking call (LLM, news, web search) on a worker thread so one slow
+    chat doesn't stall the others; the scheduler then decides who waits.
+    """
+    return await asyncio.to_thread(bind(fn), *args, **kwargs)
+
+
 class ChatMessage(BaseModel):
     message: str
     context: Optional[str] = None
@@ -58,14 +268,25 @@ class SystemStatus(BaseModel):
     connection: str
 
 
+def start_background_services():
+    """Start samplers that keep status data warm between requests"""
+    system_monitor.processes.start(interval=2.0)
+    system_monitor.self_monitor.start_lag_probe()
+    model_router.warm_up()  # Load the chat model now so the first chat doesn't pay for it
+
+
+@app.on_event("startup")
+async def on_startup():
+    start_background_services()
+
+
 @app.get("/")
 async def root():
     return {"message": "OmniMind API is running", "version": "2.0"}
 
 
-@app.get("/api/status")
-async def get_status():
-    """Get current system status with real-time data"""
+def build_status() -> dict:
+    """Sample the system once and build the /api/status payload"""
     stats = system_monitor.get_all_stats()
     
     return {
@@ -78,12 +299,32 @@ async def get_status():
     }
 
 
+# Shared sampler for /api/status and /ws/telemetry
+telemetry_hub = TelemetryHub(build_status)
+
+
+@app.get("/api/status")
+async def get_status():
+    """Get current system status with real-time data"""
+    # Reuse the telemetry hub's latest sample when dashboards are already streaming
+    return await telemetry_hub.get_snapshot()
+
+
+@app.get("/api/status/history")
+async def get_status_history(metric: Optional[str] = None, start: Optional[float] = None,
+                             end: Optional[float] = None, resolution: Optional[int] = None):
+    """
+    Metric history by time range (unix seconds). Without `metric`, lists the
+    recorded metric names. `resolution` picks a tier (1, 60 or 3600 seconds).
+    """
+    return system_monitor.get_history(metric, start, end, resolution)
+
+
 @app.get("/api/profile")
 async def get_profile():
     """Get user profile"""
     try:
-        with open(PROFILE_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_store(PROFILE_PATH)
     except Exception:
         return {"preferences": {}, "summary": "No profile available"}
 
@@ -92,9 +333,8 @@ async def get_profile():
 async def get_conversations():
     """Get conversation history"""
     try:
-        with open(CONV_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get("history", [])[-20:]  # Last 20 messages
+        data = load_store(CONV_PATH)
+        return data.get("history", [])[-20:]  # Last 20 messages
     except Exception:
         return []
 
@@ -122,7 +362,11 @@ async def get_smart_greeting():
 @app.get("/api/skills")
 async def get_skills():
     """Get list of available skills"""
-    return {"skills": skills_manager.get_available_skills()}
+    return {
+        "skills": skills_manager.get_available_skills(),
+        "stats": skills_manager.get_execution_stats(),
+        "imports": skills_manager.get_import_stats()
+    }
 
 
 @app.post("/api/execute-skill")
@@ -132,64 +376,144 @@ async def execute_skill(request: dict):
     query = request.get("query", "")
     params = request.get("params", {})
     
-    result = skills_manager.execute_skill(skill_id, query, params)
+    result = await skills_manager.execute_skill_async(skill_id, query, params)
     return result
 
 
+@app.get("/api/models")
+async def get_models():
+    """Model routes, residency and the latency the router has observed per model"""
+    return model_router.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """All subsystem metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/metrics/llm")
+async def get_llm_metrics(raw: bool = False):
+    """Per-call Ollama timings by model and caller; ?raw=true for the full histograms"""
+    if raw:
+        return metrics.snapshot("llm_")
+    return llm_metrics.summary()
+
+
+@app.get("/api/traces")
+async def get_traces(limit: int = 20):
+    """Most recent sampled /api/chat traces (newest first), as written to the trace file"""
+    return {"stats": tracer.stats(), "traces": tracer.recent(max(1, min(limit, 200)))}
+
+
+@app.get("/api/media/direct")
+async def get_media_direct_link(q: str):
+    """Top YouTube result for a play_music query, once the background lookup has finished"""
+    return direct_link_status(q)
+
+
 @app.post("/api/chat")
-async def chat(message: ChatMessage):
-    """Send a message to OmniMind and get response"""
+async def chat(message: ChatMessage, debug: Optional[str] = None):
+    """Send a message to OmniMind and get response; ?debug=timing adds the stage timings"""
+    show_timing = debug == "timing"
+    with tracer.trace("chat", keep=show_timing) as root:
+        result = await handle_chat(message)
+        root.set(status=result.get("status"))
+    if show_timing:
+        result["timing"] = root.to_dict()
+    return result
+
+
+async def handle_chat(message: ChatMessage) -> dict:
+    """The /api/chat pipeline; each stage is a span in the request's trace"""
     try:
         # Ensure memory directory exists
         os.makedirs(MEMORY_DIR, exist_ok=True)
         
         # Check for specific query types
         msg_lower = message.message.lower().strip()
+        with span("route.intents"):
+            intents = chat_intents.intents(msg_lower)
+        
+        route = "chat"  # Stored with the turn; used as a training label by brain.intent_classifier
+        routed_by = "rules"  # The classifier never trains on its own guesses
         
         # Enhanced News queries with multi-engine search fallback
-        if any(word in msg_lower for word in ['news', 'headlines', 'current events', 'latest news']):
-            if 'ai' in msg_lower or 'artificial intelligence' in msg_lower:
-                # Use multi-engine search for AI news
-                response = search_web_multi_engine("latest AI artificial intelligence news")
-            elif 'detailed' in msg_lower or 'summary' in msg_lower or 'analyze' in msg_lower:
-                if 'india' in msg_lower:
-                    response = get_detailed_news("India", 5)
-                elif 'world' in msg_lower:
-                    response = get_detailed_news("world", 5)
+        if "news" in intents:
+            route = "news"
+            with span("news"):
+                if "ai" in intents:
+                    # Use multi-engine search for AI news
+                    response = await off_loop(search_web_multi_engine, "latest AI artificial intelligence news")
+                elif "detailed" in intents:
+                    if "india" in intents:
+                        response = await off_loop(get_detailed_news, "India", 5)
+                    elif "world" in intents:
+                        response = await off_loop(get_detailed_news, "world", 5)
+                    else:
+                        response = await off_loop(get_detailed_news, "latest", 5)
+                elif "breaking" in intents:
+                    response = await off_loop(get_breaking_news)
+                elif "india" in intents:
+                    response = await off_loop(get_detailed_news, "India", 3)
+                elif "world" in intents:
+                    response = await off_loop(get_detailed_news, "world", 3)
                 else:
-                    response = get_detailed_news("latest", 5)
-            elif 'breaking' in msg_lower or 'urgent' in msg_lower:
-                response = get_breaking_news()
-            elif 'india' in msg_lower:
-                response = get_detailed_news("India", 3)
-            elif 'world' in msg_lower:
-                response = get_detailed_news("world", 3)
-            else:
-                # Fallback to multi-engine search for general news
-                try:
-                    response = get_detailed_news("latest", 3)
-                    if "Unable to fetch" in response or "temporarily unavailable" in response:
-                        response = search_web_multi_engine("latest news today")
-                except:
-                    response = search_web_multi_engine("latest news today")
+                    # Fallback to multi-engine search for general news
+                    try:
+                        response = await off_loop(get_detailed_news, "latest", 3)
+                        if "Unable to fetch" in response or "temporarily unavailable" in response:
+                            response = await off_loop(search_web_multi_engine, "latest news today")
+                    except:
+                        response = await off_loop(search_web_multi_engine, "latest news today")
         
-        # Let AI handle knowledge questions directly - no Wikipedia routing
-        elif msg_lower.startswith(('what is ', 'who is ', 'define ', 'explain ', 'tell me about ', 'describe ')):
-            # Skip to AI response - don't route to Wikipedia
-            pass
+        # Knowledge questions: answer from the offline abstracts index when it names
+        # a page exactly; otherwise let the AI handle them (no live Wikipedia routing)
+        elif "knowledge" in intents:
+            with span("knowledge.lookup"):
+                page = lookup_offline(knowledge_topic(msg_lower), exact_only=True)
+            if page:
+                route = "knowledge"
+                response = f"📖 {page['title']}:\n\n{page['extract']}"
         
-        # Multi-engine web search for explicit search requests
-        elif any(msg_lower.startswith(word) for word in ['search for ', 'find ', 'look up ', 'google ']) or 'search' in msg_lower:
+        # Multi-engine web search for explicit search requests ("find X in my files"
+        # is a local file search; it falls through to the skill path below)
+        elif "search" in intents and skills_manager.detect_skill(message.message) != "search_files":
+            route = "search"
             # Use multi-engine search for better results
             search_query = message.message.replace('search for ', '').replace('find ', '').replace('look up ', '').replace('google ', '').strip()
-            response = search_web_multi_engine(search_query)
+            with span("search"):
+                response = await off_loop(search_web_multi_engine, search_query)
         else:
             # Check if message is a skill command
-            detected_skill = skills_manager.detect_skill(message.message)
+            with span("route.skill_rules"):
+                detected_skill = skills_manager.detect_skill(message.message)
+            
+            if not detected_skill:
+                # Rules found nothing; ask the on-device classifier before falling through to the LLM
+                with span("route.classifier") as classifier_span:
+                    predicted = classify(message.message)
+                    if classifier_span is not None:
+                        classifier_span.set(predicted=predicted)
+                # A learned guess alone may only run skills without side effects
+                if predicted in skills_manager.available_skills and \
+                        not skills_manager.available_skills[predicted]["side_effects"]:
+                    detected_skill = predicted
+                    routed_by = "classifier"
+                elif predicted == "news":
+                    route, routed_by = "news", "classifier"
+                    with span("news"):
+                        response = await off_loop(get_detailed_news, "latest", 3)
+                elif predicted == "search":
+                    route, routed_by = "search", "classifier"
+                    with span("search"):
+                        response = await off_loop(search_web_multi_engine, message.message)
             
             if detected_skill:
                 # Execute skill
-                skill_result = skills_manager.execute_skill(detected_skill, message.message)
+                annotate(route="skill")
+                with span("skill", skill=detected_skill):
+                    skill_result = await skills_manager.execute_skill_async(detected_skill, message.message)
                 
                 if skill_result["success"]:
                     response = f"✓ {skill_result['skill']}: {skill_result['result']}"
@@ -198,8 +522,7 @@ async def chat(message: ChatMessage):
                 
                 # Save to conversation history
                 try:
-                    with open(CONV_PATH, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = load_store(CONV_PATH)
                 except Exception:
                     data = {"history": []}
                 
@@ -208,34 +531,14 @@ async def chat(message: ChatMessage):
                     "timestamp": time.time(),
                     "user": message.message,
                     "assistant": response,
-                    "skill_executed": detected_skill
+                    "skill_executed": detected_skill,
+                    "routed_by": routed_by
                 })
                 
-                with open(CONV_PATH, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                save_store(CONV_PATH, data)
                 
                 # Add TTS for skill responses
-                try:
-                    import pyttsx3
-                    import threading
-                    
-                    def speak_response():
-                        try:
-                            engine = pyttsx3.init()
-                            engine.setProperty('rate', 175)
-                            engine.say(response)
-                            engine.runAndWait()
-                            engine.stop()
-                        except:
-                            pass
-                    
-                    threading.Thread(target=speak_response, daemon=True).start()
-                    
-                    words = len(response.split())
-                    speech_duration = (words / 2.9) * 1000
-                    
-                except:
-                    speech_duration = 3000
+                speech_duration = speak_in_background(response)
                 
                 return {
                     "response": response, 
@@ -245,11 +548,11 @@ async def chat(message: ChatMessage):
                     "speech_duration": int(speech_duration)
                 }
         
+        annotate(route=route)
         if 'response' in locals():
             # Save search/news response to conversation history
             try:
-                with open(CONV_PATH, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = load_store(CONV_PATH)
             except Exception:
                 data = {"history": []}
             
@@ -258,34 +561,14 @@ async def chat(message: ChatMessage):
                 "timestamp": time.time(),
                 "user": message.message,
                 "assistant": response,
+                "route": route,
+                "routed_by": routed_by
             })
             
-            with open(CONV_PATH, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            save_store(CONV_PATH, data)
             
             # Add TTS for search/news responses too
-            try:
-                import pyttsx3
-                import threading
-                
-                def speak_response():
-                    try:
-                        engine = pyttsx3.init()
-                        engine.setProperty('rate', 175)
-                        engine.say(response)
-                        engine.runAndWait()
-                        engine.stop()
-                    except:
-                        pass
-                
-                threading.Thread(target=speak_response, daemon=True).start()
-                
-                # Estimate speech duration
-                words = len(response.split())
-                speech_duration = (words / 2.9) * 1000
-                
-            except:
-                speech_duration = 3000
+            speech_duration = speak_in_background(response)
             
             return {
                 "response": response, 
@@ -296,125 +579,65 @@ async def chat(message: ChatMessage):
         
         # Load user summary
         try:
-            with open(PROFILE_PATH, 'r', encoding='utf-8') as f:
-                profile = json.load(f)
-                user_summary = profile.get('summary', 'No user summary available.')
+            profile = load_store(PROFILE_PATH)
+            user_summary = profile.get('summary', 'No user summary available.')
         except Exception:
             user_summary = 'No user summary available.'
 
         # Load conversation history for enhanced context
         try:
-            with open(CONV_PATH, 'r', encoding='utf-8') as f:
-                conv_data = json.load(f)
-                recent_history = conv_data.get("history", [])[-10:]  # Last 10 exchanges for better context
+            conv_data = load_store(CONV_PATH)
+            history = conv_data.get("history", [])
         except Exception:
-            recent_history = []
-        
-        # Build comprehensive context from recent conversation
-        context = ""
-        if recent_history:
-            context = "\n\nConversation Memory (maintain continuity and reference previous topics):\n"
-            for i, h in enumerate(recent_history, 1):
-                user_msg = h.get('user', '')
-                assistant_msg = h.get('assistant', '')
-                context += f"[{i}] User: {user_msg}\n[{i}] Assistant: {assistant_msg}\n\n"
-            
-            # Add memory instructions
-            context += "\nIMPORTANT: Reference previous messages when relevant. Build upon the conversation naturally."
-        
-        system_prompt = (
-            "You are OmniMind — an advanced AI assistant with exceptional memory and contextual understanding. "
-            "You are running locally on the user's device for complete privacy. "
-            "\n\nCORE MEMORY ABILITIES:\n"
-            "- ALWAYS remember and reference previous messages in our conversation\n"
-            "- Build upon topics we've discussed before\n"
-            "- Notice patterns in the user's questions and interests\n"
-            "- Maintain conversation continuity across multiple exchanges\n"
-            "- Connect current questions to previous context when relevant\n\n"
-            "Your enhanced capabilities:\n"
-            "- Contextual conversations that flow naturally\n"
-            "- Deep understanding of user's communication style\n"
-            "- Ability to recall and reference earlier topics\n"
-            "- Intelligent follow-up questions based on conversation history\n"
-            "- Adaptive responses based on user's demonstrated interests\n\n"
-            f"User profile & preferences: {user_summary}\n"
-            "CONVERSATION GUIDELINES:\n"
-            "- Always check if current question relates to previous messages\n"
-            "- Reference earlier topics when they're relevant\n"
-            "- Build upon the conversation thread naturally\n"
-            "- Show that you remember what we've discussed\n"
-            "- Ask clarifying questions that show contextual understanding\n"
-            f"{context}"
-        )
-
-        # Enhanced user prompt with strong memory emphasis
-        user_prompt = f"Current user message: {message.message}\n\nIMPORTANT MEMORY INSTRUCTIONS:\n- Review our conversation history above\n- Reference previous topics if this message relates to them\n- Show that you remember what we've discussed\n- Build upon earlier exchanges naturally\n- If this continues a previous topic, acknowledge that connection\n\nProvide a contextually aware, engaging response that demonstrates your memory of our conversation."
-        
-        # Get AI response with better parameters
-        response = ollama.generate(
-            system_prompt, 
-            user_prompt,
+            history = []
+
+        # Past exchanges go in as real turns after a byte-stable system prompt, so
+        # each turn only appends to what Ollama already has cached
+        with span("prompt.build", history=len(history)):
+            # Token counts are estimates (chars / 4), so keep a tenth of the context spare
+            messages = chat_messages(user_summary, history, message.message,
+                                     budget=context_length() * 0.9 - CHAT_REPLY_TOKENS)
+
+        # Get AI response with better parameters, from the cheapest model suited to this message
+        response = await off_loop(
+            model_router.chat,
+            model_router.classify_request(message.message),
+            messages,
             temperature=0.6,  # Balanced creativity with consistency
-            max_tokens=600    # Longer responses for detailed context
+            max_tokens=CHAT_REPLY_TOKENS,
+            priority=INTERACTIVE,
+            caller="chat"
         )
         
         # Check if response contains error
         if response.startswith("[Error]"):
             return {"response": response, "status": "error"}
         
-        # Initialize conversation enhancer
-        conv_enhancer = ConversationEnhancer(MEMORY_DIR)
-        
-        # Enhance response with personality and context
-        response = conv_enhancer.enhance_response(response, message.message)
-        
+        with span("enhance"):
+            # Initialize conversation enhancer
+            conv_enhancer = ConversationEnhancer(MEMORY_DIR)
+
+            # Enhance response with personality and context
+            response = conv_enhancer.enhance_response(response, message.message)
+
         # Generate smart suggestions
-        suggestions = get_smart_suggestions(message.message)
-        
+        with span("suggestions"):
+            suggestions = get_smart_suggestions(message.message)
+
         # Update user preferences based on interaction
-        conv_enhancer.update_user_preferences(message.message, response)
-        
+        with span("preferences"):
+            conv_enhancer.update_user_preferences(message.message, response)
+
         # Save advanced memory markers
-        save_memory_markers(MEMORY_DIR, message.message, response)
+        with span("memory_markers"):
+            save_memory_markers(MEMORY_DIR, message.message, response)
 
         # Add TTS functionality
-        try:
-            import pyttsx3
-            import threading
-            
-            def speak_response():
-                try:
-                    engine = pyttsx3.init()
-                    engine.setProperty('rate', 175)
-                    engine.setProperty('volume', 1.0)
-                    
-                    # Get available voices
-                    voices = engine.getProperty('voices')
-                    if len(voices) > 1:
-                        engine.setProperty('voice', voices[1].id)  # Female voice
-                    
-                    engine.say(response)
-                    engine.runAndWait()
-                    engine.stop()
-                except Exception as e:
-                    print(f"TTS Error: {e}")
-            
-            # Start TTS in background thread
-            tts_thread = threading.Thread(target=speak_response, daemon=True)
-            tts_thread.start()
-            
-            # Estimate speech duration
-            words = len(response.split())
-            speech_duration = (words / 2.9) * 1000  # ~2.9 words per second
-            
-        except Exception as e:
-            print(f"TTS initialization failed: {e}")
-            speech_duration = 3000  # Default 3 seconds
+        speech_duration = speak_in_background(response, female_voice=True)
 
         # Save to conversation history
         try:
-            with open(CONV_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_store(CONV_PATH)
         except Exception:
             data = {"history": []}
         
@@ -423,10 +646,13 @@ async def chat(message: ChatMessage):
             "timestamp": time.time(),
             "user": message.message,
             "assistant": response,
+            "route": "chat"
         })
         
-        with open(CONV_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        save_store(CONV_PATH, data)
+
+        with span("conversation_context"):
+            conversation_context = conv_enhancer.analyze_conversation_patterns()
 
         return {
             "response": response, 
@@ -435,7 +661,7 @@ async def chat(message: ChatMessage):
             "speech_duration": int(speech_duration),
             "hologram_sync": True,
             "suggestions": suggestions,
-            "conversation_context": conv_enhancer.analyze_conversation_patterns()
+            "conversation_context": conversation_context
         }
     
     except Exception as e:
@@ -459,6 +685,43 @@ async def websocket_voice(websocket: WebSocket):
         print("WebSocket disconnected")
 
 
+@app.websocket("/ws/telemetry")
+async def websocket_telemetry(websocket: WebSocket):
+    """
+    Push live system telemetry. The first message is a full snapshot, later
+    messages only carry changed fields. Clients pick their rate with
+    ?interval=<seconds> or by sending {"interval": <seconds>} at any time.
+    """
+    await websocket.accept()
+    sub = telemetry_hub.subscribe(clamp_interval(websocket.query_params.get("interval")))
+
+    async def send(message: dict):
+        await websocket.send_text(json.dumps(message))
+
+    async def receive_control():
+        while True:
+            data = await websocket.receive_text()
+            try:
+                request = json.loads(data)
+            except ValueError:
+                continue
+            if isinstance(request, dict) and "interval" in request:
+                sub.interval = clamp_interval(request["interval"], sub.interval)
+
+    tasks = [
+        asyncio.create_task(telemetry_hub.stream(sub, send)),
+        asyncio.create_task(receive_control()),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.exception()  # Disconnects surface here; nothing else to do
+    finally:
+        for task in tasks:
+            task.cancel()
+        telemetry_hub.unsubscribe(sub)
+
+
 if __name__ == "__main__":
     import uvicorn
     print("Starting OmniMind API Server...")
@@ -0,0 +1 @@
+# Package marker for the benchmark harness (python -m benchmarks.run)
@@ -0,0 +1,269 @@
+"""
+Local stand-ins for the services OmniMind calls, for reproducible benchmarks.
+
+Each fake listens on 127.0.0.1 on a free port and answers from a daemon
+thread with deterministic content:
+
+- FakeOllama: /api/tags, /api/ps, /api/generate and /api/chat. Latency is
+  modelled from token counts (chars / 4): a one-off load per model, prefill
+  per uncached prompt token (a common prefix with the model's previous prompt
+  counts as cached, like Ollama's KV cache), and decode per generated token.
+  Calls beyond `parallel` per model wait, as in Ollama's own queue.
+- FakeSearXNG (/search), FakeYaCy (/yacysearch.json) and FakeWikipedia
+  (/w/api.php) return result lists in each engine's JSON format.
+- FakeFeeds serves an RSS 2.0 feed at any /<host>/<path>, matching the URL
+  layout of skills/feeds.py's "feed_mirror".
+"""
+
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+CHARS_PER_TOKEN = 4
+WORDS = ("local", "model", "memory", "context", "search", "news", "update", "system", "answer", "result",
+         "request", "latency", "private", "device", "summary", "index", "signal", "report", "today", "world")
+
+Response = Tuple[int, str, bytes]
+
+
+def _words(seed: str, count: int) -> str:
+    """`count` filler words, always the same for the same seed"""
+    start = zlib.crc32(seed.encode("utf-8"))
+    return " ".join(WORDS[(start + i * 7) % len(WORDS)] for i in range(count))
+
+
+def _json(obj: Any, status: int = 200) -> Response:
+    return status, "application/json", json.dumps(obj).encode("utf-8")
+
+
+class FakeService:
+    """One fake upstream on a free local port, served from a daemon thread"""
+
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay_ms = delay_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Response:
+        raise NotImplementedError
+
+    def start(self) -> "FakeService":
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real services
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    body = None
+                parsed = urlparse(self.path)
+                with service._lock:
+                    service.requests += 1
+                if service.delay_ms:
+                    time.sleep(service.delay_ms / 1000)
+                status, content_type, payload = service.handle(method, parsed.path, parse_qs(parsed.query), body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class FakeOllama(FakeService):
+    """Ollama API with latency derived from prompt and output token counts"""
+
+    def __init__(self, models: List[str], prefill_ms_per_token: float = 0.5, decode_ms_per_token: float = 15.0,
+                 load_ms: float = 500.0, reply_tokens: int = 48, parallel: int = 1):
+        super().__init__()
+        self.models = list(dict.fromkeys(models))
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.decode_ms_per_token = decode_ms_per_token
+        self.load_ms = load_ms
+        self.reply_tokens = reply_tokens
+        self.parallel = parallel
+        self._loaded: Dict[str, float] = {}       # model -> loaded at
+        self._last_prompt: Dict[str, str] = {}
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._load_lock = threading.Lock()        # Ollama loads one model at a time
+        self.loads = 0
+        self.generated_tokens = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "loads": self.loads, "generated_tokens": self.generated_tokens}
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Response:
+        if path == "/api/tags":
+            return _json({"models": [{"name": m, "model": m} for m in self.models]})
+        if path == "/api/ps":
+            with self._lock:
+                loaded = list(self._loaded)
+            return _json({"models": [{"name": m, "model": m, "size_vram": 1,
+                                      "expires_at": "2099-01-01T00:00:00.000000000Z"} for m in loaded]})
+        if path in ("/api/generate", "/api/chat") and method == "POST" and isinstance(body, dict):
+            return self._complete(path, body)
+        return _json({"error": f"unknown endpoint {path}"}, 404)
+
+    def _slot(self, model: str) -> threading.Semaphore:
+        with self._lock:
+            slot = self._slots.get(model)
+            if slot is None:
+                slot = self._slots[model] = threading.Semaphore(self.parallel)
+            return slot
+
+    def _load(self, model: str) -> float:
+        """Seconds spent loading `model` (0 if it was resident)"""
+        with self._load_lock:
+            if model in self._loaded:
+                return 0.0
+            time.sleep(self.load_ms / 1000)
+            with self._lock:
+                self._loaded[model] = time.time()
+                self.loads += 1
+            return self.load_ms / 1000
+
+    def _complete(self, path: str, body: Dict[str, Any]) -> Response:
+        model = body.get("model", "")
+        if body.get("keep_alive") in (0, "0"):
+            with self._lock:
+                self._loaded.pop(model, None)
+                self._last_prompt.pop(model, None)
+            return _json({"model": model, "done": True, "done_reason": "unload"})
+
+        if path == "/api/chat":
+            prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        else:
+            prompt = f"{body.get('system', '')}\n{body.get('prompt', '')}"
+        start = time.perf_counter()
+        with self._slot(model):
+            load = self._load(model)
+            if not prompt.strip():
+                return _json({"model": model, "response": "", "done": True,
+                              "load_duration": int(load * 1e9), "total_duration": int(load * 1e9)})
+            with self._lock:
+                previous = self._last_prompt.get(model, "")
+                self._last_prompt[model] = prompt
+            shared = 0
+            for a, b in zip(previous, prompt):
+                if a != b:
+                    break
+                shared += 1
+            prompt_tokens = max(1, (len(prompt) - shared) // CHARS_PER_TOKEN)
+            limit = (body.get("options") or {}).get("num_predict") or self.reply_tokens
+            generated = max(1, min(self.reply_tokens, int(limit)))
+            prefill = prompt_tokens * self.prefill_ms_per_token / 1000
+            decode = generated * self.decode_ms_per_token / 1000
+            time.sleep(prefill + decode)
+        with self._lock:
+            self.generated_tokens += generated
+
+        text = _words(prompt[-200:], generated).capitalize() + "."
+        result = {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "done": True,
+            "total_duration": int((time.perf_counter() - start) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prefill * 1e9),
+            "eval_count": generated,
+            "eval_duration": int(decode * 1e9),
+        }
+        if path == "/api/chat":
+            result["message"] = {"role": "assistant", "content": text}
+        else:
+            result["response"] = text
+        return _json(result)
+
+
+class FakeSearXNG(FakeService):
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Response:
+        q = (query.get("q") or [""])[0]
+        return _json({"query": q, "results": [
+            {"title": f"{q} - {_words(q + str(i), 4)}", "url": f"https://example.org/searx/{i}?q={i}",
+             "content": _words(q + "snippet" + str(i), 30)}
+            for i in range(10)
+        ]})
+
+
+class FakeYaCy(FakeService):
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Response:
+        q = (query.get("query") or [""])[0]
+        count = int((query.get("maximumRecords") or ["10"])[0])
+        return _json({"channels": [{"items": [
+            {"title": f"{q} - {_words(q + str(i), 3)}", "link": f"https://example.org/yacy/{i}",
+             "description": _words(q + "yacy" + str(i), 25)}
+            for i in range(count)
+        ]}]})
+
+
+class FakeWikipedia(FakeService):
+    """MediaWiki query API: generator=search with extracts, and batched titles="""
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Response:
+        if "gsrsearch" in query:
+            q = query["gsrsearch"][0]
+            limit = int((query.get("gsrlimit") or ["3"])[0])
+            titles = [f"{q.title()} {_words(q + str(i), 1).title()}" for i in range(limit)]
+        else:
+            titles = [t for t in (query.get("titles") or [""])[0].split("|") if t]
+        return _json({"batchcomplete": True, "query": {"pages": [
+            {"pageid": zlib.crc32(t.encode("utf-8")), "title": t, "index": i + 1, "extract": _words(t, 60)}
+            for i, t in enumerate(titles)
+        ]}})
+
+
+class FakeFeeds(FakeService):
+    """RSS 2.0 for any /<host>/<path>"""
+
+    def __init__(self, items: int = 10, delay_ms: float = 0.0):
+        super().__init__(delay_ms)
+        self.items = items
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Response:
+        source = path.strip("/") or "feed"
+        published = "Mon, 06 Jan 2025 08:00:00 GMT"
+        entries = "".join(
+            f"<item><title>{escape(_words(source + str(i), 8).capitalize())} report {i}</title>"
+            f"<link>https://example.org/{escape(source)}/{i}</link>"
+            f"<description>{escape(_words(source + 'summary' + str(i), 40))}</description>"
+            f"<pubDate>{published}</pubDate></item>"
+            for i in range(self.items)
+        )
+        xml = (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+               f"<title>{escape(source)}</title><link>https://example.org/</link>"
+               f"<description>Benchmark feed</description>{entries}</channel></rss>")
+        return 200, "application/rss+xml", xml.encode("utf-8")
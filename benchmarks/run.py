@@ -0,0 +1,328 @@
+"""
+End-to-end latency benchmark for the OmniMind API.
+
+Starts the fake Ollama, SearXNG, YaCy, Wikipedia and RSS services, seeds a
+conversation store in a temporary directory, runs api_server under uvicorn
+against them (through a temporary config.json, with TTS muted), then drives
+each scenario at each concurrency level and prints JSON with throughput and
+p50/p95/p99 latencies. Nothing leaves the machine and the real memory/ files
+are not touched, so two branches can be compared run for run.
+
+    python -m benchmarks.run --concurrency 1,4,16 --requests 100 --output bench.json
+
+Each level is closed-loop: `concurrency` clients send requests back to back
+until `--requests` have completed. The store is re-seeded before every level,
+so chat history length doesn't drift between runs. A level whose scenario
+never reached the fake service it exists to measure (e.g. news with feedparser
+missing, which falls back to web search) is marked "valid": false, since its
+numbers describe a fallback path.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from benchmarks.fake_services import FakeFeeds, FakeOllama, FakeSearXNG, FakeWikipedia, FakeYaCy
+from brain.model_router import DEFAULT_ROUTES
+from utils.config import load_config
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_TIMEOUT = 60.0
+REQUEST_TIMEOUT = 120.0
+
+CHAT_MESSAGES = (
+    "I had a long day at work, how should I unwind tonight?",
+    "Can you help me plan a relaxed weekend at home?",
+    "I keep forgetting to drink water during the day, any ideas?",
+    "Let's continue what we were talking about earlier.",
+    "Give me a short motivational thought for the morning.",
+    "What do you remember about my interests so far?",
+)
+SEARCH_QUERIES = ("search for python asyncio tutorial", "search for local llm inference",
+                  "search for home network setup", "search for healthy breakfast ideas")
+NEWS_MESSAGES = ("latest news", "world news", "india news")
+
+# name -> (method, path, body factory)
+Scenario = Tuple[str, str, Optional[Callable[[random.Random], Dict[str, Any]]]]
+SCENARIOS: Dict[str, Scenario] = {
+    "chat": ("POST", "/api/chat", lambda rng: {"message": rng.choice(CHAT_MESSAGES)}),
+    "search": ("POST", "/api/chat", lambda rng: {"message": rng.choice(SEARCH_QUERIES)}),
+    "news": ("POST", "/api/chat", lambda rng: {"message": rng.choice(NEWS_MESSAGES)}),
+    "status": ("GET", "/api/status", None),
+    "skills": ("GET", "/api/skills", None),
+    "skill": ("POST", "/api/execute-skill",
+              lambda rng: {"skill_id": "file_operations", "query": "list file operations", "params": {}}),
+}
+# Fake services each scenario must reach for its level to count
+EXPECTED_UPSTREAMS: Dict[str, Tuple[str, ...]] = {
+    "chat": ("ollama",),
+    "search": ("searxng", "yacy", "wikipedia"),
+    "news": ("feeds",),
+}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Linear interpolation between closest ranks; `sorted_values` ascending"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def seed_memory(memory_dir: str, history: int, seed: int):
+    """Fresh conversations.json and user_profile.json, identical for the same seed"""
+    shutil.rmtree(memory_dir, ignore_errors=True)
+    os.makedirs(memory_dir)
+    rng = random.Random(seed)
+    start = 1735689600.0  # 2025-01-01, so timestamps don't depend on when the run happens
+    turns = [{
+        "timestamp": start + i * 90,
+        "user": rng.choice(CHAT_MESSAGES),
+        "assistant": " ".join(rng.choice(("Sure,", "Here is", "a plan", "for", "you", "that", "keeps",
+                                          "things", "simple", "and", "calm.")) for _ in range(40)),
+        "route": "chat",
+    } for i in range(history)]
+    profile = {
+        "preferences": {"tone": "friendly", "music": ["lofi"], "verbosity": "concise"},
+        "summary": "Enjoys calm evenings, asks about productivity and local AI tools.",
+    }
+    with open(os.path.join(memory_dir, 'conversations.json'), 'w', encoding='utf-8') as f:
+        json.dump({"history": turns}, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(memory_dir, 'user_profile.json'), 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True,
+                                  timeout=10).stdout.strip() or None
+        except Exception:
+            return None
+
+    return {"commit": git("rev-parse", "HEAD"), "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def is_error(response: requests.Response) -> bool:
+    """HTTP errors, plus the 200 replies the API uses to report failures"""
+    if response.status_code >= 400:
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and (body.get("status") == "error" or body.get("success") is False)
+
+
+def run_level(base_url: str, scenario: Scenario, concurrency: int, total: int, seed: int) -> Dict[str, Any]:
+    """`total` requests from `concurrency` closed-loop clients"""
+    method, path, make_body = scenario
+    latencies: List[float] = []
+    errors = 0
+    issued = 0
+    lock = threading.Lock()
+
+    def client(index: int):
+        nonlocal errors, issued
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        while True:
+            with lock:
+                if issued >= total:
+                    return
+                issued += 1
+            body = make_body(rng) if make_body else None
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=REQUEST_TIMEOUT)
+                failed = is_error(response)
+            except requests.RequestException:
+                failed = True
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed_ms)
+                errors += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(client, i) for i in range(concurrency)]:
+            future.result()
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 3) if duration else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "p50": round(percentile(latencies, 0.50), 2) if latencies else None,
+            "p95": round(percentile(latencies, 0.95), 2) if latencies else None,
+            "p99": round(percentile(latencies, 0.99), 2) if latencies else None,
+            "max": round(latencies[-1], 2) if latencies else None,
+        },
+    }
+
+
+def start_api(config_path: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, OMNIMIND_CONFIG=config_path, PYTHONUNBUFFERED="1")
+    for name in ("SEARXNG_URL", "YACY_URL"):
+        env.pop(name, None)  # The config file points these at the fakes
+    # Server output goes to stderr so stdout stays clean JSON
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "api_server:app", "--host", "127.0.0.1",
+                                "--port", str(port), "--log-level", "warning"],
+                               cwd=ROOT_DIR, env=env, stdout=sys.stderr)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"api_server exited with code {process.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("api_server did not start in time")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the OmniMind API against local fake services")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed requests per scenario")
+    parser.add_argument("--history", type=int, default=30, help="seeded conversation exchanges")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.5)
+    parser.add_argument("--decode-ms-per-token", type=float, default=15.0)
+    parser.add_argument("--load-ms", type=float, default=500.0, help="fake model load time")
+    parser.add_argument("--reply-tokens", type=int, default=48, help="tokens per fake completion")
+    parser.add_argument("--ollama-parallel", type=int, default=1, help="concurrent calls per fake model")
+    parser.add_argument("--search-delay-ms", type=float, default=50.0)
+    parser.add_argument("--feed-delay-ms", type=float, default=30.0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="omnimind-bench-")
+    memory_dir = os.path.join(workdir, "memory")
+    models = [m for route in DEFAULT_ROUTES.values() for m in route]
+    for route in (load_config().get("model_routes") or {}).values():
+        models += [route] if isinstance(route, str) else list(route)
+
+    ollama = FakeOllama(models, args.prefill_ms_per_token, args.decode_ms_per_token, args.load_ms,
+                        args.reply_tokens, args.ollama_parallel).start()
+    upstreams = [ollama, FakeSearXNG(args.search_delay_ms).start(), FakeYaCy(args.search_delay_ms).start(),
+                 FakeWikipedia(args.search_delay_ms).start(), FakeFeeds(delay_ms=args.feed_delay_ms).start()]
+    _, searxng, yacy, wikipedia, feeds = upstreams
+    services = dict(zip(("ollama", "searxng", "yacy", "wikipedia", "feeds"), upstreams))
+
+    config = dict(load_config())
+    config.update({
+        "ollama_url": ollama.url,
+        "ollama_num_parallel": args.ollama_parallel,
+        "searxng_url": searxng.url,
+        "yacy_url": yacy.url,
+        "wikipedia_api_url": f"{wikipedia.url}/w/api.php",
+        "feed_mirror": feeds.url,
+        "memory_dir": memory_dir,
+        "tts_enabled": False,
+        "trace_file": os.path.join(workdir, "traces.jsonl"),
+        "trace_sample_rate": 0,
+    })
+    config_path = os.path.join(workdir, "config.json")
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+
+    seed_memory(memory_dir, args.history, args.seed)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_api(config_path, port)
+    results = []
+    try:
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            if args.warmup:
+                run_level(base_url, scenario, 1, args.warmup, args.seed)
+            for concurrency in args.concurrency:
+                seed_memory(memory_dir, args.history, args.seed)
+                before = {n: services[n].requests for n in EXPECTED_UPSTREAMS.get(name, ())}
+                result = run_level(base_url, scenario, concurrency, args.requests, args.seed)
+                result["upstream_requests"] = {n: services[n].requests - c for n, c in before.items()}
+                idle = [n for n, c in result["upstream_requests"].items() if c == 0]
+                result["valid"] = not idle
+                results.append({"scenario": name, **result})
+                print(f"{name} x{concurrency}: {result['throughput_rps']} req/s, "
+                      f"p50 {result['latency_ms']['p50']} ms, p99 {result['latency_ms']['p99']} ms, "
+                      f"{result['errors']} errors", file=sys.stderr)
+                if idle:
+                    print(f"WARNING: {name} x{concurrency} never reached {', '.join(idle)}; "
+                          f"it measured a fallback path and is marked invalid", file=sys.stderr)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        for upstream in upstreams:
+            upstream.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "upstreams": {"ollama": ollama.stats(), "searxng": searxng.requests, "yacy": yacy.requests,
+                      "wikipedia": wikipedia.requests, "feeds": feeds.requests},
+        "results": results,
+        "valid": all(r["valid"] for r in results),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Small on-device intent classifier used to route requests before they reach Ollama.
+
+Messages are turned into hashed word / bigram / character-trigram features and
+scored by a linear softmax model. The trained weights are stored as a compact
+NumPy artifact (memory/intent_model.npz), so loading is instant and a prediction
+is a handful of row lookups, well under a millisecond.
+
+Training data comes from the conversation store: turns that ran a skill carry a
+`skill_executed` label, routed news/search turns carry a `route` label, and
+everything else counts as "chat" (answered by the LLM). Turns the classifier
+routed itself (`routed_by: "classifier"`) and failed skill runs are skipped, so
+a misroute never becomes a training example. api_server only lets a prediction
+run skills without side effects (manifest "side_effects").
+
+CLI:
+    python -m brain.intent_classifier train [--conversations PATH] [--out PATH]
+    python -m brain.intent_classifier predict "play some lofi music"
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # numpy not installed; classifier is disabled
+    np = None
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEMORY_DIR = os.path.join(ROOT_DIR, 'memory')
+CONV_PATH = os.path.join(MEMORY_DIR, 'conversations.json')
+MODEL_PATH = os.path.join(MEMORY_DIR, 'intent_model.npz')
+
+CHAT_LABEL = "chat"
+DEFAULT_FEATURES = 1 << 14
+MIN_CONFIDENCE = 0.6  # Below this, callers should fall back to their own rules / the LLM
+
+
+def _features(text: str, n_features: int) -> Tuple[Any, Any]:
+    """Hashed sparse features: (indices, values), L2-normalised"""
+    words = text.lower().split()
+    tokens = [f"w:{w}" for w in words]
+    tokens += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"#{w}#"
+        tokens += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    counts: Dict[int, float] = {}
+    for tok in tokens:
+        idx = zlib.crc32(tok.encode('utf-8')) % n_features
+        counts[idx] = counts.get(idx, 0.0) + 1.0
+    if not counts:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    idx = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    val = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    val /= math.sqrt(float((val * val).sum()))
+    return idx, val
+
+
+def _softmax(z):
+    z = z - z.max()
+    e = np.exp(z)
+    return e / e.sum()
+
+
+class IntentClassifier:
+    """Hashed n-gram linear softmax classifier"""
+
+    def __init__(self, labels: Sequence[str], n_features: int = DEFAULT_FEATURES,
+                 weights=None, bias=None):
+        if np is None:
+            raise RuntimeError("numpy is required for the intent classifier")
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.weights = weights if weights is not None else np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(self.labels), dtype=np.float32)
+
+    def scores(self, text: str):
+        idx, val = _features(text, self.n_features)
+        return val @ self.weights[idx] + self.bias
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """{"label", "confidence", "ranked": [(label, prob), ...]}"""
+        probs = _softmax(self.scores(text).astype(np.float32))
+        order = np.argsort(-probs)
+        return {
+            "label": self.labels[order[0]],
+            "confidence": round(float(probs[order[0]]), 3),
+            "ranked": [(self.labels[i], round(float(probs[i]), 3)) for i in order[:3]],
+        }
+
+    @classmethod
+    def train(cls, samples: Sequence[Tuple[str, str]], n_features: int = DEFAULT_FEATURES,
+              epochs: int = 15, lr: float = 0.5, l2: float = 1e-5, seed: int = 0) -> "IntentClassifier":
+        """Plain SGD on sparse rows; fine for the few thousand turns a local store holds"""
+        labels = sorted({label for _, label in samples})
+        if len(labels) < 2:
+            raise ValueError("Need at least two distinct labels to train")
+        model = cls(labels, n_features)
+        index = {label: i for i, label in enumerate(labels)}
+        data = [(_features(text, n_features), index[label]) for text, label in samples]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            step = lr / (1 + epoch)
+            for (idx, val), y in data:
+                if not len(idx):
+                    continue
+                grad = _softmax(val @ model.weights[idx] + model.bias)
+                grad[y] -= 1.0
+                model.weights[idx] -= step * (np.outer(val, grad) + l2 * model.weights[idx])
+                model.bias -= step * grad
+        return model
+
+    def accuracy(self, samples: Sequence[Tuple[str, str]]) -> float:
+        if not samples:
+            return 0.0
+        hits = sum(1 for text, label in samples if self.predict(text)["label"] == label)
+        return hits / len(samples)
+
+    def save(self, path: str = MODEL_PATH):
+        """Compressed artifact; weights are stored as float16 to keep it small"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias.astype(np.float32),
+            labels=np.array(self.labels),
+            n_features=np.array(self.n_features),
+        )
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "IntentClassifier":
+        with np.load(path) as data:
+            return cls(
+                labels=[str(label) for label in data["labels"]],
+                n_features=int(data["n_features"]),
+                weights=data["weights"].astype(np.float32),
+                bias=data["bias"],
+            )
+
+
+def label_for_turn(turn: Dict[str, Any]) -> Optional[str]:
+    """Derive a routing label from a stored conversation turn"""
+    if not turn.get('user'):
+        return None
+    if turn.get('routed_by') == 'classifier':
+        return None  # Only keyword-routed turns are ground truth
+    if turn.get('skill_executed'):
+        if turn.get('assistant', '').startswith('✗'):
+            return None  # The skill failed; likely the wrong one
+        return turn['skill_executed']
+    if turn.get('route'):
+        return turn['route']
+    # Older turns have no route field; news/search replies are recognisable by their header
+    reply = turn.get('assistant', '')
+    if reply.startswith('📰'):
+        return 'news'
+    if reply.startswith('🔍'):
+        return 'search'
+    if reply.startswith('[Error]') or reply.startswith('Error:'):
+        return None
+    return CHAT_LABEL
+
+
+def load_training_samples(conv_path: str = CONV_PATH) -> List[Tuple[str, str]]:
+    try:
+        with open(conv_path, 'r', encoding='utf-8') as f:
+            history = json.load(f).get('history', [])
+    except Exception:
+        return []
+    samples = []
+    for turn in history:
+        label = label_for_turn(turn)
+        if label:
+            samples.append((turn['user'], label))
+    return samples
+
+
+_default: Optional[IntentClassifier] = None
+_default_mtime = 0.0
+
+
+def get_classifier(path: str = MODEL_PATH) -> Optional[IntentClassifier]:
+    """Shared instance loaded from disk; reloaded if the artifact changes. None if untrained."""
+    global _default, _default_mtime
+    if np is None:
+        return None
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _default is None or mtime != _default_mtime:
+        try:
+            _default = IntentClassifier.load(path)
+            _default_mtime = mtime
+        except Exception as e:
+            print(f"Intent model could not be loaded: {e}")
+            return None
+    return _default
+
+
+def classify(text: str, min_confidence: float = MIN_CONFIDENCE) -> Optional[str]:
+    """Predicted label if a model is trained and confident enough, else None"""
+    model = get_classifier()
+    if model is None or not text.strip():
+        return None
+    result = model.predict(text)
+    return result["label"] if result["confidence"] >= min_confidence else None
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Train or query the OmniMind intent classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train_cmd = sub.add_parser("train", help="learn from labelled turns in the conversation store")
+    train_cmd.add_argument("--conversations", default=CONV_PATH)
+    train_cmd.add_argument("--out", default=MODEL_PATH)
+    train_cmd.add_argument("--features", type=int, default=DEFAULT_FEATURES)
+    train_cmd.add_argument("--epochs", type=int, default=15)
+
+    predict_cmd = sub.add_parser("predict", help="classify a message with the saved model")
+    predict_cmd.add_argument("text")
+    predict_cmd.add_argument("--model", default=MODEL_PATH)
+
+    args = parser.parse_args(argv)
+
+    if np is None:
+        parser.exit(1, "numpy is required: pip install numpy\n")
+
+    if args.command == "train":
+        samples = load_training_samples(args.conversations)
+        counts: Dict[str, int] = {}
+        for _, label in samples:
+            counts[label] = counts.get(label, 0) + 1
+        print(f"Loaded {len(samples)} labelled turns: {counts}")
+        try:
+            model = IntentClassifier.train(samples, n_features=args.features, epochs=args.epochs)
+        except ValueError as e:
+            parser.exit(1, f"Cannot train: {e}\n")
+        model.save(args.out)
+        print(f"Training accuracy: {model.accuracy(samples):.1%}")
+        print(f"Saved {args.out} ({os.path.getsize(args.out) / 1024:.1f} KB)")
+    else:
+        model = IntentClassifier.load(args.model)
+        start = time.perf_counter()
+        result = model.predict(args.text)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(json.dumps(result, ensure_ascii=False))
+        print(f"({elapsed_us:.0f} µs)")
+
+
+if __name__ == "__main__":
+    main()
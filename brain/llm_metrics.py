@@ -0,0 +1,108 @@
+"""
+Per-call Ollama timings, tagged by model and caller.
+
+Ollama reports total_duration, load_duration, prompt_eval_count/_duration
+(prefill) and eval_count/_duration (decode) in nanoseconds on every response.
+Each call is recorded into the shared metrics registry as llm_* histograms and
+counters labelled {model, caller}; `summary()` condenses them into tokens per
+second, the prefill/decode split and load stalls for /api/metrics/llm.
+"""
+
+from typing import Any, Dict, Optional
+
+from brain.ollama_interface import OllamaInterface
+from utils.metrics import DURATION_BUCKETS, RATE_BUCKETS, TOKEN_BUCKETS, metrics
+from utils.tracing import annotate
+
+
+LOAD_STALL_SECONDS = 1.0  # A load longer than this means the model was cold
+
+requests_total = metrics.counter("llm_requests_total", "Ollama calls by outcome")
+load_stalls_total = metrics.counter("llm_load_stalls_total", "Calls that waited for a model load")
+prompt_tokens_total = metrics.counter("llm_prompt_tokens_total", "Prompt tokens evaluated (prefill)")
+generated_tokens_total = metrics.counter("llm_generated_tokens_total", "Tokens generated (decode)")
+request_seconds = metrics.histogram("llm_request_seconds", "Wall-clock time of the HTTP call", DURATION_BUCKETS)
+total_seconds = metrics.histogram("llm_total_seconds", "Ollama total_duration", DURATION_BUCKETS)
+load_seconds = metrics.histogram("llm_load_seconds", "Ollama load_duration", DURATION_BUCKETS)
+prefill_seconds = metrics.histogram("llm_prefill_seconds", "Ollama prompt_eval_duration", DURATION_BUCKETS)
+decode_seconds = metrics.histogram("llm_decode_seconds", "Ollama eval_duration", DURATION_BUCKETS)
+prompt_tokens = metrics.histogram("llm_prompt_tokens", "prompt_eval_count per call", TOKEN_BUCKETS)
+generated_tokens = metrics.histogram("llm_generated_tokens", "eval_count per call", TOKEN_BUCKETS)
+prefill_tps = metrics.histogram("llm_prefill_tokens_per_second", "Prompt tokens per second", RATE_BUCKETS)
+decode_tps = metrics.histogram("llm_decode_tokens_per_second", "Generated tokens per second", RATE_BUCKETS)
+
+
+def _seconds(data: Dict[str, Any], key: str) -> Optional[float]:
+    value = data.get(key)
+    return value / 1e9 if value else None
+
+
+def record_call(model: str, data: Optional[Dict[str, Any]], elapsed_ms: float, error: Optional[str],
+                caller: str = "other"):
+    """OllamaInterface observer"""
+    labels = {"model": model, "caller": caller}
+    request_seconds.observe(elapsed_ms / 1000, **labels)
+    if error is not None or data is None:
+        requests_total.inc(status="error", **labels)
+        return
+    requests_total.inc(status="ok", **labels)
+
+    total = _seconds(data, "total_duration")
+    load = _seconds(data, "load_duration")
+    prefill = _seconds(data, "prompt_eval_duration")
+    decode = _seconds(data, "eval_duration")
+    n_prompt = data.get("prompt_eval_count") or 0
+    n_generated = data.get("eval_count") or 0
+
+    if total is not None:
+        total_seconds.observe(total, **labels)
+    if load is not None:
+        load_seconds.observe(load, **labels)
+        if load >= LOAD_STALL_SECONDS:
+            load_stalls_total.inc(**labels)
+    if prefill is not None:
+        prefill_seconds.observe(prefill, **labels)
+        if n_prompt:
+            prefill_tps.observe(n_prompt / prefill, **labels)
+    if decode is not None:
+        decode_seconds.observe(decode, **labels)
+        if n_generated:
+            decode_tps.observe(n_generated / decode, **labels)
+    annotate(load_ms=round((load or 0) * 1000, 1), prefill_ms=round((prefill or 0) * 1000, 1),
+             decode_ms=round((decode or 0) * 1000, 1), prompt_tokens=n_prompt, generated_tokens=n_generated)
+    prompt_tokens.observe(n_prompt, **labels)
+    generated_tokens.observe(n_generated, **labels)
+    prompt_tokens_total.inc(n_prompt, **labels)
+    generated_tokens_total.inc(n_generated, **labels)
+
+
+OllamaInterface.observers.append(record_call)
+
+
+def summary() -> Dict[str, Any]:
+    """Per model/caller: calls, errors, latency percentiles, tokens/s, prefill vs decode, load stalls"""
+    rows: Dict[str, Dict[str, Any]] = {}
+
+    def row(labels: Dict[str, str]) -> Dict[str, Any]:
+        key = f"{labels['model']}|{labels['caller']}"
+        return rows.setdefault(key, {"model": labels["model"], "caller": labels["caller"],
+                                     "calls": 0, "errors": 0, "load_stalls": 0})
+
+    for series in requests_total.snapshot():
+        labels = series["labels"]
+        target = row(labels)
+        target["calls" if labels["status"] == "ok" else "errors"] += int(series["value"])
+    for series in load_stalls_total.snapshot():
+        row(series["labels"])["load_stalls"] = int(series["value"])
+    for name, hist in (("request_s", request_seconds), ("load_s", load_seconds),
+                       ("prefill_s", prefill_seconds), ("decode_s", decode_seconds)):
+        for series in hist.snapshot():
+            row(series["labels"])[name] = {k: series[k] for k in ("mean", "p50", "p95", "p99")}
+    for name, hist in (("prefill_tokens_per_s", prefill_tps), ("decode_tokens_per_s", decode_tps)):
+        for series in hist.snapshot():
+            row(series["labels"])[name] = series["mean"]
+    for target in rows.values():
+        prefill = (target.get("prefill_s") or {}).get("mean") or 0.0
+        decode = (target.get("decode_s") or {}).get("mean") or 0.0
+        target["prefill_share"] = round(prefill / (prefill + decode), 3) if prefill + decode else None
+    return {"calls": sorted(rows.values(), key=lambda r: (r["model"], r["caller"]))}
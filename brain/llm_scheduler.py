@@ -0,0 +1,195 @@
+"""
+Admission control and priority scheduling for Ollama calls.
+
+Every routed LLM call takes a slot on its model before it is sent. Each model
+gets as many slots as Ollama serves in parallel (config.json
+"ollama_num_parallel", else OLLAMA_NUM_PARALLEL, else 1); anything beyond that
+waits here, where priority is known, instead of in Ollama's FIFO queue.
+
+- Priorities: interactive (chat) > tool (coder, search summaries) >
+  background (news digests, profile summaries). Waiters are served by
+  priority, then by deadline.
+- When a model has more than one slot, its last free slot is kept for
+  interactive calls, so a burst of summaries can't occupy all of them.
+- Load shedding: a call is rejected at once when the queue for its model is
+  already MAX_QUEUE[priority] deep, rather than waiting behind it.
+- Deadlines: a queued call that can no longer start before its deadline is
+  cancelled, and a running call gets only the remaining time as its HTTP
+  timeout.
+
+Rejected and expired calls raise LLMUnavailable; the skills that summarize
+with the LLM already catch exceptions and fall back to plain text.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from utils.config import get as config_get
+from utils.metrics import metrics
+from utils.tracing import span
+
+
+INTERACTIVE = "interactive"
+TOOL = "tool"
+BACKGROUND = "background"
+PRIORITIES = {INTERACTIVE: 0, TOOL: 1, BACKGROUND: 2}
+
+MAX_QUEUE = {INTERACTIVE: 32, TOOL: 8, BACKGROUND: 4}  # Waiting calls per model before shedding
+DEADLINES = {INTERACTIVE: 90.0, TOOL: 60.0, BACKGROUND: 30.0}  # Seconds from submission
+
+T = TypeVar("T")
+
+
+class LLMUnavailable(RuntimeError):
+    """The scheduler shed the call or its deadline passed before it could run"""
+
+
+class _Waiter:
+    __slots__ = ("rank", "deadline", "event", "granted", "abandoned")
+
+    def __init__(self, rank: int, deadline: float):
+        self.rank = rank
+        self.deadline = deadline
+        self.event = threading.Event()
+        self.granted = False
+        self.abandoned = False
+
+
+class _ModelQueue:
+    def __init__(self):
+        self.active = 0
+        self.heap: List[Any] = []  # (rank, deadline, seq, waiter)
+        self.waiting = 0           # Live entries in `heap` (abandoned ones are removed lazily)
+
+
+class LLMScheduler:
+    """Per-model slots with a priority queue in front of them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+        self.counters: Dict[str, Dict[str, int]] = {
+            p: {"admitted": 0, "queued": 0, "shed": 0, "expired": 0, "wait_ms": 0} for p in PRIORITIES
+        }
+        metrics.gauge("llm_queue_depth", "Calls waiting for an Ollama slot",
+                      fn=lambda: self._per_model(lambda q: q.waiting))
+        metrics.gauge("llm_active_calls", "Calls currently holding an Ollama slot",
+                      fn=lambda: self._per_model(lambda q: q.active))
+        metrics.counter("llm_scheduler_events_total", "Scheduler decisions (admitted, queued, shed, expired)",
+                        fn=self._event_samples)
+
+    def _per_model(self, value: Callable[[_ModelQueue], int]):
+        with self._lock:
+            return [({"model": name}, value(q)) for name, q in self._queues.items()]
+
+    def _event_samples(self):
+        with self._lock:
+            return [({"priority": p, "event": event}, n) for p, c in self.counters.items()
+                    for event, n in c.items() if event != "wait_ms"]
+
+    def limit(self, model: str) -> int:
+        per_model = config_get('ollama_num_parallel')
+        if isinstance(per_model, dict):
+            per_model = per_model.get(model)
+        value = per_model or os.environ.get('OLLAMA_NUM_PARALLEL')
+        try:
+            return max(1, int(value)) if value else 1
+        except ValueError:
+            return 1
+
+    def _head_rank(self, q: _ModelQueue) -> Optional[int]:
+        while q.heap and q.heap[0][3].abandoned:
+            heapq.heappop(q.heap)
+        return q.heap[0][0] if q.heap else None
+
+    def _admissible(self, q: _ModelQueue, rank: int, limit: int) -> bool:
+        reserved = 1 if limit > 1 and rank > PRIORITIES[INTERACTIVE] else 0
+        return q.active < limit - reserved
+
+    def submit(self, model: str, fn: Callable[[float], T], priority: str = TOOL,
+               deadline: Optional[float] = None) -> T:
+        """
+        Run fn(seconds_left) once `model` has a free slot; `deadline` is a
+        time.monotonic() value (default: now + DEADLINES[priority]).
+        """
+        rank = PRIORITIES.get(priority, PRIORITIES[TOOL])
+        priority = next(p for p, r in PRIORITIES.items() if r == rank)
+        submitted = time.monotonic()
+        deadline = deadline or submitted + DEADLINES[priority]
+        counters = self.counters[priority]
+
+        with self._lock:
+            q = self._queues.setdefault(model, _ModelQueue())
+            limit = self.limit(model)
+            head = self._head_rank(q)
+            # Jump the queue only past lower priorities (e.g. into the slot kept for interactive calls)
+            if (head is None or head > rank) and self._admissible(q, rank, limit):
+                q.active += 1
+                counters["admitted"] += 1
+                waiter = None
+            else:
+                if q.waiting >= MAX_QUEUE[priority]:
+                    counters["shed"] += 1
+                    raise LLMUnavailable(f"{model} is busy ({q.waiting} queued); {priority} request shed")
+                waiter = _Waiter(rank, deadline)
+                heapq.heappush(q.heap, (rank, deadline, next(self._seq), waiter))
+                q.waiting += 1
+                counters["queued"] += 1
+
+        if waiter is not None:
+            with span("llm.queue", model=model, priority=priority):
+                waiter.event.wait(max(0.0, deadline - time.monotonic()))
+            with self._lock:
+                if not waiter.granted:
+                    if not waiter.abandoned:
+                        waiter.abandoned = True
+                        q.waiting -= 1
+                    counters["expired"] += 1
+                    raise LLMUnavailable(f"{priority} request for {model} expired after "
+                                         f"{time.monotonic() - submitted:.1f}s in queue")
+                counters["admitted"] += 1
+                counters["wait_ms"] += int((time.monotonic() - submitted) * 1000)
+
+        try:
+            return fn(max(1.0, deadline - time.monotonic()))
+        finally:
+            self._release(model)
+
+    def _release(self, model: str):
+        with self._lock:
+            q = self._queues[model]
+            q.active -= 1
+            limit = self.limit(model)
+            now = time.monotonic()
+            while q.heap:
+                rank, deadline, _, waiter = q.heap[0]
+                if waiter.abandoned or deadline <= now:
+                    heapq.heappop(q.heap)
+                    if not waiter.abandoned:
+                        waiter.abandoned = True
+                        q.waiting -= 1
+                        waiter.event.set()  # Wakes it to report the expiry
+                    continue
+                if not self._admissible(q, rank, limit):
+                    break
+                heapq.heappop(q.heap)
+                q.waiting -= 1
+                q.active += 1
+                waiter.granted = True
+                waiter.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {name: {"active": q.active, "queued": q.waiting, "limit": self.limit(name)}
+                      for name, q in self._queues.items()}
+            priorities = {p: dict(c) for p, c in self.counters.items()}
+        return {"models": models, "priorities": priorities}
+
+
+# Global instance
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,295 @@
+"""
+Keeps the models OmniMind uses loaded in Ollama.
+
+Ollama unloads a model after its idle timeout (5 minutes by default), so
+switching between qwen2.5, phi3 and codellama keeps paying cold loads of tens
+of seconds. The residency manager:
+
+- sends `keep_alive` with every request (OllamaInterface.keep_alive_policy),
+  per model from config.json "model_keep_alive", else "ollama_keep_alive",
+  else OLLAMA_KEEP_ALIVE, else 30m;
+- preloads the warm set at server start (the chat model first), so the
+  first chat after boot doesn't wait for a load;
+- tracks what is loaded via /api/ps and, while idle, re-warms pinned models
+  before Ollama's expiry time and reloads them if something evicted them;
+- schedules swaps: when the router keeps passing over a preferred model
+  because it isn't loaded, the model is loaded in the background, evicting
+  the least recently used unpinned model if the server is at capacity
+  (config "max_resident_models", else OLLAMA_MAX_LOADED_MODELS, else 2).
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+import requests
+
+from brain.ollama_interface import OllamaInterface, context_length
+from utils.config import get as config_get
+from utils.metrics import metrics
+
+
+DEFAULT_BASE_URL = "http://localhost:11434"
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_MAX_RESIDENT = 2
+PS_TTL = 5.0                # Seconds a /api/ps answer is reused
+MAINTAIN_INTERVAL = 60.0    # Seconds between residency checks while idle
+EXPIRY_MARGIN = 2 * MAINTAIN_INTERVAL  # Re-warm pinned models this long before they would expire
+SWAP_DEMAND = 3             # Times a preferred model is passed over before it gets loaded
+LOAD_TIMEOUT = 300          # Loading a 7B model from disk can take minutes on slow machines
+
+
+def parse_expires_at(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds for Ollama's expires_at (RFC 3339 with nanoseconds), or None"""
+    if not value:
+        return None
+    # fromisoformat on older Pythons accepts neither 'Z' nor more than 6 fractional digits
+    text = re.sub(r"(\.\d{6})\d+", r"\1", value.replace("Z", "+00:00"))
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class ResidencyManager:
+    """Tracks loaded Ollama models and warms, extends or swaps them"""
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or config_get('ollama_url') or DEFAULT_BASE_URL).rstrip("/")
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, Dict[str, Any]] = {}  # name -> /api/ps entry
+        self._known = False
+        self._refreshed_at = 0.0
+        self._last_used: Dict[str, float] = {}
+        self._demand: Dict[str, int] = {}
+        self._pending: Dict[str, Future] = {}
+        # Ollama loads one model at a time anyway; queueing here keeps warm-ups ordered
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ollama-warm")
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.pinned: List[str] = []
+        self.loads = 0
+        self.load_failures = 0
+        self.evictions = 0
+        self.last_load_ms: Dict[str, float] = {}
+
+        OllamaInterface.keep_alive_policy = self.keep_alive_for
+        metrics.gauge("llm_models_loaded", "Models resident in Ollama at the last /api/ps check",
+                      fn=lambda: len(self._loaded) if self._known else [])
+
+    # Configuration
+
+    def keep_alive_for(self, model: str) -> str:
+        per_model = config_get('model_keep_alive') or {}
+        value = per_model.get(model) if isinstance(per_model, dict) else None
+        if value is None:
+            value = config_get('ollama_keep_alive') or os.environ.get('OLLAMA_KEEP_ALIVE') or DEFAULT_KEEP_ALIVE
+        return value
+
+    def capacity(self) -> int:
+        value = config_get('max_resident_models') or os.environ.get('OLLAMA_MAX_LOADED_MODELS')
+        try:
+            return max(1, int(value)) if value else DEFAULT_MAX_RESIDENT
+        except ValueError:
+            return DEFAULT_MAX_RESIDENT
+
+    # Ollama state
+
+    def refresh(self) -> bool:
+        """Re-read /api/ps; False if Ollama didn't answer"""
+        try:
+            resp = requests.get(f"{self.base_url}/api/ps", timeout=2)
+            resp.raise_for_status()
+            models = resp.json().get("models", [])
+        except Exception:
+            with self._lock:
+                self._known = False
+                self._refreshed_at = time.monotonic()
+            return False
+        with self._lock:
+            self._loaded = {m.get("name") or m.get("model"): m for m in models}
+            self._known = True
+            self._refreshed_at = time.monotonic()
+        return True
+
+    @property
+    def known(self) -> bool:
+        """Whether the last /api/ps call succeeded"""
+        return self._known
+
+    def resident_models(self) -> Set[str]:
+        """Models Ollama currently holds in memory (cached for a few seconds)"""
+        if time.monotonic() - self._refreshed_at > PS_TTL:
+            self.refresh()
+        with self._lock:
+            return set(self._loaded)
+
+    def expires_in(self, model: str) -> Optional[float]:
+        with self._lock:
+            entry = self._loaded.get(model)
+        expires = parse_expires_at(entry.get("expires_at")) if entry else None
+        return None if expires is None else expires - time.time()
+
+    # Loading and unloading
+
+    def warm(self, model: str) -> bool:
+        """Load `model` (or extend its keep_alive) with an empty prompt; blocks until loaded"""
+        start = time.perf_counter()
+        try:
+            resp = requests.post(f"{self.base_url}/api/generate",
+                                 json={"model": model, "prompt": "", "stream": False,
+                                       "keep_alive": self.keep_alive_for(model),
+                                       "options": {"num_ctx": context_length()}},
+                                 timeout=LOAD_TIMEOUT)
+            resp.raise_for_status()
+            data = resp.json()
+        except Exception as e:
+            with self._lock:
+                self.load_failures += 1
+            print(f"Could not warm Ollama model {model}: {e}")
+            return False
+        load_ms = (data.get("load_duration") or 0) / 1e6
+        with self._lock:
+            self.loads += 1
+            self.last_load_ms[model] = round(load_ms or (time.perf_counter() - start) * 1000, 1)
+            self._loaded.setdefault(model, {"name": model})
+            self._demand.pop(model, None)
+        return True
+
+    def unload(self, model: str) -> bool:
+        try:
+            resp = requests.post(f"{self.base_url}/api/generate",
+                                 json={"model": model, "keep_alive": 0}, timeout=30)
+            resp.raise_for_status()
+        except Exception as e:
+            print(f"Could not unload Ollama model {model}: {e}")
+            return False
+        with self._lock:
+            self.evictions += 1
+            self._loaded.pop(model, None)
+        return True
+
+    def warm_async(self, model: str, make_room: bool = False) -> Future:
+        """Queue a warm-up; concurrent requests for the same model share one"""
+        with self._lock:
+            future = self._pending.get(model)
+            if future is not None and not future.done():
+                return future
+            future = self._executor.submit(self._warm_and_clear, model, make_room)
+            self._pending[model] = future
+            return future
+
+    def _warm_and_clear(self, model: str, make_room: bool) -> bool:
+        try:
+            if make_room:
+                self._make_room(exclude=model)
+            return self.warm(model)
+        finally:
+            with self._lock:
+                self._pending.pop(model, None)
+
+    # Swap scheduling
+
+    def note_use(self, model: str):
+        """A request just ran on `model`, so it is loaded now"""
+        with self._lock:
+            self._last_used[model] = time.time()
+            self._loaded.setdefault(model, {"name": model})
+            self._demand.pop(model, None)
+
+    def note_miss(self, model: str):
+        """
+        The router wanted `model` but used a resident one instead. After
+        SWAP_DEMAND misses, load it in the background (making room first) so
+        later requests get it.
+        """
+        with self._lock:
+            if model in self._loaded or model in self._pending:
+                return
+            self._demand[model] = self._demand.get(model, 0) + 1
+            if self._demand[model] < SWAP_DEMAND:
+                return
+        self.warm_async(model, make_room=True)
+
+    def _make_room(self, exclude: str):
+        resident = self.resident_models() - {exclude}
+        if len(resident) < self.capacity():
+            return
+        evictable = [m for m in resident if m not in self.pinned]
+        if not evictable:
+            return  # Let Ollama decide; we never unload pinned models ourselves
+        with self._lock:
+            victim = min(evictable, key=lambda m: self._last_used.get(m, 0.0))
+        self.unload(victim)
+
+    # Background maintenance
+
+    def maintain(self):
+        """Reload evicted pinned models (if there is room) and extend ones about to expire"""
+        if not self.refresh():
+            return
+        resident = self.resident_models()
+        room = self.capacity() - len(resident)
+        for model in self.pinned:
+            if model in resident:
+                remaining = self.expires_in(model)
+                if remaining is not None and remaining < EXPIRY_MARGIN:
+                    self.warm_async(model)
+            elif room > 0:
+                # Only into free capacity, so a swapped-in model isn't immediately pushed out again
+                room -= 1
+                self.warm_async(model)
+
+    def start(self, models: List[str], interval: float = MAINTAIN_INTERVAL):
+        """Pin and preload `models` (in order) and keep them resident"""
+        self.pinned = list(dict.fromkeys(models))[:self.capacity()]
+        for model in self.pinned:
+            self.warm_async(model)
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.maintain()
+                except Exception as e:
+                    print(f"Model residency check failed: {e}")
+
+        self._thread = threading.Thread(target=_loop, name="ollama-residency", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = {name: {"size_vram": entry.get("size_vram"), "expires_at": entry.get("expires_at")}
+                      for name, entry in self._loaded.items()}
+            return {
+                "known": self._known,
+                "loaded": loaded if self._known else None,
+                "pinned": list(self.pinned),
+                "capacity": self.capacity(),
+                "warming": sorted(self._pending),
+                "demand": dict(self._demand),
+                "loads": self.loads,
+                "load_failures": self.load_failures,
+                "evictions": self.evictions,
+                "last_load_ms": dict(self.last_load_ms),
+            }
+
+
+# Global instance
+model_residency = ResidencyManager()
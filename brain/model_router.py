@@ -0,0 +1,289 @@
+"""
+Routes LLM requests to the cheapest adequate Ollama model.
+
+Each request class (summary, factual, chat, reasoning, code) has an ordered
+list of adequate models, cheapest first, from config.json "model_routes"
+(defaults below). For every call the router estimates each candidate's cost:
+observed generation latency, plus the observed load time if the model is not
+currently resident in Ollama (per /api/ps), plus a small penalty for being
+further down the preference list. So a resident 3B model beats loading a
+7B one, but the preferred model still wins once it is loaded. Models that
+fail or are not installed are skipped for a while.
+
+Timings come from OllamaInterface.observers, so every call feeds the router,
+including calls made through plain OllamaInterface instances. Residency comes
+from brain.model_residency, which the router also tells when it passes over a
+preferred model so the model can be swapped in for later requests. Calls
+are queued by priority in brain.llm_scheduler before they reach Ollama.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import requests
+
+from brain import llm_metrics  # noqa: F401  (registers the per-call metrics observer)
+from brain.llm_scheduler import TOOL, llm_scheduler
+from brain.model_residency import model_residency
+from brain.ollama_interface import OllamaInterface, prompt_cache_stats
+from intent_matcher import IntentMatcher
+from utils.config import get as config_get
+from utils.tracing import span
+
+
+DEFAULT_BASE_URL = "http://localhost:11434"
+
+DEFAULT_ROUTES: Dict[str, List[str]] = {
+    "summary": ["qwen2.5:3b", "phi3:medium"],
+    "factual": ["qwen2.5:3b", "phi3:medium"],
+    "chat": ["qwen2.5:3b", "phi3:medium"],
+    "reasoning": ["phi3:medium", "qwen2.5:3b"],
+    "code": ["codellama:7b-instruct", "phi3:medium"],
+}
+DEFAULT_CLASS = "chat"
+
+PRIOR_LATENCY_MS = 3000.0   # Until a model has been observed
+PRIOR_LOAD_MS = 8000.0
+PREFERENCE_MS = 1500.0      # Cost of each step down a class's preference list
+EWMA_ALPHA = 0.3
+FAILURE_COOLDOWN = 60.0     # Seconds a failing model is skipped
+TAGS_TTL = 60.0
+
+
+class ModelStats:
+    """Smoothed latency and load time for one model"""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.latency_ms: Optional[float] = None
+        self.load_ms: Optional[float] = None
+        self.failed_until = 0.0
+        self.last_used = 0.0
+
+    def observe(self, elapsed_ms: float, load_ms: float):
+        self.calls += 1
+        self.last_used = time.time()
+        gen_ms = max(0.0, elapsed_ms - load_ms)
+        self.latency_ms = gen_ms if self.latency_ms is None else \
+            EWMA_ALPHA * gen_ms + (1 - EWMA_ALPHA) * self.latency_ms
+        if load_ms > 500:  # Only real loads; a resident model reports a few ms
+            self.load_ms = load_ms if self.load_ms is None else \
+                EWMA_ALPHA * load_ms + (1 - EWMA_ALPHA) * self.load_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "load_ms": round(self.load_ms, 1) if self.load_ms is not None else None,
+            "cooling_down": self.failed_until > time.time(),
+        }
+
+
+class RoutedOllama(OllamaInterface):
+    """OllamaInterface drop-in whose model is chosen by the router on every call"""
+
+    def __init__(self, router: "ModelRouter", request_class: str, priority: str = TOOL, caller: str = "other"):
+        # `model` is only the nominal choice; the real one is picked per call
+        super().__init__(router.base_url, (router.candidates(request_class) or [DEFAULT_ROUTES[DEFAULT_CLASS][0]])[0],
+                         caller)
+        self.router = router
+        self.request_class = request_class
+        self.priority = priority
+
+    def generate(self, system_prompt: str, user_prompt: str, temperature: float = 0.2,
+                 max_tokens: Optional[int] = None, timeout: float = 60) -> str:
+        return self.router.generate(self.request_class, system_prompt, user_prompt,
+                                    temperature=temperature, max_tokens=max_tokens, priority=self.priority,
+                                    caller=self.caller)
+
+    def chat(self, messages: List[Dict[str, str]], temperature: float = 0.2,
+             max_tokens: Optional[int] = None, timeout: float = 60) -> str:
+        return self.router.chat(self.request_class, messages, temperature=temperature,
+                                max_tokens=max_tokens, priority=self.priority, caller=self.caller)
+
+
+class ModelRouter:
+    """Maps request classes to models using config, observed latency and residency"""
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or config_get('ollama_url') or DEFAULT_BASE_URL).rstrip("/")
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+        self.residency = model_residency
+        self._installed: Set[str] = set()
+        self._installed_at = 0.0
+        self.decisions: Dict[str, int] = {}
+
+        self.classifier = IntentMatcher()
+        self.classifier.add("code", ["code", "function", "script", "bug", "debug", "compile", "stack trace",
+                                     "regex", "sql", "python", "javascript", "typescript", "java", "refactor"],
+                            patterns=[r"```", r"\w+\([^)]*\)\s*[:{]"])
+        self.classifier.add("reasoning", ["why", "explain", "compare", "analyze", "analyse", "step by step",
+                                          "pros and cons", "plan", "strategy", "prove", "trade-offs", "evaluate"])
+        self.classifier.add("summary", ["summarize", "summarise", "summary", "tl;dr", "tldr"])
+        self.classifier.add("factual", patterns=[r"^(?:what|who|when|where|which|how many|how much|define)\b"])
+
+        OllamaInterface.observers.append(self.record)
+
+    # Configuration
+
+    def routes(self) -> Dict[str, List[str]]:
+        routes = {cls: list(models) for cls, models in DEFAULT_ROUTES.items()}
+        configured = config_get('model_routes') or {}
+        for cls, models in configured.items():
+            if isinstance(models, str):
+                models = [models]
+            routes[cls] = [m for m in models if m]
+        return routes
+
+    def candidates(self, request_class: str) -> List[str]:
+        routes = self.routes()
+        return routes.get(request_class) or routes.get(DEFAULT_CLASS) or []
+
+    def classify_request(self, text: str) -> str:
+        """Heuristic request class for a free-form prompt"""
+        ranked = self.classifier.rank(text or "")
+        if ranked:
+            top = ranked[0]["intent"]
+            if top == "factual" and len(text.split()) > 25:
+                return "reasoning"  # Long "what ..." questions are rarely simple lookups
+            return top
+        return "reasoning" if len(text or "") > 600 else DEFAULT_CLASS
+
+    # Ollama state
+
+    def _get(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            resp = requests.get(f"{self.base_url}{path}", timeout=2)
+            resp.raise_for_status()
+            return resp.json()
+        except Exception:
+            return None
+
+    def resident_models(self) -> Set[str]:
+        """Models Ollama currently holds in memory (cached for a few seconds)"""
+        return self.residency.resident_models()
+
+    def installed_models(self) -> Set[str]:
+        now = time.monotonic()
+        if now - self._installed_at > TAGS_TTL:
+            data = self._get("/api/tags")
+            with self._lock:
+                self._installed_at = now
+                if data is not None:
+                    self._installed = {m.get("name") or m.get("model") for m in data.get("models", [])}
+        return set(self._installed)
+
+    # Decisions
+
+    def _stat(self, model: str) -> ModelStats:
+        with self._lock:
+            stat = self._stats.get(model)
+            if stat is None:
+                stat = self._stats[model] = ModelStats()
+            return stat
+
+    def expected_cost_ms(self, model: str, rank: int, resident: Set[str]) -> float:
+        stat = self._stat(model)
+        cost = stat.latency_ms if stat.latency_ms is not None else PRIOR_LATENCY_MS
+        if self.residency.known and model not in resident:
+            cost += stat.load_ms if stat.load_ms is not None else PRIOR_LOAD_MS
+        return cost + rank * PREFERENCE_MS
+
+    def choose(self, request_class: str) -> str:
+        """Model for this request class right now"""
+        candidates = self.candidates(request_class)
+        if not candidates:
+            return DEFAULT_ROUTES[DEFAULT_CLASS][0]
+        installed = self.installed_models()
+        now = time.time()
+        usable = [m for m in candidates
+                  if (not installed or m in installed) and self._stat(m).failed_until <= now]
+        if not usable:
+            return candidates[0]  # Nothing looks usable; let the preferred model report its own error
+        resident = self.resident_models()
+        ranked = sorted(usable, key=lambda m: self.expected_cost_ms(m, candidates.index(m), resident))
+        model = ranked[0]
+        if model != usable[0] and self.residency.known and usable[0] not in resident:
+            self.residency.note_miss(usable[0])  # Preferred model keeps losing only because it's cold
+        with self._lock:
+            key = f"{request_class}:{model}"
+            self.decisions[key] = self.decisions.get(key, 0) + 1
+        return model
+
+    def record(self, model: str, data: Optional[Dict[str, Any]], elapsed_ms: float, error: Optional[str],
+               caller: str = "other"):
+        """OllamaInterface observer: learn latency, load time and residency from each call"""
+        stat = self._stat(model)
+        if error is not None or data is None:
+            with self._lock:
+                stat.failures += 1
+                stat.failed_until = time.time() + FAILURE_COOLDOWN
+            return
+        load_ms = (data.get("load_duration") or 0) / 1e6  # Ollama reports nanoseconds
+        with self._lock:
+            stat.observe(elapsed_ms, load_ms)
+            stat.failed_until = 0.0
+        self.residency.note_use(model)  # Just used, so it's loaded now
+
+    def warm_set(self) -> List[str]:
+        """Models to keep loaded: config "warm_models", else each class's first choice, chat first"""
+        configured = config_get('warm_models')
+        if configured:
+            return [configured] if isinstance(configured, str) else list(configured)
+        routes = self.routes()
+        order = [DEFAULT_CLASS] + [cls for cls in routes if cls != DEFAULT_CLASS]
+        return list(dict.fromkeys(routes[cls][0] for cls in order if routes.get(cls)))
+
+    def warm_up(self):
+        """Preload the warm set in the background and keep it resident"""
+        self.residency.start(self.warm_set())
+
+    # Calling
+
+    def client(self, request_class: str, priority: str = TOOL, caller: str = "other") -> RoutedOllama:
+        return RoutedOllama(self, request_class, priority, caller)
+
+    def generate(self, request_class: str, system_prompt: str, user_prompt: str,
+                 temperature: float = 0.2, max_tokens: Optional[int] = None, priority: str = TOOL,
+                 caller: str = "other") -> str:
+        return self.chat(request_class, [{"role": "system", "content": system_prompt},
+                                         {"role": "user", "content": user_prompt}],
+                         temperature=temperature, max_tokens=max_tokens, priority=priority, caller=caller)
+
+    def chat(self, request_class: str, messages: List[Dict[str, str]], temperature: float = 0.2,
+             max_tokens: Optional[int] = None, priority: str = TOOL, caller: str = "other") -> str:
+        """Route, then wait for a slot on the chosen model; raises LLMUnavailable if shed or expired"""
+        with span("llm", request_class=request_class, priority=priority, caller=caller) as llm_span:
+            model = self.choose(request_class)
+            if llm_span is not None:
+                llm_span.set(model=model, messages=len(messages))
+            ollama = OllamaInterface(self.base_url, model, caller)
+
+            def call(timeout: float) -> str:
+                with span("ollama", model=model):
+                    return ollama.chat(messages, temperature=temperature, max_tokens=max_tokens,
+                                       timeout=min(60, timeout))
+
+            return llm_scheduler.submit(model, call, priority=priority)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {name: stat.to_dict() for name, stat in self._stats.items()}
+            decisions = dict(self.decisions)
+        return {
+            "routes": self.routes(),
+            "resident": sorted(self.resident_models()) if self.residency.known else None,
+            "residency": self.residency.stats(),
+            "prompt_cache": prompt_cache_stats.stats(),
+            "scheduler": llm_scheduler.stats(),
+            "models": models,
+            "decisions": decisions,
+        }
+
+
+# Global instance
+model_router = ModelRouter()
@@ -1,7 +1,78 @@
 import os
 import json
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
+
+from utils.config import get as config_get
+
+
+CHARS_PER_TOKEN = 4.0  # Rough average for English text with Llama/Qwen tokenizers
+MESSAGE_OVERHEAD_TOKENS = 8  # Chat template tokens around each message (role markers etc.)
+DEFAULT_NUM_CTX = 8192  # Ollama's own default (2048) is too small for a 10-19 exchange chat history
+
+
+def context_length() -> int:
+    """
+    Context window sent as options.num_ctx on every request (config.json
+    "ollama_num_ctx"). It must be the same on every call, warm-ups included:
+    Ollama reloads a model whose num_ctx changes.
+    """
+    try:
+        return max(512, int(config_get('ollama_num_ctx') or DEFAULT_NUM_CTX))
+    except (TypeError, ValueError):
+        return DEFAULT_NUM_CTX
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> float:
+    """Approximate prompt size of chat messages, template included"""
+    return sum(len(m.get("content", "")) / CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+class PromptCacheStats:
+    """
+    Approximate prefix reuse per model. Ollama's prompt_eval_count only counts
+    prompt tokens it had to evaluate; tokens served from the KV cache are
+    skipped. Ollama doesn't report the prompt's full size, so it is estimated
+    (chars / 4 plus template tokens per message) and the reuse figures are
+    labelled "_est"; only "evaluated_tokens" comes straight from Ollama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, float]] = {}
+
+    def record(self, model: str, messages: List[Dict[str, str]], data: Dict[str, Any]):
+        estimated = estimate_tokens(messages)
+        # A fully cached prompt may omit prompt_eval_count altogether
+        evaluated = data.get("prompt_eval_count") or 0
+        reused = max(0.0, estimated - evaluated)
+        with self._lock:
+            entry = self._models.setdefault(model, {"calls": 0, "prompt_tokens": 0.0, "evaluated_tokens": 0,
+                                                    "reused_tokens": 0.0, "last_reuse": 0.0})
+            entry["calls"] += 1
+            entry["prompt_tokens"] += max(estimated, evaluated)
+            entry["evaluated_tokens"] += evaluated
+            entry["reused_tokens"] += reused
+            entry["last_reuse"] = reused / estimated if estimated else 0.0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                model: {
+                    "calls": int(e["calls"]),
+                    "prompt_tokens_est": int(e["prompt_tokens"]),
+                    "evaluated_tokens": int(e["evaluated_tokens"]),
+                    "reuse_ratio_est": round(e["reused_tokens"] / e["prompt_tokens"], 3) if e["prompt_tokens"] else 0.0,
+                    "last_reuse_est": round(e["last_reuse"], 3),
+                }
+                for model, e in self._models.items()
+            }
+
+
+# Global instance
+prompt_cache_stats = PromptCacheStats()
 
 
 class OllamaInterface:
@@ -10,37 +81,73 @@ class OllamaInterface:
     Default model is phi3:medium as the primary reasoning engine.
     """
 
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "phi3:medium"):
+    # Called after every request as fn(model, response_json_or_None, elapsed_ms, error_or_None, caller);
+    # used by the model router to learn latency and residency, and by brain.llm_metrics
+    observers: List[Callable[[str, Optional[Dict[str, Any]], float, Optional[str], str], None]] = []
+    # model -> keep_alive value sent with each request (set by the residency manager);
+    # None leaves Ollama's default idle timeout in place
+    keep_alive_policy: Optional[Callable[[str], Optional[str]]] = None
+
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "phi3:medium",
+                 caller: str = "other"):
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self.caller = caller  # Metrics tag: chat, news, search, coder, ...
+
+    def _notify(self, data: Optional[Dict[str, Any]], elapsed_ms: float, error: Optional[str]):
+        for observer in list(self.observers):
+            try:
+                observer(self.model, data, elapsed_ms, error, self.caller)
+            except Exception:
+                pass
 
     def set_model(self, model: str):
         """Allow hot-swapping the model, e.g., to codellama:7b-instruct."""
         self.model = model
 
-    def generate(self, system_prompt: str, user_prompt: str, temperature: float = 0.2, 
-                 max_tokens: Optional[int] = None) -> str:
+    def generate(self, system_prompt: str, user_prompt: str, temperature: float = 0.2,
+                 max_tokens: Optional[int] = None, timeout: float = 60) -> str:
+        """
+        Single-turn completion. Sent to /api/chat as [system, user] so the model's
+        own template is used and a fixed system prompt stays cached between calls.
+        """
+        return self.chat([{"role": "system", "content": system_prompt},
+                          {"role": "user", "content": user_prompt}],
+                         temperature=temperature, max_tokens=max_tokens, timeout=timeout)
+
+    def chat(self, messages: List[Dict[str, str]], temperature: float = 0.2,
+             max_tokens: Optional[int] = None, timeout: float = 60) -> str:
         """
-        Calls Ollama's /api/generate with a simple prompt. Assumes Ollama is running locally.
+        Calls Ollama's /api/chat with structured messages ({"role", "content"}).
+        Ollama reuses the KV cache for the longest prefix matching its previous
+        prompt, so callers should keep the system message byte-stable and only
+        append to the history between turns.
         """
-        url = f"{self.base_url}/api/generate"
-        prompt = f"<|system|>\n{system_prompt}\n<|user|>\n{user_prompt}\n<|assistant|>"
+        url = f"{self.base_url}/api/chat"
         payload: Dict[str, Any] = {
             "model": self.model,
-            "prompt": prompt,
+            "messages": messages,
             "options": {
                 "temperature": temperature,
+                "num_ctx": context_length(),
             },
             "stream": False,
         }
         if max_tokens is not None:
             payload["options"]["num_predict"] = max_tokens
+        keep_alive = self.keep_alive_policy(self.model) if self.keep_alive_policy else None
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
 
+        start = time.perf_counter()
         try:
-            resp = requests.post(url, json=payload, timeout=60)
+            resp = requests.post(url, json=payload, timeout=timeout)
             resp.raise_for_status()
             data = resp.json()
-            # Ollama returns { "response": "...", ... }
-            return data.get("response", "")
+            prompt_cache_stats.record(self.model, messages, data)
+            self._notify(data, (time.perf_counter() - start) * 1000, None)
+            # Ollama returns { "message": {"role": "assistant", "content": "..."}, ... }
+            return (data.get("message") or {}).get("content", "")
         except requests.RequestException as e:
+            self._notify(None, (time.perf_counter() - start) * 1000, str(e))
             return f"[Error] Failed to reach local Ollama server at {url}: {e}"
@@ -8,11 +8,11 @@ import json
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 import uvicorn
 
 # Import existing API endpoints
-from api_server import app as api_app
+from api_server import app as api_app, prometheus_metrics, start_background_services
 
 # Create new cloud-optimized app
 app = FastAPI(title="OmniMind Cloud", description="Global AI Assistant")
@@ -33,6 +33,11 @@ if os.path.exists("static"):
 # Include all API routes from api_server
 app.mount("/api", api_app)
 
+@app.on_event("startup")
+async def on_startup():
+    # Mounted sub-apps don't receive startup events, so start api_server's samplers here
+    start_background_services()
+
 @app.get("/")
 async def serve_frontend():
     """Serve the React frontend"""
@@ -40,6 +45,9 @@ async def serve_frontend():
         return FileResponse("static/index.html")
     return {"message": "OmniMind Cloud API", "status": "running", "docs": "/docs"}
 
+# Scrapers expect /metrics at the root; the mounted copy is also at /api/metrics
+app.add_api_route("/metrics", prometheus_metrics, methods=["GET"], response_class=PlainTextResponse)
+
 @app.get("/health")
 async def health_check():
     """Health check for cloud platforms"""
@@ -1,6 +1,6 @@
 import { motion } from 'framer-motion'
-import { Cpu, HardDrive, Wifi, Zap, Activity, Database } from 'lucide-react'
-import { useEffect, useState } from 'react'
+import { Cpu, HardDrive, Wifi, Zap, Database } from 'lucide-react'
+import { useSystemTelemetry } from '@/hooks/useSystemTelemetry'
 
 interface SystemMetric {
   label: string
@@ -14,30 +14,14 @@ interface EnhancedSystemPanelProps {
 }
 
 export default function EnhancedSystemPanel({ isConnected }: EnhancedSystemPanelProps) {
-  const [metrics, setMetrics] = useState<SystemMetric[]>([
-    { label: 'CPU', value: 0, icon: <Cpu size={18} />, color: '#00d9ff' },
-    { label: 'Memory', value: 0, icon: <Database size={18} />, color: '#b537f2' },
-    { label: 'Network', value: 0, icon: <Wifi size={18} />, color: '#ff006e' },
-    { label: 'Storage', value: 0, icon: <HardDrive size={18} />, color: '#00ff88' },
-    { label: 'GPU', value: 0, icon: <Zap size={18} />, color: '#ff6b35' },
-    { label: 'Activity', value: 0, icon: <Activity size={18} />, color: '#00d9ff' }
-  ])
-
-  useEffect(() => {
-    const interval = setInterval(() => {
-      setMetrics(prev => prev.map(metric => ({
-        ...metric,
-        value: Math.min(100, Math.max(0, metric.value + (Math.random() - 0.5) * 10))
-      })))
-    }, 2000)
-
-    setMetrics(prev => prev.map(metric => ({
-      ...metric,
-      value: 30 + Math.random() * 40
-    })))
-
-    return () => clearInterval(interval)
-  }, [])
+  const detailed = useSystemTelemetry(isConnected)?.detailed
+  const metrics: SystemMetric[] = [
+    { label: 'CPU', value: detailed?.cpu.usage_percent ?? 0, icon: <Cpu size={18} />, color: '#00d9ff' },
+    { label: 'Memory', value: detailed?.memory.usage_percent ?? 0, icon: <Database size={18} />, color: '#b537f2' },
+    { label: 'Wi-Fi', value: detailed?.wifi_signal ?? 0, icon: <Wifi size={18} />, color: '#ff006e' },
+    { label: 'Storage', value: detailed?.disk.usage_percent ?? 0, icon: <HardDrive size={18} />, color: '#00ff88' },
+    { label: 'Battery', value: detailed?.battery?.percent ?? 0, icon: <Zap size={18} />, color: '#ff6b35' }
+  ]
 
   return (
     <motion.div
@@ -1,7 +1,7 @@
 import { Cpu, Activity, Database, Wifi, HardDrive, Zap, Thermometer } from 'lucide-react'
 import { motion } from 'framer-motion'
-import { useEffect, useState } from 'react'
-import { api, type SystemStatus as SystemStatusType } from '@/services/api'
+import type { NetworkRates } from '@/services/api'
+import { useSystemTelemetry } from '@/hooks/useSystemTelemetry'
 
 interface SystemPanelProps {
   isConnected: boolean
@@ -32,6 +32,8 @@ interface DetailedStats {
     bytes_recv_mb: number
     packets_sent: number
     packets_recv: number
+    rates?: NetworkRates
+    interfaces?: Record<string, NetworkRates>
   }
   wifi_signal: number | null
   battery: {
@@ -52,29 +54,8 @@ interface DetailedStats {
 }
 
 export default function SystemPanel({ isConnected }: SystemPanelProps) {
-  const [systemStatus, setSystemStatus] = useState<SystemStatusType | null>(null)
-  const [detailedStats, setDetailedStats] = useState<DetailedStats | null>(null)
-
-  useEffect(() => {
-    if (!isConnected) return
-
-    const fetchStatus = async () => {
-      try {
-        const status = await api.getStatus()
-        setSystemStatus(status)
-        if (status.detailed) {
-          setDetailedStats(status.detailed as DetailedStats)
-        }
-      } catch (error) {
-        console.error('Failed to fetch system status:', error)
-      }
-    }
-
-    fetchStatus()
-    const interval = setInterval(fetchStatus, 2000) // Update every 2 seconds
-
-    return () => clearInterval(interval)
-  }, [isConnected])
+  const systemStatus = useSystemTelemetry(isConnected)
+  const detailedStats = (systemStatus?.detailed ?? null) as DetailedStats | null
 
   const metrics = [
     { 
@@ -183,6 +164,18 @@ export default function SystemPanel({ isConnected }: SystemPanelProps) {
               <p className="text-gray-400">Received</p>
               <p className="text-cyber-purple font-semibold">{detailedStats.network.bytes_recv_mb.toFixed(1)} MB</p>
             </div>
+            {detailedStats.network.rates?.sent_bytes_per_sec !== undefined && (
+              <>
+                <div>
+                  <p className="text-gray-400">Upload</p>
+                  <p className="text-cyber-green font-semibold">{((detailedStats.network.rates.sent_bytes_per_sec ?? 0) / 1024).toFixed(1)} KB/s</p>
+                </div>
+                <div>
+                  <p className="text-gray-400">Download</p>
+                  <p className="text-cyber-purple font-semibold">{((detailedStats.network.rates.recv_bytes_per_sec ?? 0) / 1024).toFixed(1)} KB/s</p>
+                </div>
+              </>
+            )}
           </div>
         </div>
       )}
@@ -0,0 +1,47 @@
+import { useEffect, useState } from 'react'
+import { api, applyTelemetryDelta, type SystemStatus, type TelemetryMessage } from '@/services/api'
+
+// Live system status pushed over /ws/telemetry; falls back to polling if the socket is unavailable
+export function useSystemTelemetry(isConnected: boolean, intervalSeconds = 2) {
+  const [status, setStatus] = useState<SystemStatus | null>(null)
+
+  useEffect(() => {
+    if (!isConnected) return
+
+    let interval: ReturnType<typeof setInterval> | null = null
+    let current: SystemStatus | null = null
+
+    const fetchStatus = async () => {
+      try {
+        setStatus(await api.getStatus())
+      } catch (error) {
+        console.error('Failed to fetch system status:', error)
+      }
+    }
+
+    const startPolling = () => {
+      if (interval) return
+      fetchStatus()
+      interval = setInterval(fetchStatus, intervalSeconds * 1000)
+    }
+
+    const socket = api.connectTelemetryWebSocket(intervalSeconds)
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data) as TelemetryMessage
+      current = message.type === 'snapshot' || !current
+        ? message.data as unknown as SystemStatus
+        : applyTelemetryDelta(current, message.data, message.removed)
+      setStatus(current)
+    }
+    socket.onerror = startPolling
+    socket.onclose = startPolling
+
+    return () => {
+      socket.onclose = null
+      socket.close()
+      if (interval) clearInterval(interval)
+    }
+  }, [isConnected, intervalSeconds])
+
+  return status
+}
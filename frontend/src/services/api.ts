@@ -1,4 +1,5 @@
 const API_BASE = 'http://localhost:8000/api'
+const WS_BASE = 'ws://localhost:8000/ws'
 
 export interface ChatResponse {
   response: string
@@ -14,6 +15,15 @@ export interface ChatResponse {
   }
 }
 
+export interface NetworkRates {
+  sent_bytes_per_sec?: number
+  recv_bytes_per_sec?: number
+  sent_packets_per_sec?: number
+  recv_packets_per_sec?: number
+  errors?: number
+  drops?: number
+}
+
 export interface SystemStatus {
   status: string
   neural_load: string
@@ -45,6 +55,8 @@ export interface SystemStatus {
       bytes_recv_mb: number
       packets_sent: number
       packets_recv: number
+      rates?: NetworkRates
+      interfaces?: Record<string, NetworkRates>
     }
     wifi_signal: number | null
     battery: {
@@ -66,6 +78,39 @@ export interface SystemStatus {
   }
 }
 
+export interface TelemetryMessage {
+  type: 'snapshot' | 'delta'
+  seq: number
+  data: Record<string, unknown>
+  removed?: string[][] // Key paths that disappeared since the last message
+}
+
+// Apply a telemetry delta to the previous snapshot; null is a value, removals come as key paths
+export function applyTelemetryDelta<T>(base: T, delta: Record<string, unknown>, removed: string[][] = []): T {
+  const next: Record<string, unknown> = { ...(base as Record<string, unknown>) }
+  for (const [key, value] of Object.entries(delta)) {
+    const prev = next[key]
+    if (
+      value && typeof value === 'object' && !Array.isArray(value) &&
+      prev && typeof prev === 'object' && !Array.isArray(prev)
+    ) {
+      next[key] = applyTelemetryDelta(prev, value as Record<string, unknown>)
+    } else {
+      next[key] = value
+    }
+  }
+  for (const [key, ...rest] of removed) {
+    if (!(key in next)) continue
+    const prev = next[key]
+    if (rest.length && prev && typeof prev === 'object' && !Array.isArray(prev)) {
+      next[key] = applyTelemetryDelta(prev, {}, [rest])
+    } else if (!rest.length) {
+      delete next[key]
+    }
+  }
+  return next as T
+}
+
 export interface ConversationEntry {
   timestamp: number
   user: string
@@ -116,6 +161,10 @@ export const api = {
   },
 
   connectVoiceWebSocket(): WebSocket {
-    return new WebSocket('ws://localhost:8000/ws/voice')
+    return new WebSocket(`${WS_BASE}/voice`)
+  },
+
+  connectTelemetryWebSocket(intervalSeconds = 2): WebSocket {
+    return new WebSocket(`${WS_BASE}/telemetry?interval=${intervalSeconds}`)
   }
 }
\ No newline at end of file
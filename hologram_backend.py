@@ -15,26 +15,35 @@ except Exception as e:
     SEARCH_ERROR = str(e)
 
 try:
-    from brain.ollama_interface import OllamaInterface
-    ollama = OllamaInterface(model="qwen2.5:3b")
+    from brain.llm_scheduler import INTERACTIVE
+    from brain.model_router import model_router
     AI_AVAILABLE = True
 except:
     AI_AVAILABLE = False
 
-try:
-    from skills.news_fetcher import get_india_news, get_world_news
-    NEWS_AVAILABLE = True
-except:
-    NEWS_AVAILABLE = False
+from skills.registry import skill_registry
+
+# Skill modules load on first use; availability is checked without importing them
+get_india_news = skill_registry.lazy("skills.news_fetcher:get_india_news")
+get_world_news = skill_registry.lazy("skills.news_fetcher:get_world_news")
+NEWS_AVAILABLE = skill_registry.available("skills.news_fetcher")
+
+get_weather = skill_registry.lazy("skills.weather:get_weather")
+get_weather_data = skill_registry.lazy("skills.weather:weather_service.get_many")
+search_wikipedia = skill_registry.lazy("skills.wikipedia_search:search_wikipedia")
+get_current_time = skill_registry.lazy("skills.time_date:get_current_time")
+get_date = skill_registry.lazy("skills.time_date:get_date")
+calculate = skill_registry.lazy("skills.calculator:calculate")
+math_expression = skill_registry.lazy("skills.calculator:math_expression")
+EXTRA_SKILLS = skill_registry.available(
+    "skills.weather", "skills.wikipedia_search", "skills.time_date", "skills.calculator"
+)
 
 try:
-    from skills.weather import get_weather
-    from skills.wikipedia_search import search_wikipedia
-    from skills.time_date import get_current_time, get_date
-    from skills.calculator import calculate
-    EXTRA_SKILLS = True
-except:
-    EXTRA_SKILLS = False
+    from brain.intent_classifier import classify
+except Exception:
+    def classify(text):
+        return None
 
 app = Flask(__name__)
 CORS(app)
@@ -141,7 +150,8 @@ def synthesize_from_results(query, results):
             f"Web results:\n{context}\n"
             "Provide a 2-6 sentence answer with citations."
         )
-        return ollama.generate(system_prompt, user_message)
+        return model_router.generate("summary", system_prompt, user_message, priority=INTERACTIVE,
+                                     caller="search")
     except Exception as e:
         return f"Unable to synthesize answer: {e}"
 
@@ -150,6 +160,8 @@ def chat():
     data = request.get_json()
     message = data.get('message', '')
     msg_lower = message.lower()
+    # On-device classifier (sub-millisecond); its label is used only when the keyword rules below miss
+    predicted = classify(message)
     
     # Check for news queries
     if NEWS_AVAILABLE and ('news' in msg_lower or 'headlines' in msg_lower):
@@ -169,6 +181,9 @@ def chat():
             except:
                 pass
         response = get_weather(city)
+    # Calculator (before Wikipedia so "what is 2^10" is computed, not looked up)
+    elif EXTRA_SKILLS and math_expression(message):
+        response = calculate(math_expression(message))
     # Wikipedia
     elif EXTRA_SKILLS and ('what is' in msg_lower or 'who is' in msg_lower or 'tell me about' in msg_lower):
         query = message.replace('what is', '').replace('who is', '').replace('tell me about', '').strip()
@@ -179,15 +194,23 @@ def chat():
     # Date
     elif EXTRA_SKILLS and ('date' in msg_lower or 'today' in msg_lower and 'is' in msg_lower):
         response = get_date()
-    # Calculator
-    elif EXTRA_SKILLS and ('calculate' in msg_lower or 'solve' in msg_lower or any(op in message for op in ['+', '-', '*', '/', '='])):
+    # Explicit requests the expression detector could not parse still get an error message
+    elif EXTRA_SKILLS and ('calculate' in msg_lower or 'solve' in msg_lower):
         expr = message.replace('calculate', '').replace('solve', '').replace('what is', '').strip()
         response = calculate(expr)
+    # Learned routes for phrasings the keyword rules miss
+    elif NEWS_AVAILABLE and predicted == 'news':
+        response = get_india_news()
+    elif predicted == 'search':
+        results = perform_web_search(message)
+        response = "\n".join(f"{i}. {r.get('title')} - {r.get('url')}" for i, r in enumerate(results, 1) if r.get('url')) \
+            or "No results found."
     # Use real AI if available
     elif AI_AVAILABLE:
         try:
             system_prompt = "You are OmniMind, a holographic AI assistant. Keep responses concise and helpful."
-            response = ollama.generate(system_prompt, message)
+            response = model_router.generate(model_router.classify_request(message), system_prompt, message,
+                                             priority=INTERACTIVE, caller="chat")
         except:
             response = f"I understand your question about '{message}'. Let me help you with that."
     else:
@@ -250,6 +273,14 @@ def search():
         'search_available': SEARCH_AVAILABLE
     })
 
+@app.route('/api/weather', methods=['GET'])
+def weather():
+    """Current conditions for one or more cities: ?city=Delhi,Mumbai (cached, fetched concurrently)"""
+    if not skill_registry.available("skills.weather"):
+        return jsonify({'error': 'Weather skill unavailable'}), 503
+    cities = [c.strip() for c in request.args.get('city', 'Delhi').split(',') if c.strip()][:20]
+    return jsonify({'weather': get_weather_data(cities)})
+
 @app.route('/api/status', methods=['GET'])
 def status():
     # Get real system stats
@@ -319,9 +350,11 @@ if __name__ == '__main__':
     print("Server: http://localhost:8000")
     print("Voice: Enabled")
     print("Hologram: Synchronized")
-    print(f"AI Model: {'qwen2.5:3b' if AI_AVAILABLE else 'Basic Responses'}")
+    print(f"AI Model: {'Routed (' + ', '.join(sorted({m for ms in model_router.routes().values() for m in ms})) + ')' if AI_AVAILABLE else 'Basic Responses'}")
     print(f"Search: {'Enabled' if SEARCH_AVAILABLE else 'Disabled'}")
     print(f"Extra Skills: {'Enabled' if EXTRA_SKILLS else 'Disabled'}")
     print("  - News, Weather, Wikipedia, Time, Calculator")
     print("=" * 40)
+    if AI_AVAILABLE:
+        model_router.warm_up()
     app.run(host='0.0.0.0', port=8000, debug=False)
@@ -0,0 +1,221 @@
+"""
+Compiled multi-pattern intent matcher for OmniMind OS.
+All keywords and patterns of all intents are folded into one regex,
+so a message is scored against every intent in a single pass (scan() makes
+further passes only when that one finds something).
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex body matching any of `words`, factored into a prefix trie
+    ("rm", "rmdir", "reg" -> r(?:m(?:dir)?|eg)). Optional tails are greedy,
+    so the longest keyword at a position is tried first. Spaces match any
+    run of whitespace.
+    """
+    trie: Dict[str, Dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Dict]) -> str:
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return body + "?" if len(branches) == 1 and len(branches[0]) == 1 else f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class IntentMatcher:
+    """
+    Keyword/pattern matcher that scores every registered intent at once.
+
+    Keywords match on word boundaries ("rm" does not hit "inform"; a keyword
+    ending in punctuation, like "dd if=", has no trailing boundary), multi-word
+    keywords tolerate any whitespace, and a keyword shared by several intents
+    counts proportionally less for each of them. Extra regex `patterns` may be
+    given per intent; they must not contain capturing groups.
+
+    `rank` and `best` count non-overlapping matches, so a domain name scores
+    as a URL rather than also as the words inside it. `scan` reports every
+    hit, including ones nested in or overlapping a longer match, so a rule
+    can't hide another (e.g. a "sudo" inside a curl ... | sh pipeline).
+    """
+
+    def __init__(self):
+        self._intents: Dict[str, Dict] = {}
+        self._order: List[str] = []
+        self._regex: Optional[re.Pattern] = None
+        # Capture group index -> (None, (intent,), weight) for patterns; keywords share the last group
+        self._groups: List[Tuple[Optional[str], Tuple[str, ...], float]] = []
+        # Keyword -> (intents it votes for, specificity)
+        self._keywords: Dict[str, Tuple[Tuple[str, ...], float]] = {}
+        self._keyword_group = 0
+        # For scan(): one zero-width (?=(...)) regex per pattern and one for all keywords
+        self._scanners: List[Tuple[re.Pattern, int]] = []
+        # Keyword -> shorter keywords that also match wherever it does ("chmod" in "chmod 777")
+        self._nested: Dict[str, List[str]] = {}
+
+    def add(self, intent_id: str, keywords: Iterable[str] = (), patterns: Iterable[str] = (),
+            weight: float = 1.0, pattern_weight: float = 2.0):
+        """
+        Register (or replace) an intent; the matcher recompiles on next use.
+        A pattern hit scores `pattern_weight` (default: as much as two keywords).
+        """
+        if intent_id not in self._intents:
+            self._order.append(intent_id)
+        self._intents[intent_id] = {
+            "keywords": [" ".join(k.lower().split()) for k in keywords if k and k.strip()],
+            "patterns": list(patterns),
+            "weight": weight,
+            "pattern_weight": pattern_weight,
+        }
+        self._regex = None
+
+    def remove(self, intent_id: str):
+        if self._intents.pop(intent_id, None) is not None:
+            self._order.remove(intent_id)
+            self._regex = None
+
+    def compile(self):
+        """Build the combined regex. Called automatically when needed."""
+        owners: Dict[str, List[str]] = {}
+        for intent_id in self._order:
+            for kw in self._intents[intent_id]["keywords"]:
+                owners.setdefault(kw, [])
+                if intent_id not in owners[kw]:
+                    owners[kw].append(intent_id)
+
+        alternatives: List[str] = []
+        self._groups = [("", (), 0.0)]  # Group 0 is the whole match
+
+        # Patterns first so e.g. a domain name wins over the bare word inside it
+        for intent_id in self._order:
+            spec = self._intents[intent_id]
+            for pattern in spec["patterns"]:
+                alternatives.append(f"({pattern})")
+                self._groups.append((None, (intent_id,), spec["pattern_weight"]))
+
+        # All keywords share one prefix-trie alternation: the regex engine then
+        # branches on the next character instead of trying every keyword in turn
+        self._keywords = {}
+        for kw, intents in owners.items():
+            # Multi-word keywords are more specific; shared keywords are less so
+            self._keywords[kw] = (tuple(intents), len(kw.split()) / len(intents))
+        if self._keywords:
+            # The trailing boundary only applies to keywords ending in a word character:
+            # "dd if=" must still match "dd if=image.iso"
+            open_ended = [kw for kw in self._keywords if not _word_char(kw[-1])]
+            bounded = [kw for kw in self._keywords if kw not in open_ended]
+            branches = [_trie_pattern(open_ended)] if open_ended else []
+            if bounded:
+                branches.append(rf"{_trie_pattern(bounded)}(?!\w)")
+            alternatives.append(rf"(?<!\w)((?:{'|'.join(branches)}))")
+            self._groups.append(("", (), 0.0))
+            self._keyword_group = len(self._groups) - 1
+        self._nested = {
+            kw: [k for k in self._keywords
+                 if k != kw and kw.startswith(k) and not (_word_char(k[-1]) and _word_char(kw[len(k)]))]
+            for kw in self._keywords
+        }
+
+        self._regex = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        # A lookahead consumes nothing, so each scanner reports a hit at every position it matches
+        self._scanners = [(re.compile(f"(?={alt})", re.IGNORECASE), group)
+                          for group, alt in enumerate(alternatives, start=1)]
+
+    def _match(self, m: "re.Match") -> Tuple[str, Tuple[str, ...], float]:
+        """(term, intents, weight) for one regex match"""
+        group = m.lastindex
+        if group == self._keyword_group:
+            keyword = " ".join(m.group(group).lower().split())
+            # Case-folding can (rarely) map a match outside the lowercased keyword set
+            intents, specificity = self._keywords.get(keyword, ((), 0.0))
+            return keyword, intents, specificity
+        _, intents, weight = self._groups[group]
+        return m.group(group), intents, weight
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """
+        {intent_id: [matched terms]} for every intent hit, overlapping hits
+        included. The combined regex is tried first; most text matches nothing.
+        """
+        if self._regex is None:
+            self.compile()
+        hits: Dict[str, List[str]] = {}
+        if not text or self._regex is None or self._regex.search(text) is None:
+            return hits
+
+        found: List[Tuple[int, str, Tuple[str, ...]]] = []  # (position, term, intents)
+        for scanner, group in self._scanners:
+            for m in scanner.finditer(text):
+                if group != self._keyword_group:
+                    found.append((m.start(), m.group(1), self._groups[group][1]))
+                    continue
+                keyword = " ".join(m.group(1).lower().split())
+                for kw in [keyword] + self._nested.get(keyword, []):
+                    found.append((m.start(), kw, self._keywords.get(kw, ((), 0.0))[0]))
+        # Intents are listed in order of their first hit in the text
+        for _, term, intents in sorted(found, key=lambda hit: hit[0]):
+            for intent_id in intents:
+                terms = hits.setdefault(intent_id, [])
+                if term not in terms:
+                    terms.append(term)
+        return hits
+
+    def intents(self, text: str) -> Set[str]:
+        """Set of intents hit by `text`"""
+        return set(self.scan(text))
+
+    def rank(self, text: str) -> List[Dict]:
+        """
+        Ranked candidates: [{"intent", "score", "confidence", "matched"}, ...].
+        Confidence is the intent's share of the total score; ties keep registration order.
+        """
+        if self._regex is None:
+            self.compile()
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        seen: Set[Tuple[int, str]] = set()
+        if text and self._regex is not None:
+            for m in self._regex.finditer(text):
+                term, intents, specificity = self._match(m)
+                key = (m.lastindex, term if m.lastindex == self._keyword_group else "")
+                if key in seen:
+                    continue  # Repeating a keyword (or pattern) doesn't add evidence
+                seen.add(key)
+                for intent_id in intents:
+                    weight = specificity * self._intents[intent_id]["weight"]
+                    scores[intent_id] = scores.get(intent_id, 0.0) + weight
+                    matched.setdefault(intent_id, []).append(term)
+
+        total = sum(scores.values())
+        ranked = sorted(scores, key=lambda i: (-scores[i], self._order.index(i)))
+        return [
+            {
+                "intent": intent_id,
+                "score": round(scores[intent_id], 3),
+                "confidence": round(scores[intent_id] / total, 3) if total else 0.0,
+                "matched": matched[intent_id],
+            }
+            for intent_id in ranked
+        ]
+
+    def best(self, text: str) -> Optional[str]:
+        """Top-ranked intent or None"""
+        ranked = self.rank(text)
+        return ranked[0]["intent"] if ranked else None
@@ -1,4 +1,4 @@
--import json
+import json
 import os
 import time
 from typing import Dict, Any
@@ -6,13 +6,15 @@ from typing import Dict, Any
 import speech_recognition as sr
 import pyttsx3
 
-from brain.ollama_interface import OllamaInterface
+from brain.llm_scheduler import BACKGROUND, INTERACTIVE
+from brain.model_router import model_router
 from brain.emotion_analyzer import EmotionAnalyzer
 from skills.media_player import play_music
 from skills.multi_search import multi_search
 from skills.file_manager import manage_files
 from skills.coder import generate_code
 from utils.safety_guard import is_safe_command
+from brain.intent_classifier import classify
 
 
 SYSTEM_PROMPT_BASE = (
@@ -103,6 +105,9 @@ def decide_action(nl_instruction: str) -> Dict[str, Any]:
     lower = nl_instruction.lower()
     if any(k in lower for k in ["play", "song", "music"]):
         return {"action": "play_music", "query": nl_instruction}
+    # Trained on-device classifier catches phrasings the keywords miss
+    if classify(nl_instruction) == "play_music":
+        return {"action": "play_music", "query": nl_instruction}
     return {"action": "answer", "query": nl_instruction}
 
 
@@ -150,8 +155,8 @@ def main():
         speak(tts_engine, "Microphone not available. Exiting.")
         return
 
-    # Init Ollama
-    ollama = OllamaInterface(model="phi3:medium")
+    # Start loading models while the profile summary and greeting run
+    model_router.warm_up()
 
     # Summarize recent history for profile context
     try:
@@ -164,11 +169,14 @@ def main():
                 "Summarize the user's stable preferences in one short sentence. "
                 "Focus on likes/dislikes and desired answer style."
             )
-            new_summary = ollama.generate(
+            new_summary = model_router.generate(
+                "summary",
                 SYSTEM_PROMPT_BASE.format(user_summary=user_summary),
                 f"Recent interactions:\n{convo_text}\n\n{summary_prompt}",
                 temperature=0.1,
                 max_tokens=128,
+                priority=BACKGROUND,
+                caller="profile",
             ).strip()
             # Update profile
             with open(PROFILE_PATH, 'r', encoding='utf-8') as pf:
@@ -266,9 +274,10 @@ def main():
                 will_do = f"list files in: {target} (restricted to your home directory)."
                 if ask_permission(tts_engine, will_do):
                     try:
-                        res = manage_files('list', target)
-                        entries = "\n".join(res['entries'][:50]) or "(empty)"
-                        reply = (style.get('preface') or '') + f"Directory: {res['path']}\n{entries}"
+                        res = manage_files('list', target, limit=50)
+                        entries = "\n".join(res['entries']) or "(empty)"
+                        more = "\n... (more entries)" if res['next_cursor'] else ""
+                        reply = (style.get('preface') or '') + f"Directory: {res['path']}\n{entries}{more}"
                     except Exception as e:
                         reply = (style.get('preface') or '') + f"Failed to list: {e}"
                     print(reply)
@@ -287,8 +296,8 @@ def main():
                 will_do = f"read file: {target} (only within your home directory)."
                 if ask_permission(tts_engine, will_do):
                     try:
-                        res = manage_files('read', target)
-                        snippet = res['content'][:800]
+                        res = manage_files('read', target, length=800)
+                        snippet = res['content']
                         reply = (style.get('preface') or '') + f"First part of {res['path']}:\n{snippet}"
                     except Exception as e:
                         reply = (style.get('preface') or '') + f"Failed to read: {e}"
@@ -351,7 +360,8 @@ def main():
                 "If this is a request to perform an action, describe the safe steps and ask for permission. "
                 "Otherwise, answer concisely."
             )
-            answer = ollama.generate(system_prompt, user_prompt)
+            answer = model_router.generate(model_router.classify_request(user_text), system_prompt, user_prompt,
+                                           priority=INTERACTIVE, caller="chat")
             print("OmniMind:", answer)
             speak(tts_engine, answer)
             append_conversation(user_text, answer)
@@ -0,0 +1,235 @@
+"""
+Compact time-series history for OmniMind OS metrics.
+Fixed-size array('f') ring buffers with 1s / 1m / 1h downsampling tiers.
+
+Footprint with DEFAULT_TIERS is about 7.5 KB per series: 300 x 4 bytes for
+the 1s tier (averages only) plus 360 and 168 x 12 bytes (min/avg/max) for the
+1m and 1h tiers. Bucket times are implied by ring position, so no timestamps
+are stored.
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# (resolution in seconds, number of buckets kept)
+DEFAULT_TIERS: List[Tuple[int, int]] = [
+    (1, 300),      # 5 minutes at 1s
+    (60, 360),     # 6 hours at 1m
+    (3600, 168),   # 7 days at 1h
+]
+
+_GAP = float("nan")  # Marks buckets with no samples
+
+
+class _Tier:
+    """
+    One downsampling tier of a series. Raw samples are folded into the
+    current bucket; when a sample lands in a later bucket, the finished one
+    is written into the ring. Slots are consecutive buckets ending at
+    `last`, with NaN for buckets that got no samples. Tiers with
+    `extremes=False` keep only the average (min and max report it too).
+    """
+
+    __slots__ = ("resolution", "capacity", "mins", "avgs", "maxs", "head", "count", "last",
+                 "_cur", "_cur_min", "_cur_max", "_cur_sum", "_cur_n")
+
+    def __init__(self, resolution: int, capacity: int, extremes: bool = True):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.avgs = array('f', [0.0]) * capacity
+        self.mins = array('f', [0.0]) * capacity if extremes else self.avgs
+        self.maxs = array('f', [0.0]) * capacity if extremes else self.avgs
+        self.head = 0   # Next write position
+        self.count = 0
+        self.last = -1  # Bucket number (int(ts // resolution)) of the newest slot
+        self._cur = -1
+        self._cur_min = 0.0
+        self._cur_max = 0.0
+        self._cur_sum = 0.0
+        self._cur_n = 0
+
+    def add(self, ts: float, value: float):
+        bucket = int(ts // self.resolution)
+        if bucket != self._cur:
+            if bucket < self._cur:
+                return  # Out-of-order sample for an already closed bucket
+            self._flush()
+            self._cur = bucket
+            self._cur_min = self._cur_max = value
+            self._cur_sum = 0.0
+            self._cur_n = 0
+        if value < self._cur_min:
+            self._cur_min = value
+        if value > self._cur_max:
+            self._cur_max = value
+        self._cur_sum += value
+        self._cur_n += 1
+
+    def _write(self, lo: float, avg: float, hi: float):
+        i = self.head
+        self.avgs[i] = avg
+        if self.mins is not self.avgs:
+            self.mins[i] = lo
+            self.maxs[i] = hi
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _flush(self):
+        if self._cur_n == 0:
+            return
+        if self.count:
+            gap = self._cur - self.last - 1
+            if gap >= self.capacity:
+                self.count = 0  # Everything kept is older than the ring reaches
+            else:
+                for _ in range(gap):
+                    self._write(_GAP, _GAP, _GAP)
+        self._write(self._cur_min, self._cur_sum / self._cur_n, self._cur_max)
+        self.last = self._cur
+
+    def _slots(self) -> Iterable[Tuple[int, int]]:
+        """(bucket number, ring index) of stored buckets, oldest first"""
+        first = self.last - self.count + 1
+        for k in range(self.count):
+            yield first + k, (self.head - self.count + k) % self.capacity
+
+    def oldest_ts(self) -> Optional[float]:
+        if self.count:
+            return (self.last - self.count + 1) * self.resolution
+        if self._cur_n:
+            return self._cur * self.resolution
+        return None
+
+    def points(self, start: float, end: float) -> List[Dict[str, float]]:
+        """Buckets whose start time falls in [start, end], oldest first"""
+        lo = int(start // self.resolution)
+        hi = int(end // self.resolution)
+        out: List[Dict[str, float]] = []
+        for b, i in self._slots():
+            if lo <= b <= hi and not math.isnan(self.avgs[i]):
+                out.append(self._point(b, self.mins[i], self.avgs[i], self.maxs[i]))
+        # Include the bucket still being filled
+        if self._cur_n and lo <= self._cur <= hi:
+            out.append(self._point(self._cur, self._cur_min, self._cur_sum / self._cur_n, self._cur_max))
+        return out
+
+    def last_values(self, n: int) -> List[float]:
+        """Most recent `n` bucket averages, oldest first"""
+        values = [self.avgs[i] for _, i in self._slots() if not math.isnan(self.avgs[i])]
+        if self._cur_n:
+            values.append(self._cur_sum / self._cur_n)
+        return values[-n:] if n > 0 else []
+
+    def _point(self, bucket: int, lo: float, avg: float, hi: float) -> Dict[str, float]:
+        return {
+            "t": bucket * self.resolution,
+            "min": round(lo, 3),
+            "avg": round(avg, 3),
+            "max": round(hi, 3),
+        }
+
+    def nbytes(self) -> int:
+        arrays = {id(a): a for a in (self.mins, self.avgs, self.maxs)}
+        return sum(a.itemsize * len(a) for a in arrays.values())
+
+
+class MetricSeries:
+    """All downsampling tiers for a single metric"""
+
+    def __init__(self, tiers: Iterable[Tuple[int, int]] = DEFAULT_TIERS):
+        # The finest tier is usually one sample per bucket, so min/max would repeat the average
+        self.tiers = [_Tier(res, cap, extremes=k > 0) for k, (res, cap) in enumerate(sorted(tiers))]
+        self.last_value: Optional[float] = None
+        self.last_ts: Optional[float] = None
+
+    def add(self, ts: float, value: float):
+        for tier in self.tiers:
+            tier.add(ts, value)
+        self.last_value = value
+        self.last_ts = ts
+
+    def pick_tier(self, start: float, resolution: Optional[int] = None) -> _Tier:
+        """Explicit resolution if given, else the finest tier that still reaches back to `start`"""
+        if resolution is not None:
+            for tier in self.tiers:
+                if tier.resolution >= resolution:
+                    return tier
+            return self.tiers[-1]
+        for tier in self.tiers:
+            oldest = tier.oldest_ts()
+            if oldest is not None and oldest <= start:
+                return tier
+            if tier.count < tier.capacity:
+                # Ring not yet full, so nothing older was ever dropped
+                return tier
+        return self.tiers[-1]
+
+
+class MetricStore:
+    """
+    Thread-safe registry of metric series. Series are created on first record.
+    Query by time range; the tier is chosen automatically unless requested.
+    """
+
+    def __init__(self, tiers: Iterable[Tuple[int, int]] = DEFAULT_TIERS):
+        self._tiers = list(tiers)
+        self._series: Dict[str, MetricSeries] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: Optional[float], ts: Optional[float] = None):
+        """Record one sample; None values are skipped"""
+        if value is None:
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = MetricSeries(self._tiers)
+            series.add(ts, float(value))
+
+    def record_many(self, values: Dict[str, Optional[float]], ts: Optional[float] = None):
+        """Record several metrics sampled at the same instant"""
+        ts = time.time() if ts is None else ts
+        for name, value in values.items():
+            self.record(name, value, ts)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._series)
+
+    def recent(self, name: str, n: int = 20) -> List[float]:
+        """Last `n` values from the finest tier (for sparkline-style history)"""
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                return []
+            return [round(v, 1) for v in series.tiers[0].last_values(n)]
+
+    def query(self, name: str, start: Optional[float] = None, end: Optional[float] = None,
+              resolution: Optional[int] = None) -> Dict:
+        """
+        Points for `name` between `start` and `end` (unix seconds; default: last hour).
+        Returns {"metric", "resolution", "points": [{"t", "min", "avg", "max"}, ...]}.
+        """
+        end = time.time() if end is None else end
+        start = end - 3600 if start is None else start
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                return {"metric": name, "resolution": None, "points": []}
+            tier = series.pick_tier(start, resolution)
+            return {
+                "metric": name,
+                "resolution": tier.resolution,
+                "points": tier.points(start, end),
+            }
+
+    def memory_bytes(self) -> int:
+        """Approximate buffer memory held by all series"""
+        with self._lock:
+            return sum(t.nbytes() for s in self._series.values() for t in s.tiers)
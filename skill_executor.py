@@ -0,0 +1,182 @@
+"""
+Async execution engine for OmniMind skills.
+Runs blocking skill functions on a bounded thread pool with per-skill
+timeouts, concurrency limits and cancellation, and keeps per-skill stats.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import metrics
+from utils.tracing import bind
+
+
+DEFAULT_TIMEOUT = 15.0
+DEFAULT_CONCURRENCY = 4
+
+
+class SkillTimeout(Exception):
+    """Raised when a skill does not finish within its timeout"""
+
+
+skill_seconds = metrics.histogram("skill_duration_seconds", "Skill execution time by outcome")
+
+
+class SkillStats:
+    """Counters and latency for one skill"""
+
+    def __init__(self):
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.in_flight = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        finished = self.succeeded + self.failed + self.timed_out
+        return {
+            "calls": self.calls,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "in_flight": self.in_flight,
+            "avg_ms": round(self.total_ms / finished, 1) if finished else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_error": self.last_error,
+        }
+
+
+class SkillExecutor:
+    """
+    Bounded thread pool for skills.
+
+    Each skill gets its own semaphore (`max_concurrency`) and timeout. The
+    semaphore slot is held until the worker thread really finishes, so a
+    timed-out skill that is still running keeps counting against its limit.
+    Threads cannot be killed; on timeout or cancellation the `cancel_event`
+    passed in params is set so cooperative skills can stop early.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="skill")
+        self._limits: Dict[str, Dict[str, float]] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, SkillStats] = {}
+        self._lock = threading.Lock()
+        metrics.gauge("skill_in_flight", "Skill calls currently running or waiting for a slot", fn=self._in_flight)
+
+    def _in_flight(self):
+        with self._lock:
+            return [({"skill": skill_id}, stat.in_flight) for skill_id, stat in self._stats.items()]
+
+    def configure(self, skill_id: str, timeout: Optional[float] = None,
+                  max_concurrency: Optional[int] = None):
+        self._limits[skill_id] = {
+            "timeout": float(timeout or DEFAULT_TIMEOUT),
+            "max_concurrency": int(max_concurrency or DEFAULT_CONCURRENCY),
+        }
+        self._semaphores.pop(skill_id, None)
+
+    def limits(self, skill_id: str) -> Dict[str, float]:
+        return self._limits.get(skill_id) or {"timeout": DEFAULT_TIMEOUT, "max_concurrency": DEFAULT_CONCURRENCY}
+
+    def _semaphore(self, skill_id: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(skill_id)
+        if sem is None:
+            sem = self._semaphores[skill_id] = asyncio.Semaphore(int(self.limits(skill_id)["max_concurrency"]))
+        return sem
+
+    def _stat(self, skill_id: str) -> SkillStats:
+        with self._lock:
+            stat = self._stats.get(skill_id)
+            if stat is None:
+                stat = self._stats[skill_id] = SkillStats()
+            return stat
+
+    def record(self, skill_id: str, elapsed_ms: float, error: Optional[BaseException] = None):
+        """Record a finished call (also used by the synchronous execution path)"""
+        stat = self._stat(skill_id)
+        outcome = "ok" if error is None else "timeout" if isinstance(error, SkillTimeout) else "error"
+        skill_seconds.observe(elapsed_ms / 1000, skill=skill_id, outcome=outcome)
+        with self._lock:
+            if error is None:
+                stat.succeeded += 1
+            else:
+                # Each outcome is counted once: a timeout is not also a failure
+                if outcome == "timeout":
+                    stat.timed_out += 1
+                else:
+                    stat.failed += 1
+                stat.last_error = f"{type(error).__name__}: {error}"
+            stat.total_ms += elapsed_ms
+            stat.max_ms = max(stat.max_ms, elapsed_ms)
+
+    async def run(self, skill_id: str, fn: Callable[..., Any], *args,
+                  cancel_event: Optional[threading.Event] = None,
+                  timeout: Optional[float] = None) -> Any:
+        """
+        Run `fn(*args)` on the pool under the skill's concurrency limit.
+        The timeout covers both waiting for a slot and running.
+        Raises SkillTimeout, asyncio.CancelledError or whatever `fn` raised.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout if timeout is not None else self.limits(skill_id)["timeout"]
+        deadline = loop.time() + timeout
+        sem = self._semaphore(skill_id)
+        stat = self._stat(skill_id)
+        with self._lock:
+            stat.calls += 1
+            stat.in_flight += 1
+        start = time.perf_counter()
+        acquired = False
+        try:
+            await asyncio.wait_for(sem.acquire(), max(0.0, deadline - loop.time()))
+            acquired = True
+            cf = self.pool.submit(bind(fn), *args)  # Keeps the request's trace on the worker thread
+
+            def _release(_):
+                # Slot is freed only once the worker thread is done
+                try:
+                    loop.call_soon_threadsafe(sem.release)
+                except RuntimeError:
+                    pass  # Loop already closed (shutdown)
+
+            cf.add_done_callback(_release)
+            acquired = False  # Ownership of the slot passed to the callback
+            result = await asyncio.wait_for(asyncio.wrap_future(cf), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            if cancel_event is not None:
+                cancel_event.set()
+            self.record(skill_id, (time.perf_counter() - start) * 1000, SkillTimeout(f"timed out after {timeout:g}s"))
+            raise SkillTimeout(f"{skill_id} timed out after {timeout:g}s")
+        except asyncio.CancelledError:
+            if cancel_event is not None:
+                cancel_event.set()
+            with self._lock:
+                stat.cancelled += 1
+            raise
+        except Exception as e:
+            self.record(skill_id, (time.perf_counter() - start) * 1000, e)
+            raise
+        finally:
+            if acquired:
+                sem.release()
+            with self._lock:
+                stat.in_flight -= 1
+        self.record(skill_id, (time.perf_counter() - start) * 1000)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for skill_id, stat in self._stats.items():
+                out[skill_id] = {**stat.to_dict(), **self.limits(skill_id)}
+            return out
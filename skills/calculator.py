@@ -1,15 +1,441 @@
-"""Math calculator"""
+"""
+Math calculator.
+
+Expressions are parsed with `ast` once, checked against a whitelist and
+compiled into a tree of small closures; compiled expressions are cached, so
+repeated or vectorised evaluation never re-parses. Work is bounded: expression
+length and node count are capped, integer results may not exceed MAX_INT_BITS
+(so `9**9**9` is rejected before it is computed) and ranges are capped at
+MAX_RANGE elements.
+
+Supported:
+    2^10, 15% of 240, sqrt(2) * pi, log(100, 10), 5!, factorial(20)
+    r = 3            then  pi * r^2     (variables; `ans` is the last result)
+    x^2 for x in 0..10 step 2           (vectorised over a range, NumPy if installed)
+    mean(sin(linspace(0, pi, 100)))
+"""
+
+import ast
+import math
 import re
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+MAX_EXPR_CHARS = 500
+MAX_NODES = 200
+MAX_INT_BITS = 4096        # ~1200 decimal digits
+MAX_FACTORIAL = 500
+MAX_RANGE = 1_000_000      # Elements per vectorised evaluation (NumPy)
+MAX_RANGE_PYTHON = 10_000  # Same, when falling back to a Python loop
+
+_np = None
+
+
+def _numpy():
+    """NumPy, imported on first vectorised use (None if not installed)"""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except Exception:
+            _np = False
+    return _np or None
+
+
+class CalcError(ValueError):
+    """Expression is invalid, unsupported or exceeds a limit"""
+
+
+def _is_array(value: Any) -> bool:
+    # Arrays only exist once a range has imported NumPy, so don't import it here
+    return bool(_np) and isinstance(value, _np.ndarray)
+
+
+def _check_int(value: Any) -> Any:
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise CalcError("result too large")
+    return value
+
+
+def _check_array(value: Any) -> Any:
+    if _is_array(value) and value.size > MAX_RANGE:
+        raise CalcError(f"more than {MAX_RANGE} values")
+    return value
+
+
+def _pow(base: Any, exp: Any) -> Any:
+    if isinstance(base, int) and isinstance(exp, int) and exp > 0 and abs(base) > 1:
+        if (abs(base).bit_length() - 1) * exp > MAX_INT_BITS:
+            raise CalcError("result too large")
+    return _check_int(base ** exp)
+
+
+def _mul(a: Any, b: Any) -> Any:
+    if isinstance(a, int) and isinstance(b, int) and a.bit_length() + b.bit_length() > MAX_INT_BITS + 1:
+        raise CalcError("result too large")
+    return _check_int(a * b)
+
+
+def _factorial(n: Any) -> int:
+    if isinstance(n, float) and n.is_integer():
+        n = int(n)
+    if not isinstance(n, int) or n < 0:
+        raise CalcError("factorial needs a non-negative integer")
+    if n > MAX_FACTORIAL:
+        raise CalcError("result too large")
+    return math.factorial(n)
+
+
+def _round(x: Any, ndigits: Any = None) -> Any:
+    # round(1, -10**9) builds a 10**(10**9) divisor; digits beyond the int cap change nothing anyway
+    if ndigits is None:
+        return round(x)
+    if not isinstance(ndigits, int):
+        raise CalcError("round needs a whole number of digits")
+    limit = MAX_INT_BITS // 3
+    return round(x, max(-limit, min(limit, ndigits)))
+
+
+def _array_fn(name: str, scalar: Callable) -> Callable:
+    """Use the NumPy ufunc of the same name for arrays, the math function otherwise"""
+    def fn(*args):
+        if any(_is_array(a) for a in args):
+            return getattr(_numpy(), name)(*args)
+        return scalar(*args)
+    return fn
+
+
+def _log(x, base=None):
+    if _is_array(x):
+        np = _numpy()
+        return np.log(x) if base is None else np.log(x) / np.log(base)
+    return math.log(x) if base is None else math.log(x, base)
+
+
+def _aggregate(name: str, scalar: Callable) -> Callable:
+    def fn(*args):
+        if len(args) == 1 and _is_array(args[0]):
+            return getattr(_numpy(), name)(args[0]).item()
+        return scalar(*args)
+    return fn
+
+
+def _arange(start, stop=None, step=1):
+    if stop is None:
+        start, stop = 0, start
+    np = _numpy()
+    if np is None:
+        raise CalcError("ranges need NumPy; use 'for x in a..b' instead")
+    if step == 0 or (stop - start) / step > MAX_RANGE:
+        raise CalcError(f"more than {MAX_RANGE} values")
+    return np.arange(start, stop, step)
+
+
+def _linspace(start, stop, num=50):
+    np = _numpy()
+    if np is None:
+        raise CalcError("linspace needs NumPy")
+    if int(num) > MAX_RANGE:
+        raise CalcError(f"more than {MAX_RANGE} values")
+    return np.linspace(start, stop, int(num))
+
+
+FUNCTIONS: Dict[str, Callable] = {
+    "sqrt": _array_fn("sqrt", math.sqrt),
+    "exp": _array_fn("exp", math.exp),
+    "sin": _array_fn("sin", math.sin),
+    "cos": _array_fn("cos", math.cos),
+    "tan": _array_fn("tan", math.tan),
+    "asin": _array_fn("arcsin", math.asin),
+    "acos": _array_fn("arccos", math.acos),
+    "atan": _array_fn("arctan", math.atan),
+    "sinh": _array_fn("sinh", math.sinh),
+    "cosh": _array_fn("cosh", math.cosh),
+    "tanh": _array_fn("tanh", math.tanh),
+    "floor": _array_fn("floor", math.floor),
+    "ceil": _array_fn("ceil", math.ceil),
+    "abs": _array_fn("abs", abs),
+    "round": _array_fn("round", _round),
+    "radians": _array_fn("radians", math.radians),
+    "degrees": _array_fn("degrees", math.degrees),
+    "log10": _array_fn("log10", math.log10),
+    "log2": _array_fn("log2", math.log2),
+    "log": _log,
+    "ln": _array_fn("log", math.log),
+    "factorial": _factorial,
+    "gcd": math.gcd,
+    "lcm": math.lcm,
+    "hypot": math.hypot,
+    "sum": _aggregate("sum", lambda *a: sum(a)),
+    "mean": _aggregate("mean", lambda *a: sum(a) / len(a)),
+    "min": _aggregate("min", min),
+    "max": _aggregate("max", max),
+    "range": _arange,
+    "linspace": _linspace,
+}
+
+CONSTANTS: Dict[str, float] = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+
+_BINOPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: lambda a, b: _check_int(a + b),
+    ast.Sub: lambda a, b: _check_int(a - b),
+    ast.Mult: _mul,
+    ast.Div: lambda a, b: a / b,
+    ast.FloorDiv: lambda a, b: a // b,
+    ast.Mod: lambda a, b: a % b,
+    ast.Pow: _pow,
+}
+
+_UNARYOPS: Dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: lambda a: +a,
+    ast.USub: lambda a: -a,
+}
+
+Env = Dict[str, Any]
+Compiled = Callable[[Env], Any]
+
+
+def _compile_node(node: ast.AST) -> Compiled:
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise CalcError("only numbers are allowed")
+        _check_int(value)
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        def lookup(env):
+            if name in env:
+                return env[name]
+            if name in CONSTANTS:
+                return CONSTANTS[name]
+            raise CalcError(f"unknown variable '{name}'")
+        return lookup
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        op = _BINOPS[type(node.op)]
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda env: _check_array(op(left(env), right(env)))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARYOPS:
+        op = _UNARYOPS[type(node.op)]
+        operand = _compile_node(node.operand)
+        return lambda env: op(operand(env))
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise CalcError("unknown function")
+        if node.keywords:
+            raise CalcError("keyword arguments are not supported")
+        fn = FUNCTIONS[node.func.id]
+        args = [_compile_node(a) for a in node.args]
+        return lambda env: _check_int(_check_array(fn(*[a(env) for a in args])))
+
+    raise CalcError(f"unsupported syntax: {type(node).__name__}")
+
+
+_PERCENT_OF = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*of\b")
+_FACTORIAL = re.compile(r"(\d+|\))\s*!")
+
+
+def normalize_expression(expression: str) -> str:
+    """Calculator notation -> Python expression syntax"""
+    expr = expression.strip().lower().rstrip("?=").strip()
+    expr = expr.replace("×", "*").replace("÷", "/").replace("−", "-").replace("^", "**")
+    expr = _PERCENT_OF.sub(r"(\1/100)*", expr)
+    # n! -> factorial(n); only for a plain number or a closing parenthesis
+    while True:
+        m = _FACTORIAL.search(expr)
+        if not m:
+            break
+        if m.group(1) == ")":
+            depth, i = 0, m.start(1)
+            while i >= 0:
+                depth += {")": 1, "(": -1}.get(expr[i], 0)
+                if depth == 0:
+                    break
+                i -= 1
+            if i < 0:
+                raise CalcError("unbalanced parentheses")
+            expr = f"{expr[:i]}factorial{expr[i:m.end(1)]}{expr[m.end():]}"
+        else:
+            expr = f"{expr[:m.start()]}factorial({m.group(1)}){expr[m.end():]}"
+    return expr
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expr: str) -> Tuple[Compiled, frozenset]:
+    """Parse and compile a normalised expression once; returns (fn, free variable names)"""
+    if len(expr) > MAX_EXPR_CHARS:
+        raise CalcError("expression too long")
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError:
+        raise CalcError("invalid expression")
+    nodes = list(ast.walk(tree))
+    if len(nodes) > MAX_NODES:
+        raise CalcError("expression too complex")
+    names = frozenset(n.id for n in nodes if isinstance(n, ast.Name)) - FUNCTIONS.keys() - CONSTANTS.keys()
+    return _compile_node(tree.body), names
+
+
+_ASSIGN = re.compile(r"^([a-z_]\w*)\s*=(?!=)\s*(.+)$")
+_RANGE = re.compile(r"^(.+?)\s+for\s+([a-z_]\w*)\s+in\s+(.+?)\s*\.\.\s*(.+?)(?:\s+step\s+(.+))?$")
+
+
+def format_result(value: Any) -> str:
+    if _is_array(value):
+        shown = ", ".join(format_result(v.item()) for v in value[:10])
+        more = f", ... ({value.size} values)" if value.size > 10 else ""
+        return f"[{shown}{more}]"
+    if isinstance(value, list):
+        shown = ", ".join(format_result(v) for v in value[:10])
+        more = f", ... ({len(value)} values)" if len(value) > 10 else ""
+        return f"[{shown}{more}]"
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.12g}"
+    return str(value)
+
+
+class Calculator:
+    """Evaluates expressions with variables (`name = expr`, `ans`) and ranges"""
+
+    def __init__(self):
+        self.variables: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def evaluate(self, expression: str) -> Any:
+        expr = normalize_expression(expression)
+        assign = _ASSIGN.match(expr)
+        target = None
+        if assign:
+            target, expr = assign.group(1), assign.group(2)
+            if target in FUNCTIONS or target in CONSTANTS:
+                raise CalcError(f"'{target}' is reserved")
+
+        rng = _RANGE.match(expr)
+        try:
+            if rng:
+                value = self._evaluate_range(*rng.groups())
+            else:
+                fn, _ = compile_expression(expr)
+                value = fn(dict(self.variables))
+        except CalcError:
+            raise
+        except ZeroDivisionError:
+            raise CalcError("division by zero")
+        except OverflowError:
+            raise CalcError("result too large")
+        except (ValueError, TypeError) as e:
+            raise CalcError(str(e))
+
+        with self._lock:
+            self.variables["ans"] = value
+            if target:
+                self.variables[target] = value
+        return value
+
+    def _evaluate_range(self, body: str, var: str, start: str, stop: str, step: Optional[str]) -> Any:
+        """`body for var in start..stop [step s]`, inclusive of stop"""
+        env = dict(self.variables)
+        start_v = compile_expression(start)[0](env)
+        stop_v = compile_expression(stop)[0](env)
+        step_v = compile_expression(step)[0](env) if step else 1
+        if not step_v or (stop_v - start_v) / step_v < 0:
+            raise CalcError("empty range")
+        count = int((stop_v - start_v) / step_v) + 1
+        fn, _ = compile_expression(body)
+        np = _numpy()
+        if np is not None:
+            if count > MAX_RANGE:
+                raise CalcError(f"more than {MAX_RANGE} values")
+            env[var] = start_v + step_v * np.arange(count)
+            with np.errstate(all="ignore"):
+                result = fn(env)
+                if _is_array(result) and result.dtype.kind in "iu" and not self._exact_ints(fn, env, var, result):
+                    # int64 wrapped around: redo it with Python ints, which are checked like scalars
+                    if count > MAX_RANGE_PYTHON:
+                        raise CalcError("result too large")
+                    return self._python_range(fn, env, var, start_v, step_v, count)
+            # A body that ignores the variable evaluates to a scalar
+            return result if _is_array(result) else np.full(count, result)
+        if count > MAX_RANGE_PYTHON:
+            raise CalcError(f"more than {MAX_RANGE_PYTHON} values without NumPy")
+        return self._python_range(fn, env, var, start_v, step_v, count)
+
+    @staticmethod
+    def _exact_ints(fn: Callable, env: Dict[str, Any], var: str, result: Any) -> bool:
+        """
+        Whether an int64 range result is exact: NumPy integer overflow wraps
+        silently, so the body is re-run in float64 and both must agree (and
+        stay within float64's exact integer range).
+        """
+        try:
+            approx = fn({**env, var: env[var].astype("float64")})
+        except (ArithmeticError, ValueError, TypeError):
+            return False
+        return _is_array(approx) and approx.shape == result.shape and \
+            bool(abs(approx).max() < 2.0 ** 53) and bool((approx == result).all())
+
+    @staticmethod
+    def _python_range(fn: Callable, env: Dict[str, Any], var: str, start_v: Any, step_v: Any,
+                      count: int) -> List[Any]:
+        out = []
+        for i in range(count):
+            env[var] = start_v + step_v * i
+            out.append(fn(env))
+        return out
+
+    def calculate(self, expression: str) -> str:
+        try:
+            value = format_result(self.evaluate(expression))
+            assign = _ASSIGN.match(normalize_expression(expression))
+            return f"{assign.group(1)} = {value}" if assign else f"{expression} = {value}"
+        except CalcError as e:
+            return f"Cannot calculate '{expression}': {e}"
+        except Exception:
+            return f"Cannot calculate '{expression}'"
+
+
+# Global instance
+calculator = Calculator()
+
+_PREFIX = re.compile(r"^\s*(?:please\s+)?(?:calculate|compute|evaluate|solve|what is|what's|whats)\s+", re.IGNORECASE)
+
+
+def math_expression(message: str) -> Optional[str]:
+    """
+    The expression in a chat message if it looks like arithmetic (parses and
+    contains an operator, function call or range), else None. Used by the router.
+    """
+    expr = _PREFIX.sub("", message).strip()
+    if not expr or len(expr) > MAX_EXPR_CHARS:
+        return None
+    try:
+        normalized = normalize_expression(expr)
+        assign = _ASSIGN.match(normalized)
+        body = assign.group(2) if assign else normalized
+        rng = _RANGE.match(body)
+        if rng:
+            return expr
+        fn, names = compile_expression(body)
+    except CalcError:
+        return None
+    if names - calculator.variables.keys():
+        return None  # Words that aren't known variables: prose, not math
+    tree = ast.parse(body, mode="eval")
+    if assign or any(isinstance(n, (ast.BinOp, ast.Call)) for n in ast.walk(tree)):
+        return expr
+    return None
+
 
 def calculate(expression):
     """Safely evaluate math expressions"""
-    try:
-        # Remove any non-math characters
-        safe_expr = re.sub(r'[^0-9+\-*/().\s]', '', expression)
-        
-        # Evaluate safely
-        result = eval(safe_expr, {"__builtins__": {}}, {})
-        
-        return f"{expression} = {result}"
-    except:
-        return f"Cannot calculate '{expression}'"
+    return calculator.calculate(expression)
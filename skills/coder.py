@@ -1,14 +1,14 @@
 from typing import Dict
 
-from brain.ollama_interface import OllamaInterface
+from brain.model_router import model_router
 
 
 def generate_code(task_description: str) -> Dict[str, str]:
     """
-    Uses CodeLlama via Ollama to generate code for the requested task.
+    Uses the router's code model (CodeLlama by default) to generate code for the requested task.
     Does not execute code. Returns a dict with 'explanation' and 'code'.
     """
-    ollama = OllamaInterface(model="codellama:7b-instruct")
+    ollama = model_router.client("code", caller="coder")
     system_prompt = (
         "You are a careful coding assistant. Generate minimal, correct code and a brief explanation. "
         "Do not include dangerous commands."
@@ -7,6 +7,8 @@ import requests
 from typing import List, Dict
 from datetime import datetime
 
+from skills.feeds import fetch_feed
+
 def get_detailed_news(topic: str = "India", max_articles: int = 5) -> str:
     """Get detailed news with AI summaries and analysis"""
     try:
@@ -21,8 +23,7 @@ def get_detailed_news(topic: str = "India", max_articles: int = 5) -> str:
         
         for source_url in sources:
             try:
-                import feedparser
-                feed = feedparser.parse(source_url)
+                feed = fetch_feed(source_url)
                 
                 for entry in feed.entries[:max_articles]:
                     title = entry.get('title', '')
@@ -59,8 +60,9 @@ def get_detailed_news(topic: str = "India", max_articles: int = 5) -> str:
         
         for i, article in enumerate(all_articles[:max_articles], 1):
             try:
-                from brain.ollama_interface import OllamaInterface
-                ollama = OllamaInterface(model="qwen2.5:3b")
+                from brain.llm_scheduler import BACKGROUND
+                from brain.model_router import model_router
+                ollama = model_router.client("summary", BACKGROUND, caller="news")
                 
                 # Create comprehensive AI analysis
                 analysis_prompt = f"""
@@ -111,8 +113,7 @@ def get_breaking_news() -> str:
         
         for source in breaking_sources:
             try:
-                import feedparser
-                feed = feedparser.parse(source)
+                feed = fetch_feed(source)
                 
                 for entry in feed.entries[:3]:
                     title = entry.get('title', '')
@@ -143,8 +144,9 @@ def get_breaking_news() -> str:
         
         for i, news in enumerate(latest_news, 1):
             try:
-                from brain.ollama_interface import OllamaInterface
-                ollama = OllamaInterface(model="qwen2.5:3b")
+                from brain.llm_scheduler import BACKGROUND
+                from brain.model_router import model_router
+                ollama = model_router.client("summary", BACKGROUND, caller="news")
                 
                 urgent_analysis = ollama.generate(
                     "You are a breaking news analyst. Provide immediate, clear analysis of urgent news.",
@@ -0,0 +1,47 @@
+"""
+RSS/Atom fetching shared by the news skills.
+Fetches go through requests (so they have a timeout, which feedparser's own
+URL fetching lacks) and are timed and counted per source host.
+
+With config.json "feed_mirror" set, https://host/path?q is fetched from
+<feed_mirror>/host/path?q instead (a local caching proxy, or the benchmark's
+fake feed server).
+"""
+
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from utils.config import get as config_get
+from utils.metrics import metrics, track
+from utils.tracing import span
+
+try:
+    import feedparser
+except ImportError:
+    feedparser = None
+
+FEED_TIMEOUT = 10
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+feed_seconds = metrics.histogram("feed_fetch_seconds", "Time to download and parse a feed")
+feed_fetches = metrics.counter("feed_fetches_total", "Feed fetches by source and outcome (ok, empty, error)")
+
+
+def fetch_feed(url: str, timeout: float = FEED_TIMEOUT, headers: Optional[Dict[str, str]] = None) -> Any:
+    """Parsed feed for `url`; raises on network errors or if feedparser is missing"""
+    if feedparser is None:
+        raise ImportError("feedparser is not installed")
+    parsed = urlparse(url)
+    source = parsed.netloc or url
+    mirror = config_get('feed_mirror')
+    if mirror and parsed.netloc:
+        url = f"{mirror.rstrip('/')}/{parsed.netloc}{parsed.path}" + (f"?{parsed.query}" if parsed.query else "")
+    with track(feed_seconds, feed_fetches, source=source) as outcome, span("feed", source=source):
+        response = requests.get(url, headers=headers or {'User-Agent': USER_AGENT}, timeout=timeout)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
+        if not feed.entries:
+            outcome["outcome"] = "empty"
+        return feed
@@ -0,0 +1,415 @@
+"""
+Local file content index.
+
+Crawls SAFE_BASE_DIR (the user's home by default) for text-like files and
+keeps an SQLite FTS5 inverted index of their contents in
+memory/file_index.db, so "find ... in my files" is answered in milliseconds.
+
+Updates are incremental: a file is re-read only when its mtime or size
+changes, deleted files are dropped, and extraction runs on a thread pool.
+With `watchdog` installed (inotify on Linux) changes are picked up as they
+happen; otherwise the tree is re-scanned periodically. Every path that goes
+in or comes out is checked with normalize_safe_path.
+
+CLI:
+    python -m skills.file_index update
+    python -m skills.file_index search "quarterly report"
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from utils.safety_guard import SAFE_BASE_DIR, normalize_safe_path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except Exception:  # watchdog not installed; fall back to periodic rescans
+    FileSystemEventHandler = object
+    Observer = None
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEX_PATH = os.path.join(ROOT_DIR, 'memory', 'file_index.db')
+
+TEXT_EXTENSIONS = {
+    '.txt', '.md', '.rst', '.log', '.csv', '.tsv', '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg',
+    '.xml', '.html', '.htm', '.css', '.py', '.js', '.ts', '.tsx', '.jsx', '.java', '.c', '.h', '.cpp',
+    '.hpp', '.cs', '.go', '.rs', '.rb', '.php', '.sh', '.bat', '.ps1', '.sql', '.tex',
+}
+SKIP_DIRS = {'node_modules', '__pycache__', 'venv', 'env', 'site-packages', 'AppData', 'Library', 'snap'}
+MAX_FILE_BYTES = 2 * 1024 * 1024
+MAX_INDEXED_CHARS = 200_000
+EXTRACT_WORKERS = 4
+WRITE_BATCH = 256
+POLL_INTERVAL = 300.0       # Full rescan interval without a file watcher
+RESCAN_INTERVAL = 3600.0    # Safety-net rescan when the watcher is running
+DEBOUNCE = 2.0              # Seconds to collect watcher events before applying them
+NAME_WEIGHT = 5.0           # bm25 weight of the file name relative to the contents
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+    name, body, tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+def is_indexable(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in TEXT_EXTENSIONS
+
+
+def extract_text(path: str) -> Optional[str]:
+    """File contents as text, or None for binary/unreadable files"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(MAX_FILE_BYTES)
+    except OSError:
+        return None
+    if b'\x00' in data[:1024]:
+        return None
+    return data.decode('utf-8', errors='ignore')[:MAX_INDEXED_CHARS]
+
+
+def _match_query(query: str) -> Optional[str]:
+    """Free text -> FTS5 query: all terms required, last one as a prefix"""
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    quoted = ['"%s"' % t for t in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, index: "FileIndex"):
+        self.index = index
+
+    def on_any_event(self, event):
+        for attr in ('src_path', 'dest_path'):
+            path = getattr(event, attr, None)
+            if path:
+                self.index.mark_dirty(os.fsdecode(path))
+
+
+class FileIndex:
+    """Incrementally maintained full-text index of files under a root directory"""
+
+    def __init__(self, root: str = SAFE_BASE_DIR, path: str = INDEX_PATH):
+        self.root = normalize_safe_path(root)
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._observer = None
+        self.last_update: Dict[str, Any] = {}
+
+    # Storage
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')  # Searches don't wait for the crawler
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _write_conn(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self._writer = self._connect()
+        return self._writer
+
+    def _read_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _store(self, conn: sqlite3.Connection, items: List[Tuple[str, float, int, Optional[str]]]):
+        for path, mtime, size, text in items:
+            row = conn.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+            if row:
+                conn.execute('DELETE FROM files_fts WHERE rowid = ?', (row[0],))
+                conn.execute('UPDATE files SET mtime = ?, size = ? WHERE id = ?', (mtime, size, row[0]))
+                file_id = row[0]
+            else:
+                file_id = conn.execute('INSERT INTO files (path, mtime, size) VALUES (?, ?, ?)',
+                                       (path, mtime, size)).lastrowid
+            # Unreadable files keep their files row (so they aren't retried until they change)
+            if text is not None:
+                name = os.path.relpath(path, self.root).replace(os.sep, ' ')
+                conn.execute('INSERT INTO files_fts (rowid, name, body) VALUES (?, ?, ?)', (file_id, name, text))
+
+    def _remove(self, conn: sqlite3.Connection, paths: Sequence[str]):
+        for path in paths:
+            row = conn.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+            if row:
+                conn.execute('DELETE FROM files_fts WHERE rowid = ?', (row[0],))
+                conn.execute('DELETE FROM files WHERE id = ?', (row[0],))
+
+    # Crawling
+
+    def walk(self, top: Optional[str] = None) -> Iterator[Tuple[str, float, int]]:
+        """(path, mtime, size) of indexable files; hidden, vendored and symlinked dirs are skipped"""
+        stack = [top or self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if entry.name.startswith('.') or entry.name in SKIP_DIRS:
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and is_indexable(entry.name):
+                            st = entry.stat(follow_symlinks=False)
+                            if st.st_size <= MAX_FILE_BYTES:
+                                yield entry.path, st.st_mtime, st.st_size
+                    except OSError:
+                        continue
+
+    def _extract_and_store(self, changed: List[Tuple[str, float, int]]) -> int:
+        if not changed:
+            return 0
+        conn = self._write_conn()
+        with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="file-index") as pool:
+            for start in range(0, len(changed), WRITE_BATCH):
+                batch = changed[start:start + WRITE_BATCH]
+                texts = pool.map(extract_text, [path for path, _, _ in batch])
+                with self._write_lock:
+                    self._store(conn, [(p, m, s, t) for (p, m, s), t in zip(batch, texts)])
+                    conn.commit()
+        return len(changed)
+
+    def update(self) -> Dict[str, Any]:
+        """Incremental crawl: re-extract new/changed files, drop deleted ones"""
+        started = time.perf_counter()
+        conn = self._write_conn()
+        with self._write_lock:
+            known = {path: (mtime, size) for path, mtime, size in conn.execute('SELECT path, mtime, size FROM files')}
+        seen: Set[str] = set()
+        changed = []
+        for path, mtime, size in self.walk():
+            seen.add(path)
+            if known.get(path) != (mtime, size):
+                changed.append((path, mtime, size))
+        removed = [path for path in known if path not in seen]
+        indexed = self._extract_and_store(changed)
+        with self._write_lock:
+            self._remove(conn, removed)
+            conn.commit()
+        self.last_update = {
+            "files": len(seen),
+            "indexed": indexed,
+            "removed": len(removed),
+            "seconds": round(time.perf_counter() - started, 2),
+            "finished_at": time.time(),
+        }
+        return self.last_update
+
+    # Watching
+
+    def mark_dirty(self, path: str):
+        with self._dirty_lock:
+            self._dirty.add(path)
+
+    def _apply_dirty(self):
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        changed, removed = [], []
+        for path in dirty:
+            try:
+                path = normalize_safe_path(path)
+            except ValueError:
+                continue
+            rel_parts = os.path.relpath(path, self.root).split(os.sep)
+            if any(p.startswith('.') or p in SKIP_DIRS for p in rel_parts):
+                continue
+            if os.path.isdir(path):
+                changed.extend(self.walk(path))
+            elif os.path.isfile(path) and is_indexable(path):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if st.st_size <= MAX_FILE_BYTES:
+                    changed.append((path, st.st_mtime, st.st_size))
+            else:
+                removed.append(path)
+        self._extract_and_store(changed)
+        if removed:
+            conn = self._write_conn()
+            with self._write_lock:
+                self._remove(conn, removed)
+                # A removed directory takes its files with it
+                for path in removed:
+                    prefix = path.rstrip(os.sep) + os.sep
+                    rows = conn.execute('SELECT path FROM files WHERE substr(path, 1, ?) = ?',
+                                        (len(prefix), prefix)).fetchall()
+                    self._remove(conn, [r[0] for r in rows])
+                conn.commit()
+
+    def _start_watcher(self) -> bool:
+        if Observer is None:
+            return False
+        try:
+            observer = Observer()
+            observer.schedule(_ChangeHandler(self), self.root, recursive=True)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:  # e.g. inotify watch limit reached
+            print(f"File watcher unavailable, falling back to periodic rescans: {e}")
+            return False
+        self._observer = observer
+        return True
+
+    def start(self):
+        """Initial crawl, then keep the index current in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _loop():
+            watching = self._start_watcher()
+            interval = RESCAN_INTERVAL if watching else POLL_INTERVAL
+            next_scan = 0.0
+            while not self._stop.is_set():
+                try:
+                    if time.monotonic() >= next_scan:
+                        self.update()
+                        next_scan = time.monotonic() + interval
+                    elif watching:
+                        self._apply_dirty()
+                except Exception as e:
+                    print(f"File index update failed: {e}")
+                    next_scan = time.monotonic() + interval
+                self._stop.wait(DEBOUNCE if watching else min(interval, 30.0))
+
+        self._thread = threading.Thread(target=_loop, name="file-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    # Querying
+
+    def search(self, query: str, limit: int = 10, within: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Ranked [{path, score, snippet}] for files matching all query terms"""
+        match = _match_query(query)
+        if match is None:
+            return []
+        sql = ("SELECT f.path, bm25(files_fts, ?, 1.0) AS score, snippet(files_fts, 1, '[', ']', '…', 12) "
+               "FROM files_fts JOIN files f ON f.id = files_fts.rowid WHERE files_fts MATCH ?")
+        args: List[Any] = [NAME_WEIGHT, match]
+        if within:
+            prefix = normalize_safe_path(within).rstrip(os.sep) + os.sep
+            sql += " AND substr(f.path, 1, ?) = ?"
+            args += [len(prefix), prefix]
+        sql += " ORDER BY score LIMIT ?"
+        args.append(limit * 2)
+        try:
+            rows = self._read_conn().execute(sql, args).fetchall()
+        except sqlite3.Error:
+            return []
+        results = []
+        for path, score, snippet in rows:
+            try:
+                path = normalize_safe_path(path)  # SAFE_BASE_DIR may have changed since indexing
+            except ValueError:
+                continue
+            results.append({"path": path, "score": float(f"{-score:.4g}"), "snippet": " ".join(snippet.split())})
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            count = self._read_conn().execute('SELECT count(*) FROM files').fetchone()[0]
+        except sqlite3.Error:
+            count = 0
+        return {"root": self.root, "files": count, "running": self.running,
+                "watching": self._observer is not None, "last_update": self.last_update}
+
+
+# Global instance
+file_index = FileIndex()
+
+_QUERY_PREFIX = re.compile(r"^\s*(?:please\s+)?(?:find|search(?: for)?|look for|locate)\s+", re.IGNORECASE)
+_QUERY_SUFFIX = re.compile(r"\s+(?:in|from|across|among)\s+my\s+(?:files|documents|docs|notes|folders?|computer)\s*$",
+                           re.IGNORECASE)
+
+
+def search_files(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Search the index, starting the background indexer on first use"""
+    file_index.start()
+    return file_index.search(query, limit)
+
+
+def search_files_skill(query: str, params: Dict[str, Any]) -> str:
+    """Skill entry point (see skills/manifest.json)"""
+    terms = _QUERY_SUFFIX.sub("", _QUERY_PREFIX.sub("", query)).strip(" ?.")
+    if not terms:
+        return "What should I look for in your files?"
+    results = search_files(terms, int(params.get("limit", 5)))
+    if not results:
+        if not file_index.last_update:
+            return "Indexing your files now; try again in a moment."
+        return f"No files matching '{terms}'."
+    lines = [f"Files matching '{terms}':"]
+    for i, r in enumerate(results, 1):
+        lines.append(f"{i}. {r['path']}\n   {r['snippet']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Build or query the local file content index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("update", help="incrementally crawl SAFE_BASE_DIR")
+    search_cmd = sub.add_parser("search", help="search indexed files")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "update":
+        print(file_index.update())
+    else:
+        start = time.perf_counter()
+        results = file_index.search(args.query, args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for r in results:
+            print(f"{r['score']:8.2f}  {r['path']}\n          {r['snippet']}")
+        print(f"({len(results)} results, {elapsed_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
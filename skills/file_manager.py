@@ -1,16 +1,148 @@
+import heapq
+import mmap
 import os
+from itertools import islice
 from typing import Dict, Any, List, Optional
+from utils.cache import TTLCache
 from utils.safety_guard import normalize_safe_path
 
 
-ALLOWED_ACTIONS = {"list", "read", "create"}
+ALLOWED_ACTIONS = {"list", "read", "tail", "create"}
 
+DEFAULT_READ_BYTES = 64 * 1024
+MAX_READ_BYTES = 1024 * 1024        # Size guard: no single read returns more than this
+MMAP_THRESHOLD = 4 * 1024 * 1024    # Larger files are read through mmap instead of seek/read
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+MAX_LINES = 1000
+MAX_LINE_CHARS = 4096
 
-def manage_files(action: str, path: str, content: Optional[str] = None) -> Dict[str, Any]:
+# Short-lived stat results so paging back and forth doesn't re-stat every entry.
+# Directory listings only: reads take the size from the open handle, since a
+# growing log or a truncated file must not be read with a stale size.
+_stat_cache = TTLCache(maxsize=4096, ttl=5.0)
+
+
+def cached_stat(path: str) -> os.stat_result:
+    st = _stat_cache.get(path)
+    if st is None:
+        st = os.stat(path)
+        _stat_cache.set(path, st)
+    return st
+
+
+def _utf8_complete(data: bytes) -> int:
+    """Length of `data` without a trailing, partially read UTF-8 character"""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 != 0x80:  # Lead byte (or ASCII)
+            need = 1 if byte < 0x80 else 2 if byte >> 5 == 0x6 else 3 if byte >> 4 == 0xE else 4
+            return len(data) if need <= back else len(data) - back
+    return len(data)
+
+
+def read_range(path: str, offset: int = 0, length: int = DEFAULT_READ_BYTES) -> Dict[str, Any]:
+    """Read `length` bytes from `offset` as text; `next_offset` continues where this stopped"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        offset = max(0, min(offset, size))
+        length = max(0, min(length, MAX_READ_BYTES, size - offset))
+        if length == 0:
+            data = b""
+        elif size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = mm[offset:offset + length]
+        else:
+            f.seek(offset)
+            data = f.read(length)
+    end = offset + len(data)
+    if end < size:
+        data = data[:_utf8_complete(data)]
+        end = offset + len(data)
+    return {
+        "path": path,
+        "content": data.decode('utf-8', errors='ignore'),
+        "offset": offset,
+        "next_offset": end if end < size else None,
+        "size": size,
+        "truncated": end < size,
+    }
+
+
+def read_lines(path: str, start: int = 0, count: int = 100) -> Dict[str, Any]:
+    """Lines [start, start+count) streamed from the file; memory stays bounded by `count`"""
+    if start < 0:
+        raise ValueError("start_line must be 0 or more")
+    count = max(0, min(count, MAX_LINES))
+    with open(path, 'rb') as f:
+        chunk = list(islice(f, start, start + count + 1))
+    more = len(chunk) > count
+    lines = [line[:MAX_LINE_CHARS].decode('utf-8', errors='ignore').rstrip('\r\n') for line in chunk[:count]]
+    return {
+        "path": path,
+        "lines": lines,
+        "start": start,
+        "next_line": start + len(lines) if more else None,
+        "truncated": more,
+    }
+
+
+def tail_lines(path: str, count: int = 50) -> Dict[str, Any]:
+    """Last `count` lines, found by scanning backwards through an mmap of the file"""
+    count = max(1, min(count, MAX_LINES))
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return {"path": path, "lines": [], "size": 0}  # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)  # The file may have changed between fstat and mapping
+            end = size - 1 if mm[size - 1:size] == b"\n" else size
+            pos = end
+            for _ in range(count):
+                pos = mm.rfind(b"\n", max(0, end - MAX_READ_BYTES), pos)
+                if pos < 0:
+                    break
+            data = mm[pos + 1 if pos >= 0 else max(0, end - MAX_READ_BYTES):end]
+    lines = [line[:MAX_LINE_CHARS].decode('utf-8', errors='ignore').rstrip('\r') for line in data.split(b"\n")]
+    return {"path": path, "lines": lines[-count:], "size": size}
+
+
+def list_directory(path: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    One page of a directory in name order, streamed with os.scandir.
+    Only `limit` entries are kept in memory (heap selection rather than a full
+    sort) and only those are stat'ed. Pass `next_cursor` back to get the next page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    with os.scandir(path) as it:
+        candidates = (e for e in it if cursor is None or e.name > cursor)
+        page = heapq.nsmallest(limit + 1, candidates, key=lambda e: e.name)
+    more = len(page) > limit
+    page = page[:limit]
+    items: List[Dict[str, Any]] = []
+    for entry in page:
+        item: Dict[str, Any] = {"name": entry.name, "is_dir": entry.is_dir()}
+        try:
+            st = cached_stat(entry.path)
+            item["size"] = st.st_size
+            item["mtime"] = st.st_mtime
+        except OSError:
+            pass  # Broken symlink or vanished entry
+        items.append(item)
+    return {
+        "path": path,
+        "entries": [item["name"] for item in items],
+        "items": items,
+        "next_cursor": page[-1].name if more else None,
+    }
+
+
+def manage_files(action: str, path: str, content: Optional[str] = None, **options) -> Dict[str, Any]:
     """
     Safe file operations limited to user's home directory:
-    - list: list directory entries
-    - read: read text file
+    - list: one page of directory entries (options: cursor, limit)
+    - read: part of a text file (options: offset, length or start_line, max_lines)
+    - tail: last lines of a file (options: lines)
     - create: create a new text file with provided content (or empty)
     """
     if action not in ALLOWED_ACTIONS:
@@ -21,15 +153,16 @@ def manage_files(action: str, path: str, content: Optional[str] = None) -> Dict[
     if action == "list":
         if not os.path.isdir(safe_path):
             raise FileNotFoundError("Directory not found")
-        entries = sorted(os.listdir(safe_path))
-        return {"path": safe_path, "entries": entries}
+        return list_directory(safe_path, options.get("cursor"), int(options.get("limit", DEFAULT_PAGE_SIZE)))
 
-    if action == "read":
+    if action in ("read", "tail"):
         if not os.path.isfile(safe_path):
             raise FileNotFoundError("File not found")
-        with open(safe_path, 'r', encoding='utf-8', errors='ignore') as f:
-            data = f.read()
-        return {"path": safe_path, "content": data}
+        if action == "tail":
+            return tail_lines(safe_path, int(options.get("lines", 50)))
+        if "start_line" in options or "max_lines" in options:
+            return read_lines(safe_path, int(options.get("start_line", 0)), int(options.get("max_lines", 100)))
+        return read_range(safe_path, int(options.get("offset", 0)), int(options.get("length", DEFAULT_READ_BYTES)))
 
     if action == "create":
         base_dir = os.path.dirname(safe_path)
@@ -38,6 +171,7 @@ def manage_files(action: str, path: str, content: Optional[str] = None) -> Dict[
             raise FileExistsError("File already exists")
         with open(safe_path, 'w', encoding='utf-8') as f:
             f.write(content or "")
+        _stat_cache.pop(safe_path)
         return {"path": safe_path, "created": True}
 
     raise ValueError("Unhandled action")
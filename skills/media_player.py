@@ -1,7 +1,22 @@
 import webbrowser
 import subprocess
 import shlex
-from typing import Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any
+
+from utils.cache import TTLCache, normalize_key
+
+try:
+    import yt_dlp
+except Exception:  # Fall back to the yt-dlp CLI (or no direct links at all)
+    yt_dlp = None
+
+
+RESULT_TTL = 6 * 3600     # Search results for a query rarely change within hours
+FAILURE_TTL = 300         # Don't hammer YouTube for queries that found nothing
+DIRECT_WAIT = 2.0         # Seconds play_music waits for a direct link before returning
+LOOKUP_TIMEOUT = 20.0     # Seconds one lookup may take; lookups share one worker, so a hang blocks the rest
 
 
 def build_search_query(user_query: str) -> str:
@@ -24,37 +39,162 @@ def open_youtube_search(query: str) -> Optional[str]:
     return url
 
 
+def video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class YouTubeResolver:
+    """
+    Resolves a search query to the top YouTube video id.
+
+    Uses one long-lived in-process yt_dlp.YoutubeDL (so extractor setup is paid
+    once, not per call) and falls back to the yt-dlp CLI when the library is not
+    installed. Results are kept in an LRU+TTL cache keyed by the normalised
+    query, and lookups run on a single background worker so callers never wait
+    on the network unless they choose to.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = RESULT_TTL):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._ydl = None
+        self._ydl_lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ytdlp")
+
+    def _client(self):
+        if self._ydl is None:
+            self._ydl = yt_dlp.YoutubeDL({
+                "quiet": True,
+                "no_warnings": True,
+                "skip_download": True,
+                "extract_flat": True,   # Search page metadata only, no per-video extraction
+                "noplaylist": True,
+                "socket_timeout": LOOKUP_TIMEOUT,
+            })
+        return self._ydl
+
+    def _lookup(self, query: str) -> Optional[str]:
+        if yt_dlp is not None:
+            try:
+                # YoutubeDL instances are not thread-safe
+                with self._ydl_lock:
+                    info = self._client().extract_info(f"ytsearch1:{query}", download=False)
+                entries = (info or {}).get("entries") or []
+                if entries and entries[0].get("id"):
+                    return entries[0]["id"]
+                return None
+            except Exception:
+                return None
+        try:
+            cmd = [
+                "yt-dlp",
+                "--default-search", "ytsearch",
+                "--get-id",
+                "--skip-download",
+                query,
+            ]
+            out = subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL, timeout=LOOKUP_TIMEOUT)
+            lines = out.strip().splitlines()
+            return lines[0] if lines else None
+        except subprocess.TimeoutExpired:
+            # check_output has killed it; the miss is cached for FAILURE_TTL
+            print(f"yt-dlp lookup timed out after {LOOKUP_TIMEOUT:.0f}s: {query}")
+            return None
+        except Exception:
+            return None
+
+    def _resolve(self, key: str, query: str) -> Optional[str]:
+        try:
+            video_id = self._lookup(query)
+            # Cache misses too (as ""), but only briefly
+            self.cache.set(key, video_id or "", None if video_id else FAILURE_TTL)
+            return video_id
+        finally:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+
+    def cached(self, query: str) -> Optional[str]:
+        """Cached video id, "" for a cached miss, None if unknown"""
+        return self.cache.get(normalize_key(query))
+
+    def resolve_async(self, query: str) -> Future:
+        """Future for the video id; concurrent requests for the same query share one lookup"""
+        key = normalize_key(query)
+        video_id = self.cache.get(key)
+        if video_id is not None:
+            done: Future = Future()
+            done.set_result(video_id or None)
+            return done
+        with self._pending_lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._worker.submit(self._resolve, key, query)
+            return future
+
+    def resolve(self, query: str, timeout: Optional[float] = LOOKUP_TIMEOUT) -> Optional[str]:
+        """Video id, or None if not found or not resolved within `timeout` seconds"""
+        try:
+            return self.resolve_async(query).result(timeout=timeout)
+        except Exception:
+            return None
+
+    def status(self, query: str) -> Dict[str, Any]:
+        """State of a (possibly still running) lookup, for clients polling for the direct link"""
+        key = normalize_key(query)
+        video_id = self.cache.get(key)
+        if video_id:
+            return {"query": key, "status": "ready", "url": video_url(video_id)}
+        if video_id == "":
+            return {"query": key, "status": "not_found", "url": None}
+        with self._pending_lock:
+            pending = key in self._pending
+        return {"query": key, "status": "pending" if pending else "unknown", "url": None}
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "backend": "yt_dlp" if yt_dlp is not None else "cli",
+                "pending": len(self._pending)}
+
+
+# Global instance
+youtube_resolver = YouTubeResolver()
+
+
 def best_video_via_ytdlp(query: str) -> Optional[str]:
     """
-    Uses yt-dlp in "ytsearch" mode to fetch the first result URL for the query.
+    Top result URL for the query via the shared resolver (cached).
     We still do NOT autoplay; we open the URL in a browser.
     """
-    try:
-        # Using yt-dlp in a lightweight way to get first video URL
-        cmd = [
-            "yt-dlp",
-            "--default-search", "ytsearch",
-            "--get-id",
-            "--skip-download",
-            query,
-        ]
-        out = subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL)
-        video_id = out.strip().splitlines()[0]
-        if video_id:
-            return f"https://www.youtube.com/watch?v={video_id}"
-    except Exception:
-        return None
-    return None
+    video_id = youtube_resolver.resolve(query)
+    return video_url(video_id) if video_id else None
 
 
-def play_music(query: str) -> str:
+def play_music(query: str, wait: float = DIRECT_WAIT) -> str:
     """
     Public API. Prefer quick, privacy-preserving YouTube search (no autoplay).
-    If yt-dlp is available, we also fetch the top result to surface as a direct link.
+    The search page opens immediately; the top result is looked up in the
+    background and included if it arrives within `wait` seconds. Otherwise it
+    lands in the resolver cache and can be fetched later (see /api/media/direct).
     """
     q = build_search_query(query)
-    url = open_youtube_search(q)
-    direct = best_video_via_ytdlp(q)
-    if direct:
-        return f"Opened YouTube search for: '{q}'. Top result (not auto-playing): {direct}"
+    pending = youtube_resolver.resolve_async(q)
+    open_youtube_search(q)
+    try:
+        video_id = pending.result(timeout=wait)
+    except Exception:
+        video_id = None
+    if video_id:
+        return f"Opened YouTube search for: '{q}'. Top result (not auto-playing): {video_url(video_id)}"
+    if not pending.done():
+        return f"Opened YouTube search for: '{q}'. Still looking up the top result."
     return f"Opened YouTube search for: '{q}'."
+
+
+def direct_link_status(query: str) -> Dict[str, Any]:
+    """Resolver state for a raw user query (as passed to play_music)"""
+    return youtube_resolver.status(build_search_query(query))
+
+
+def play_music_skill(query: str, params: Dict[str, Any]) -> str:
+    """Skill entry point (see skills/manifest.json)"""
+    return play_music(query, wait=float(params.get("wait", DIRECT_WAIT)))
@@ -8,18 +8,28 @@ import concurrent.futures
 from typing import List, Dict, Optional
 import time
 
+from skills.wikipedia_search import wikipedia_client
+from utils.config import searxng_url, yacy_url
+from utils.metrics import metrics, track
+from utils.tracing import bind, span
+
+engine_seconds = metrics.histogram("search_engine_seconds", "Time per engine for one search, fallbacks included")
+engine_requests = metrics.counter("search_engine_requests_total", "Engine searches by outcome (ok, empty, error)")
+engine_errors = metrics.counter("search_engine_errors_total", "Failed requests to an engine instance")
+
 class MultiEngineSearch:
     def __init__(self):
+        # A configured instance (config.json / SEARXNG_URL, YACY_URL) is tried before the public ones
         self.engines = {
             'searxng': {
-                'url': 'https://searx.be',  # Public SearXNG instance
+                'url': searxng_url().rstrip('/') or 'https://searx.be',  # Public SearXNG instance
                 'backup_urls': ['https://searx.tiekoetter.com', 'https://searx.prvcy.eu']
             },
             'wikipedia': {
                 'url': 'https://en.wikipedia.org/w/api.php'
             },
             'yacy': {
-                'url': 'https://yacy.searchlab.eu',  # Public YaCy instance
+                'url': yacy_url().rstrip('/') or 'https://yacy.searchlab.eu',  # Public YaCy instance
                 'backup_urls': ['https://search.yacy.net']
             }
         }
@@ -54,44 +64,29 @@ class MultiEngineSearch:
                     
                     if results:
                         return results
+                else:
+                    engine_errors.inc(engine='searxng', status=response.status_code)
             except Exception:
+                engine_errors.inc(engine='searxng', status='exception')
                 continue
         
         return []
     
     def search_wikipedia(self, query: str, max_results: int = 3) -> List[Dict]:
-        """Search Wikipedia API"""
+        """Search Wikipedia via the shared cached client (search + extracts in one request)"""
         try:
-            # Search for pages
-            search_url = self.engines['wikipedia']['url']
-            search_params = {
-                'action': 'query',
-                'list': 'search',
-                'srsearch': query,
-                'format': 'json',
-                'srlimit': max_results
-            }
-            
-            response = requests.get(search_url, params=search_params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                results = []
-                
-                for item in data.get('query', {}).get('search', []):
-                    title = item.get('title', '')
-                    snippet = item.get('snippet', '').replace('<span class="searchmatch">', '').replace('</span>', '')
-                    page_url = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
-                    
-                    results.append({
-                        'title': title,
-                        'url': page_url,
-                        'snippet': snippet,
-                        'source': 'Wikipedia'
-                    })
-                
-                return results
+            results = []
+            for page in wikipedia_client.search(query, max_results):
+                extract = page.get('extract', '')
+                results.append({
+                    'title': page['title'],
+                    'url': page['url'],
+                    'snippet': extract[:300] + ('...' if len(extract) > 300 else ''),
+                    'source': 'Wikipedia'
+                })
+            return results
         except Exception:
-            pass
+            engine_errors.inc(engine='wikipedia', status='exception')
         
         return []
     
@@ -131,10 +126,20 @@ class MultiEngineSearch:
                     
                     if results:
                         return results
+                else:
+                    engine_errors.inc(engine='yacy', status=response.status_code)
             except Exception:
+                engine_errors.inc(engine='yacy', status='exception')
                 continue
         
         return []
+
+    def _timed(self, engine: str, fn, *args) -> List[Dict]:
+        with track(engine_seconds, engine_requests, engine=engine) as outcome, span(f"search.{engine}"):
+            results = fn(*args)
+            if not results:
+                outcome["outcome"] = "empty"
+            return results
     
     def search_all_engines(self, query: str, max_per_engine: int = 5) -> List[Dict]:
         """Search all engines concurrently with fallback"""
@@ -144,9 +149,9 @@ class MultiEngineSearch:
         with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
             # Submit all search tasks
             future_to_engine = {
-                executor.submit(self.search_searxng, query, max_per_engine): 'SearXNG',
-                executor.submit(self.search_wikipedia, query, 3): 'Wikipedia',
-                executor.submit(self.search_yacy, query, 3): 'YaCy'
+                executor.submit(bind(self._timed), 'searxng', self.search_searxng, query, max_per_engine): 'SearXNG',
+                executor.submit(bind(self._timed), 'wikipedia', self.search_wikipedia, query, 3): 'Wikipedia',
+                executor.submit(bind(self._timed), 'yacy', self.search_yacy, query, 3): 'YaCy'
             }
             
             # Collect results as they complete
@@ -197,8 +202,8 @@ class MultiEngineSearch:
             
             # Add AI summary if available
             try:
-                from brain.ollama_interface import OllamaInterface
-                ollama = OllamaInterface(model="qwen2.5:3b")
+                from brain.model_router import model_router
+                ollama = model_router.client("summary", caller="search")
                 
                 # Create summary from top results
                 top_results = results[:3]
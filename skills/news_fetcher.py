@@ -5,10 +5,8 @@ Fetches latest news from multiple sources
 
 import requests
 from datetime import datetime
-try:
-    import feedparser
-except ImportError:
-    feedparser = None
+
+from skills.feeds import fetch_feed
 
 def get_india_news():
     """Get latest India news with AI summaries"""
@@ -22,8 +20,7 @@ def get_india_news():
         
         for feed_url in feeds:
             try:
-                import feedparser
-                feed = feedparser.parse(feed_url)
+                feed = fetch_feed(feed_url)
                 
                 if feed.entries:
                     news_summaries = []
@@ -40,8 +37,9 @@ def get_india_news():
                         
                         # Get AI summary
                         try:
-                            from brain.ollama_interface import OllamaInterface
-                            ollama = OllamaInterface(model="qwen2.5:3b")
+                            from brain.llm_scheduler import BACKGROUND
+                            from brain.model_router import model_router
+                            ollama = model_router.client("summary", BACKGROUND, caller="news")
                             
                             ai_summary = ollama.generate(
                                 "You are a news analyst. Provide clear, informative summaries.",
@@ -69,27 +67,18 @@ def get_india_news():
 def get_news_web_scrape():
     """Fallback: Web scraping for news"""
     try:
-        # Simple web scraping approach
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
         # Try Google News RSS
         url = "https://news.google.com/rss/search?q=India&hl=en-IN&gl=IN&ceid=IN:en"
-        response = requests.get(url, headers=headers, timeout=10)
+        feed = fetch_feed(url)
         
-        if response.status_code == 200:
-            import feedparser
-            feed = feedparser.parse(response.content)
-            
-            if feed.entries:
-                news_text = "📰 Latest India News (Google):\n\n"
-                for i, entry in enumerate(feed.entries[:7], 1):
-                    title = entry.get('title', 'No title')
-                    import re
-                    title = re.sub('<.*?>', '', title)
-                    news_text += f"{i}. {title}\n"
-                return news_text
+        if feed.entries:
+            news_text = "📰 Latest India News (Google):\n\n"
+            for i, entry in enumerate(feed.entries[:7], 1):
+                title = entry.get('title', 'No title')
+                import re
+                title = re.sub('<.*?>', '', title)
+                news_text += f"{i}. {title}\n"
+            return news_text
         
         return "📰 News service temporarily unavailable. Please try again later."
         
@@ -108,8 +97,7 @@ def get_world_news():
         
         for feed_url in feeds:
             try:
-                import feedparser
-                feed = feedparser.parse(feed_url)
+                feed = fetch_feed(feed_url)
                 
                 if feed.entries:
                     news_text = "🌍 Latest World News:\n\n"
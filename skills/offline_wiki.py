@@ -0,0 +1,339 @@
+"""
+Offline Wikipedia abstracts index.
+
+Imports a Wikipedia abstracts dump into a local SQLite file
+(memory/wiki_abstracts.db): abstracts are stored zlib-compressed and a
+contentless FTS5 index over title + abstract answers free-text lookups, so
+knowledge questions can be answered in a few milliseconds without network.
+
+Accepted dump formats (optionally .gz / .bz2):
+    enwiki-*-abstract*.xml   the official <feed><doc><title>... dump
+    *.jsonl                  one {"title": ..., "abstract": ...} per line
+    *.tsv                    title<TAB>abstract
+
+Each import writes a new versioned file (wiki_abstracts-<stamp>.db) and then
+switches wiki_abstracts.db.current to name it. Readers follow that pointer
+and reopen, so a re-import never has to replace a file a running server holds
+open (which Windows refuses); superseded versions are deleted once nothing
+has them open. A plain wiki_abstracts.db from older imports is still read
+when there is no pointer.
+
+CLI:
+    python -m skills.offline_wiki import enwiki-latest-abstract.xml.gz
+    python -m skills.offline_wiki lookup "alan turing"
+"""
+
+import argparse
+import bz2
+import glob
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEX_PATH = os.path.join(ROOT_DIR, 'memory', 'wiki_abstracts.db')
+
+BATCH_SIZE = 10000
+MIN_ABSTRACT_CHARS = 40   # Skip stubs such as "X may refer to:"
+TITLE_WEIGHT = 10.0       # bm25 weight of the title column relative to the abstract
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE pages (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    norm TEXT NOT NULL,
+    abstract BLOB NOT NULL
+);
+CREATE VIRTUAL TABLE pages_fts USING fts5(
+    title, abstract, content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(_TOKEN_RE.findall(title.lower()))
+
+
+def _open(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _read_xml(path: str) -> Iterator[Tuple[str, str]]:
+    title, abstract = None, ''
+    with _open(path) as f:
+        for _, elem in ET.iterparse(f, events=('end',)):
+            if elem.tag == 'title':
+                title = (elem.text or '')
+                if title.startswith('Wikipedia: '):
+                    title = title[len('Wikipedia: '):]
+            elif elem.tag == 'abstract':
+                abstract = elem.text or ''
+            elif elem.tag == 'doc':
+                if title:
+                    yield title, abstract
+                title, abstract = None, ''
+                elem.clear()  # Keep memory flat on multi-GB dumps
+
+
+def _read_lines(path: str) -> Iterator[Tuple[str, str]]:
+    is_json = '.jsonl' in path or '.json' in path
+    with _open(path) as f:
+        for raw in f:
+            line = raw.decode('utf-8', errors='replace').rstrip('\n')
+            if not line:
+                continue
+            if is_json:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                yield item.get('title', ''), item.get('abstract') or item.get('text', '')
+            else:
+                title, _, abstract = line.partition('\t')
+                yield title, abstract
+
+
+def read_dump(path: str) -> Iterator[Tuple[str, str]]:
+    """(title, abstract) pairs from a dump file"""
+    reader = _read_xml if '.xml' in path else _read_lines
+    for title, abstract in reader(path):
+        title, abstract = title.strip(), (abstract or '').strip()
+        if title and len(abstract) >= MIN_ABSTRACT_CHARS:
+            yield title, abstract
+
+
+def _pointer_path(path: str) -> str:
+    return path + '.current'
+
+
+def _version_pattern(path: str) -> str:
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-*{ext}"
+
+
+def resolve_index_path(path: str = INDEX_PATH) -> Optional[str]:
+    """The index file in use: the version named in <path>.current, else `path` itself; None if neither exists"""
+    try:
+        with open(_pointer_path(path), 'r', encoding='utf-8') as f:
+            name = f.read().strip()
+        target = os.path.join(os.path.dirname(path), name)
+        if name and os.path.exists(target):
+            return target
+    except OSError:
+        pass
+    return path if os.path.exists(path) else None
+
+
+def _remove_superseded(path: str, current: str):
+    """Delete older versions (and a pre-versioning file); ones still open are left for the next import"""
+    for old in glob.glob(_version_pattern(path)) + [path]:
+        if os.path.abspath(old) == os.path.abspath(current) or not os.path.exists(old):
+            continue
+        try:
+            os.remove(old)
+        except OSError:
+            pass  # Windows: a server still has it open
+
+
+def build_index(dump_path: str, out_path: str = INDEX_PATH, limit: Optional[int] = None) -> int:
+    """
+    Build a fresh index from a dump into a new versioned file, then point
+    <out_path>.current at it, so a running server keeps answering and picks
+    the new version up on its next lookup.
+    """
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    stem, ext = os.path.splitext(out_path)
+    version_path = f"{stem}-{time.time_ns()}{ext}"
+    tmp_path = version_path + '.building'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.executescript(SCHEMA)
+
+    count = 0
+    pages, fts = [], []
+
+    def flush():
+        conn.executemany('INSERT INTO pages (id, title, norm, abstract) VALUES (?, ?, ?, ?)', pages)
+        conn.executemany('INSERT INTO pages_fts (rowid, title, abstract) VALUES (?, ?, ?)', fts)
+        conn.commit()
+        pages.clear()
+        fts.clear()
+
+    for title, abstract in read_dump(dump_path):
+        count += 1
+        pages.append((count, title, normalize_title(title), zlib.compress(abstract.encode('utf-8'), 9)))
+        fts.append((count, title, abstract))
+        if len(pages) >= BATCH_SIZE:
+            flush()
+        if limit and count >= limit:
+            break
+    flush()
+
+    conn.execute('CREATE INDEX pages_norm ON pages (norm)')
+    conn.execute("INSERT INTO pages_fts (pages_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+    os.replace(tmp_path, version_path)  # New name, so nothing can have it open
+
+    # Only the small pointer file is replaced; readers open and close it each time
+    pointer_tmp = _pointer_path(out_path) + '.tmp'
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(version_path))
+    os.replace(pointer_tmp, _pointer_path(out_path))
+    _remove_superseded(out_path, version_path)
+    return count
+
+
+class OfflineWiki:
+    """Read-only lookups against a built abstracts index"""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def _page(self, rowid: int) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute('SELECT title, abstract FROM pages WHERE id = ?', (rowid,)).fetchone()
+        if row is None:
+            return None
+        return {'title': row[0], 'extract': zlib.decompress(row[1]).decode('utf-8'),
+                'url': f"https://en.wikipedia.org/wiki/{row[0].replace(' ', '_')}"}
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Best abstract for a query, or None. `match` is "title" when the query
+        names a page exactly (case/punctuation-insensitive) and "fulltext" when
+        it came from the FTS ranking.
+        """
+        tokens = _TOKEN_RE.findall(query.lower())
+        if not tokens:
+            return None
+        with self._lock:
+            if self.closed:
+                return None  # Replaced by a newer import while this lookup was starting
+            # Exact (normalised) title first; shortest wins if several normalise alike
+            row = self._conn.execute(
+                'SELECT id FROM pages WHERE norm = ? ORDER BY length(title) LIMIT 1', (' '.join(tokens),)
+            ).fetchone()
+            match = 'title'
+            if row is None:
+                fts_query = ' '.join('"%s"' % t for t in tokens)
+                row = self._conn.execute(
+                    'SELECT rowid FROM pages_fts WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts, ?, 1.0) LIMIT 1',
+                    (fts_query, TITLE_WEIGHT),
+                ).fetchone()
+                match = 'fulltext'
+            if row is None:
+                return None
+            page = self._page(row[0])
+        if page:
+            page['match'] = match
+            page['source'] = 'offline'
+        return page
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT count(*) FROM pages').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._conn.close()
+
+
+_index: Optional[OfflineWiki] = None
+_index_mtime = 0.0
+_index_lock = threading.Lock()
+
+
+def get_offline_wiki(path: str = INDEX_PATH) -> Optional[OfflineWiki]:
+    """Shared index instance; None if no index has been imported. Reopened after a re-import."""
+    global _index, _index_mtime
+    current = resolve_index_path(path)
+    if current is None:
+        return None
+    try:
+        mtime = os.path.getmtime(current)
+    except OSError:
+        return None
+    with _index_lock:
+        if _index is None or _index.path != current or mtime != _index_mtime:
+            try:
+                fresh = OfflineWiki(current)
+            except sqlite3.Error as e:
+                print(f"Offline Wikipedia index could not be opened: {e}")
+                return _index
+            old, _index, _index_mtime = _index, fresh, mtime
+            if old is not None:
+                old.close()  # Releases the file so the next import can delete it
+        return _index
+
+
+def lookup_offline(query: str, exact_only: bool = False) -> Optional[Dict[str, Any]]:
+    """Offline abstract for a query, or None (no index, no match, or non-exact when exact_only)"""
+    index = get_offline_wiki()
+    if index is None:
+        return None
+    try:
+        page = index.lookup(query)
+    except sqlite3.Error:
+        return None
+    if page and exact_only and page['match'] != 'title':
+        return None
+    return page
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Build or query the offline Wikipedia abstracts index")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = sub.add_parser("import", help="ingest an abstracts dump (xml / jsonl / tsv, optionally compressed)")
+    import_cmd.add_argument("dump")
+    import_cmd.add_argument("--out", default=INDEX_PATH)
+    import_cmd.add_argument("--limit", type=int, default=None)
+
+    lookup_cmd = sub.add_parser("lookup", help="look up a topic in the index")
+    lookup_cmd.add_argument("query")
+    lookup_cmd.add_argument("--index", default=INDEX_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        start = time.perf_counter()
+        count = build_index(args.dump, args.out, args.limit)
+        print(f"Indexed {count} abstracts in {time.perf_counter() - start:.1f}s")
+        saved = resolve_index_path(args.out)
+        print(f"Saved {saved} ({os.path.getsize(saved) / 1024 ** 2:.1f} MB)")
+    else:
+        path = resolve_index_path(args.index)
+        if path is None:
+            parser.exit(1, f"No index at {args.index}; run the import command first\n")
+        index = OfflineWiki(path)
+        start = time.perf_counter()
+        page = index.lookup(args.query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(json.dumps(page, ensure_ascii=False, indent=2) if page else "No match")
+        print(f"({elapsed_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
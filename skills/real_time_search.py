@@ -6,13 +6,21 @@ Provides live web search capabilities without API keys
 import requests
 from typing import List, Dict, Optional
 
+from utils.metrics import metrics, track
+from utils.tracing import span
+
+# Shared with skills.multi_engine_search (the registry returns the same series by name)
+engine_seconds = metrics.histogram("search_engine_seconds", "Time per engine for one search, fallbacks included")
+engine_requests = metrics.counter("search_engine_requests_total", "Engine searches by outcome (ok, empty, error)")
+
 def search_web(query: str, max_results: int = 5) -> List[Dict[str, str]]:
     """Search the web using DuckDuckGo"""
     try:
         from duckduckgo_search import DDGS
         
         results = []
-        with DDGS() as ddgs:
+        with track(engine_seconds, engine_requests, engine='duckduckgo') as outcome, span("search.duckduckgo"), \
+                DDGS() as ddgs:
             for result in ddgs.text(query, max_results=max_results):
                 results.append({
                     'title': result.get('title', ''),
@@ -20,6 +28,8 @@ def search_web(query: str, max_results: int = 5) -> List[Dict[str, str]]:
                     'snippet': result.get('body', ''),
                     'source': 'duckduckgo'
                 })
+            if not results:
+                outcome["outcome"] = "empty"
         return results
     except ImportError:
         return [{'title': 'Search unavailable', 'url': '', 'snippet': 'Install duckduckgo-search: pip install duckduckgo-search', 'source': 'error'}]
@@ -44,8 +54,9 @@ def get_current_news(topic: str = "India") -> str:
             if title and len(title) > 10:
                 # Create AI summary
                 try:
-                    from brain.ollama_interface import OllamaInterface
-                    ollama = OllamaInterface(model="qwen2.5:3b")
+                    from brain.llm_scheduler import BACKGROUND
+                    from brain.model_router import model_router
+                    ollama = model_router.client("summary", BACKGROUND, caller="news")
                     
                     summary_prompt = f"Summarize this news in 2-3 sentences:\n\nTitle: {title}\nContent: {snippet}"
                     ai_summary = ollama.generate(
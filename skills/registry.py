@@ -0,0 +1,124 @@
+"""
+Lazy-loading skill registry.
+
+Skills are declared in skills/manifest.json (metadata, keywords and an
+"module:function" entry point). Nothing is imported until a skill is first
+called, so startup does not pay for feedparser, duckduckgo_search, pytz and
+friends. Import time per module is recorded for /api/skills.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), 'manifest.json')
+
+
+class LazyEntry:
+    """Callable stand-in for a "module:attr" entry point; imports on first call"""
+
+    def __init__(self, registry: "SkillRegistry", entry_point: str):
+        self.registry = registry
+        self.entry_point = entry_point
+        self._fn: Optional[Callable] = None
+
+    def resolve(self) -> Callable:
+        if self._fn is None:
+            self._fn = self.registry.load(self.entry_point)
+        return self._fn
+
+    @property
+    def loaded(self) -> bool:
+        return self._fn is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyEntry {self.entry_point} {'loaded' if self.loaded else 'pending'}>"
+
+
+class SkillRegistry:
+    """Manifest-backed registry of skills and lazily imported entry points"""
+
+    def __init__(self, manifest_path: str = MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self._manifest: Dict[str, Any] = {}
+        self._imports: Dict[str, Dict[str, Any]] = {}
+        self._modules: Dict[str, ModuleType] = {}  # Fully imported through load()
+        self._lock = threading.Lock()
+        self.reload_manifest()
+
+    def reload_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+        except Exception as e:
+            print(f"Skill manifest could not be loaded: {e}")
+            self._manifest = {"skills": [], "modules": {}}
+
+    def skills(self) -> List[Dict[str, Any]]:
+        """Skill declarations in manifest order"""
+        return list(self._manifest.get("skills", []))
+
+    def lazy(self, entry_point: str) -> LazyEntry:
+        return LazyEntry(self, entry_point)
+
+    def load(self, entry_point: str) -> Callable:
+        """Import the module behind "module:attr" (timed, once) and return the attribute"""
+        module_name, _, attr = entry_point.partition(':')
+        # Only modules this registry finished importing skip the lock; a bare
+        # sys.modules entry may still be initialising in another thread, and
+        # import_module waits on Python's own per-module import lock for it
+        module = self._modules.get(module_name)
+        if module is None:
+            with self._lock:
+                module = self._modules.get(module_name)
+                if module is None:
+                    start = time.perf_counter()
+                    try:
+                        module = importlib.import_module(module_name)
+                    except Exception as e:
+                        self._imports[module_name] = {"ok": False, "error": str(e),
+                                                      "import_ms": round((time.perf_counter() - start) * 1000, 2)}
+                        raise
+                    self._imports[module_name] = {"ok": True,
+                                                  "import_ms": round((time.perf_counter() - start) * 1000, 2),
+                                                  "loaded_at": time.time()}
+                    self._modules[module_name] = module
+        target: Any = module
+        for part in attr.split('.') if attr else []:
+            target = getattr(target, part)
+        return target
+
+    def requirements(self, module_name: str) -> List[str]:
+        return list(self._manifest.get("modules", {}).get(module_name, {}).get("requires", []))
+
+    def available(self, *entry_points: str) -> bool:
+        """
+        True if the modules behind the entry points can be imported, judged by
+        locating them and their declared requirements without importing anything.
+        """
+        for entry_point in entry_points:
+            module_name = entry_point.partition(':')[0]
+            for name in [module_name] + self.requirements(module_name):
+                try:
+                    if importlib.util.find_spec(name) is None:
+                        return False
+                except (ImportError, ValueError):
+                    return False
+        return True
+
+    def import_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-module import time for modules loaded through the registry"""
+        return dict(self._imports)
+
+
+# Global instance
+skill_registry = SkillRegistry()
@@ -0,0 +1,117 @@
+"""
+Built-in desktop skills for OmniMind OS: websites, web search, applications,
+safe system info commands and file operation hints.
+Entry points are declared in skills/manifest.json.
+"""
+
+import webbrowser
+import subprocess
+from typing import Dict, Any
+
+
+# Common applications mapping
+APPLICATIONS = {
+    'notepad': 'notepad.exe',
+    'calculator': 'calc.exe',
+    'paint': 'mspaint.exe',
+    'explorer': 'explorer.exe',
+    'cmd': 'cmd.exe',
+    'powershell': 'powershell.exe',
+    'chrome': 'chrome.exe',
+    'edge': 'msedge.exe',
+    'firefox': 'firefox.exe'
+}
+
+
+def open_website_skill(query: str, params: Dict[str, Any]) -> str:
+    """Open a website in the browser"""
+    # Extract URL from query
+    words = query.split()
+    url = None
+
+    for word in words:
+        if '.' in word and not word.startswith('.'):
+            url = word
+            if not url.startswith('http'):
+                url = 'https://' + url
+            break
+
+    if url:
+        webbrowser.open(url)
+        return f"Opening {url} in your browser"
+    else:
+        return "Please specify a website URL"
+
+
+def search_web_skill(query: str, params: Dict[str, Any]) -> str:
+    """Search the web"""
+    # Remove search keywords
+    search_query = query.lower()
+    for keyword in ['search', 'google', 'find', 'look up']:
+        search_query = search_query.replace(keyword, '')
+    search_query = search_query.strip()
+
+    if search_query:
+        url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
+        webbrowser.open(url)
+        return f"Searching for: {search_query}"
+    else:
+        return "Please specify what to search for"
+
+
+def open_application_skill(query: str, params: Dict[str, Any]) -> str:
+    """Open a system application"""
+    query_lower = query.lower()
+
+    for app_name, app_exe in APPLICATIONS.items():
+        if app_name in query_lower:
+            try:
+                subprocess.Popen(app_exe)
+                return f"Opening {app_name.title()}"
+            except Exception as e:
+                return f"Failed to open {app_name}: {str(e)}"
+
+    return "Application not found. Try: notepad, calculator, paint, explorer, chrome, edge"
+
+
+def system_command_skill(query: str, params: Dict[str, Any]) -> str:
+    """Execute system commands (with safety checks)"""
+    # For safety, only allow specific safe commands
+    safe_commands = {
+        'time': 'echo %time%',
+        'date': 'echo %date%',
+        'username': 'echo %username%',
+        'computer name': 'hostname',
+        'ip address': 'ipconfig | findstr IPv4'
+    }
+
+    query_lower = query.lower()
+    for cmd_name, cmd in safe_commands.items():
+        if cmd_name in query_lower:
+            try:
+                result = subprocess.run(
+                    cmd,
+                    shell=True,
+                    capture_output=True,
+                    text=True,
+                    timeout=5
+                )
+                return result.stdout.strip() or "Command executed"
+            except Exception as e:
+                return f"Error executing command: {str(e)}"
+
+    return "For safety, only specific system info commands are allowed"
+
+
+def file_operations_skill(query: str, params: Dict[str, Any]) -> str:
+    """Handle file operations"""
+    query_lower = query.lower()
+
+    if 'create' in query_lower or 'new' in query_lower:
+        return "File creation requires specific path and content. Please provide details."
+    elif 'read' in query_lower or 'open' in query_lower:
+        return "File reading requires specific file path. Please provide the path."
+    elif 'delete' in query_lower:
+        return "File deletion requires explicit confirmation and path for safety."
+    else:
+        return "Available file operations: create, read, open, delete. Please specify."
@@ -1,24 +1,104 @@
 """Weather information using free API"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
 import requests
 
+from utils.cache import SingleFlight, TTLCache, normalize_key
+
+
+WEATHER_TTL = 600     # wttr.in itself only refreshes every few minutes
+FAILURE_TTL = 60      # Briefly remember upstream failures so bursts don't retry them
+MAX_BATCH_WORKERS = 8
+
+
+class WeatherService:
+    """
+    Current conditions from wttr.in, cached per normalised city.
+
+    Concurrent requests for the same city share one upstream call
+    (single-flight), and `get_many` fetches several cities in parallel, so a
+    dashboard refresh or a burst of chat messages costs one request per city
+    per TTL window.
+    """
+
+    def __init__(self, ttl: float = WEATHER_TTL, maxsize: int = 128):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.flight = SingleFlight()
+        self.session = requests.Session()
+        self.upstream_calls = 0
+
+    def _fetch(self, city: str) -> Optional[Dict[str, Any]]:
+        self.upstream_calls += 1
+        try:
+            # Using wttr.in - free, no API key needed
+            url = f"https://wttr.in/{city}?format=j1"
+            response = self.session.get(url, timeout=5)
+            if response.status_code != 200:
+                return None
+            current = response.json()['current_condition'][0]
+            return {
+                "city": city,
+                "temp_c": current['temp_C'],
+                "feels_like_c": current['FeelsLikeC'],
+                "description": current['weatherDesc'][0]['value'],
+                "humidity": current['humidity'],
+            }
+        except Exception:
+            return None
+
+    def _load(self, key: str, city: str) -> Optional[Dict[str, Any]]:
+        # Another caller may have filled the cache while we queued for the flight
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached or None
+        data = self._fetch(city)
+        self.cache.set(key, data or {}, None if data else FAILURE_TTL)
+        return data
+
+    def get(self, city: str) -> Optional[Dict[str, Any]]:
+        """Current conditions dict, or None if the city/service is unavailable"""
+        key = normalize_key(city)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached or None
+        return self.flight.do(key, lambda: self._load(key, city))
+
+    def get_many(self, cities: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Conditions for several cities, fetched concurrently; keyed by the city as given"""
+        unique = list(dict.fromkeys(cities))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(unique))) as pool:
+            return dict(zip(unique, pool.map(self.get, unique)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "upstream_calls": self.upstream_calls,
+                "coalesced": self.flight.shared}
+
+
+# Global instance
+weather_service = WeatherService()
+
+
+def format_weather(city: str, data: Optional[Dict[str, Any]]) -> str:
+    if not data:
+        return f"Unable to fetch weather for {city}"
+    return (f"Weather in {city}: {data['description']}, {data['temp_c']}°C "
+            f"(feels like {data['feels_like_c']}°C), Humidity: {data['humidity']}%")
+
+
 def get_weather(city="Delhi"):
     """Get current weather for a city"""
     try:
-        # Using wttr.in - free, no API key needed
-        url = f"https://wttr.in/{city}?format=j1"
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            current = data['current_condition'][0]
-            
-            temp = current['temp_C']
-            feels = current['FeelsLikeC']
-            desc = current['weatherDesc'][0]['value']
-            humidity = current['humidity']
-            
-            return f"Weather in {city}: {desc}, {temp}°C (feels like {feels}°C), Humidity: {humidity}%"
-        
-        return f"Unable to fetch weather for {city}"
-    except:
+        return format_weather(city, weather_service.get(city))
+    except Exception:
         return "Weather service unavailable"
+
+
+def get_weather_many(cities: List[str]) -> Dict[str, str]:
+    """Formatted weather for several cities, fetched concurrently"""
+    try:
+        return {city: format_weather(city, data) for city, data in weather_service.get_many(cities).items()}
+    except Exception:
+        return {city: "Weather service unavailable" for city in cities}
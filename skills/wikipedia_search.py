@@ -1,39 +1,123 @@
 """Wikipedia knowledge base"""
+from typing import Any, Dict, List, Optional
+
 import requests
 
+from skills.offline_wiki import lookup_offline
+from utils.cache import TTLCache, normalize_key
+from utils.config import get as config_get
+
+
+API_URL = "https://en.wikipedia.org/w/api.php"
+TITLE_TTL = 24 * 3600     # Which page a query resolves to changes rarely
+SUMMARY_TTL = 6 * 3600
+MAX_TITLES = 20           # MediaWiki's limit for prop=extracts with exintro
+
+
+def page_url(title: str) -> str:
+    return f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+
+
+class WikipediaClient:
+    """
+    Shared MediaWiki API client.
+
+    Search and intro extracts come back from a single `generator=search` +
+    `prop=extracts` request, and summaries for several known titles are
+    fetched in one batched `prop=extracts` request. Query -> titles and
+    title -> summary are kept in LRU+TTL caches, so a repeated lookup costs
+    no round trip and a new one costs exactly one.
+    """
+
+    def __init__(self, api_url: Optional[str] = None, timeout: float = 5.0):
+        self.api_url = api_url or config_get('wikipedia_api_url') or API_URL
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'OmniMind/1.0 (local assistant)'
+        self.titles = TTLCache(maxsize=512, ttl=TITLE_TTL)
+        self.summaries = TTLCache(maxsize=1024, ttl=SUMMARY_TTL)
+        self.requests_made = 0
+
+    def _query(self, **params) -> Dict[str, Any]:
+        params.update({'action': 'query', 'format': 'json', 'formatversion': 2})
+        self.requests_made += 1
+        response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json().get('query', {})
+
+    def _store_pages(self, pages: List[Dict[str, Any]]):
+        for page in pages:
+            if page.get('title') and 'extract' in page and not page.get('missing'):
+                self.summaries.set(normalize_key(page['title']), {'title': page['title'], 'extract': page['extract']})
+
+    def search(self, query: str, limit: int = 3) -> List[Dict[str, str]]:
+        """Top pages for a query as [{title, extract, url}], with intro extracts, in one request"""
+        key = (normalize_key(query), limit)
+        titles = self.titles.get(key)
+        if titles is not None:
+            pages = [self.summaries.get(normalize_key(t)) for t in titles]
+            if all(pages):
+                return [{**p, 'url': page_url(p['title'])} for p in pages]
+            found = self.get_summaries(titles)
+            return [{**found[t], 'url': page_url(found[t]['title'])} for t in titles if t in found]
+
+        data = self._query(generator='search', gsrsearch=query, gsrlimit=min(limit, MAX_TITLES),
+                           prop='extracts', exintro=1, explaintext=1, exlimit='max')
+        pages = sorted(data.get('pages', []), key=lambda p: p.get('index', 0))
+        self._store_pages(pages)
+        self.titles.set(key, [p['title'] for p in pages])
+        return [{'title': p['title'], 'extract': p.get('extract', ''), 'url': page_url(p['title'])} for p in pages]
+
+    def get_summaries(self, titles: List[str]) -> Dict[str, Dict[str, str]]:
+        """Intro extracts for known titles, keyed by the requested title; uncached ones in one batched request"""
+        result: Dict[str, Dict[str, str]] = {}
+        missing = []
+        for title in dict.fromkeys(titles):
+            cached = self.summaries.get(normalize_key(title))
+            if cached:
+                result[title] = cached
+            else:
+                missing.append(title)
+
+        for start in range(0, len(missing), MAX_TITLES):
+            chunk = missing[start:start + MAX_TITLES]
+            data = self._query(titles='|'.join(chunk), prop='extracts', exintro=1, explaintext=1,
+                               exlimit='max', redirects=1)
+            pages = data.get('pages', [])
+            self._store_pages(pages)
+            # Map requested titles through MediaWiki's normalisation and redirects
+            aliases = {t: t for t in chunk}
+            for step in data.get('normalized', []) + data.get('redirects', []):
+                for requested, current in list(aliases.items()):
+                    if current == step.get('from'):
+                        aliases[requested] = step.get('to')
+            for requested, canonical in aliases.items():
+                cached = self.summaries.get(normalize_key(canonical))
+                if cached:
+                    self.summaries.set(normalize_key(requested), cached)
+                    result[requested] = cached
+        return result
+
+    def lookup(self, query: str) -> Optional[Dict[str, str]]:
+        """Best matching page with its summary, or None"""
+        pages = self.search(query, limit=1)
+        return pages[0] if pages and pages[0].get('extract') else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {'requests': self.requests_made, 'titles': self.titles.stats(),
+                'summaries': self.summaries.stats()}
+
+
+# Global instance
+wikipedia_client = WikipediaClient()
+
+
 def search_wikipedia(query):
-    """Search Wikipedia and get summary"""
+    """Search Wikipedia and get summary (local abstracts index first, then the live API)"""
     try:
-        # First try search API to find the right page
-        search_url = "https://en.wikipedia.org/w/api.php"
-        search_params = {
-            'action': 'query',
-            'list': 'search',
-            'srsearch': query,
-            'format': 'json',
-            'srlimit': 1
-        }
-        
-        search_response = requests.get(search_url, params=search_params, timeout=5)
-        if search_response.status_code == 200:
-            search_data = search_response.json()
-            search_results = search_data.get('query', {}).get('search', [])
-            
-            if search_results:
-                page_title = search_results[0]['title']
-                
-                # Get page summary
-                summary_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{page_title.replace(' ', '_')}"
-                summary_response = requests.get(summary_url, timeout=5)
-                
-                if summary_response.status_code == 200:
-                    data = summary_response.json()
-                    title = data.get('title', '')
-                    extract = data.get('extract', '')
-                    
-                    if extract:
-                        return f"📖 {title}:\n\n{extract}"
-        
+        page = lookup_offline(query) or wikipedia_client.lookup(query)
+        if page:
+            return f"📖 {page['title']}:\n\n{page['extract']}"
         return f"📖 No Wikipedia information found for '{query}'"
     except Exception as e:
         return f"📖 Wikipedia search unavailable: {str(e)}"
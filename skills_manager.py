@@ -3,55 +3,63 @@ Skills Manager for OmniMind OS
 Manages and executes various AI skills and capabilities
 """
 
-import os
-import webbrowser
-import subprocess
-from typing import Dict, Any, Optional, List
-from skills.media_player import play_music
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Iterable
+from intent_matcher import IntentMatcher
+from skill_executor import SkillExecutor, SkillTimeout
+from skills.registry import SkillRegistry, skill_registry
+from utils.safety_policy import safety_policy
 
 
 class SkillsManager:
     """Manages all available skills and their execution"""
     
-    def __init__(self):
-        self.available_skills = {
-            "play_music": {
-                "name": "Play Music",
-                "description": "Search and play music from YouTube",
-                "function": self.play_music_skill,
-                "keywords": ["play", "music", "song", "audio"]
-            },
-            "open_website": {
-                "name": "Open Website",
-                "description": "Open a website in the browser",
-                "function": self.open_website_skill,
-                "keywords": ["open", "website", "browse", "visit"]
-            },
-            "search_web": {
-                "name": "Search Web",
-                "description": "Search the web using default search engine",
-                "function": self.search_web_skill,
-                "keywords": ["search", "google", "find", "look up"]
-            },
-            "open_application": {
-                "name": "Open Application",
-                "description": "Open a system application",
-                "function": self.open_application_skill,
-                "keywords": ["open", "launch", "start", "run"]
-            },
-            "system_command": {
-                "name": "System Command",
-                "description": "Execute system commands",
-                "function": self.system_command_skill,
-                "keywords": ["execute", "command", "run", "terminal"]
-            },
-            "file_operations": {
-                "name": "File Operations",
-                "description": "Create, read, or manage files",
-                "function": self.file_operations_skill,
-                "keywords": ["file", "create", "read", "write", "delete"]
-            }
+    def __init__(self, registry: SkillRegistry = skill_registry):
+        self.registry = registry
+        self.matcher = IntentMatcher()
+        self.executor = SkillExecutor(max_workers=8)
+        self.available_skills: Dict[str, Dict[str, Any]] = {}
+        
+        # Skills come from the manifest; implementations are imported on first use
+        for spec in registry.skills():
+            self.register_skill(
+                spec["id"],
+                spec["name"],
+                spec["description"],
+                registry.lazy(spec["entry"]),
+                spec.get("keywords", []),
+                spec.get("patterns", []),
+                pattern_weight=spec.get("pattern_weight", 2.0),
+                side_effects=spec.get("side_effects", False),
+                timeout=spec.get("timeout"),
+                max_concurrency=spec.get("max_concurrency")
+            )
+        self.matcher.compile()
+    
+    def register_skill(self, skill_id: str, name: str, description: str, function: Callable,
+                       keywords: Iterable[str], patterns: Iterable[str] = (), pattern_weight: float = 2.0,
+                       side_effects: bool = False, timeout: Optional[float] = None,
+                       max_concurrency: Optional[int] = None):
+        """Add a skill at runtime; its keywords join the compiled matcher"""
+        self.available_skills[skill_id] = {
+            "name": name,
+            "description": description,
+            "function": function,
+            "keywords": list(keywords),
+            "patterns": list(patterns),
+            "side_effects": side_effects  # Changes the machine; needs a keyword match, not just a classifier guess
         }
+        self.matcher.add(skill_id, keywords, patterns, pattern_weight=pattern_weight)  # Matcher recompiles on next use
+        self.executor.configure(skill_id, timeout, max_concurrency)
+    
+    def get_execution_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-skill call counts, latency, timeouts and limits"""
+        return self.executor.stats()
+    
+    def get_import_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Import time of skill modules loaded so far"""
+        return self.registry.import_stats()
     
     def get_available_skills(self) -> List[Dict[str, str]]:
         """Get list of all available skills"""
@@ -64,15 +72,33 @@ class SkillsManager:
             for skill_id, skill in self.available_skills.items()
         ]
     
+    def rank_skills(self, query: str) -> List[Dict[str, Any]]:
+        """Score every skill against the query in one pass, best first"""
+        return [
+            {
+                "skill_id": c["intent"],
+                "score": c["score"],
+                "confidence": c["confidence"],
+                "matched": c["matched"]
+            }
+            for c in self.matcher.rank(query)
+        ]
+    
     def detect_skill(self, query: str) -> Optional[str]:
         """Detect which skill to use based on query"""
-        query_lower = query.lower()
-        
-        for skill_id, skill in self.available_skills.items():
-            if any(keyword in query_lower for keyword in skill["keywords"]):
-                return skill_id
-        
-        return None
+        return self.matcher.best(query)
+    
+    def _check_policy(self, skill_id: str, query: str) -> Optional[Dict[str, Any]]:
+        """Failure result if the safety policy denies `query` for this skill, else None"""
+        decision = safety_policy.check(query, skill_id)
+        if decision["allowed"]:
+            return None
+        return {
+            "success": False,
+            "skill": self.available_skills[skill_id]["name"],
+            "error": f"Blocked by safety policy: {decision['reason'] or decision['rule']}",
+            "blocked_rule": decision["rule"]
+        }
     
     def execute_skill(self, skill_id: str, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute a specific skill"""
@@ -83,128 +109,66 @@ class SkillsManager:
             }
         
         skill = self.available_skills[skill_id]
+        blocked = self._check_policy(skill_id, query)
+        if blocked:
+            return blocked
+        start = time.perf_counter()
         try:
             result = skill["function"](query, params or {})
+            self.executor.record(skill_id, (time.perf_counter() - start) * 1000)
             return {
                 "success": True,
                 "skill": skill["name"],
                 "result": result
             }
         except Exception as e:
+            self.executor.record(skill_id, (time.perf_counter() - start) * 1000, e)
             return {
                 "success": False,
                 "skill": skill["name"],
                 "error": str(e)
             }
     
-    # Skill implementations
-    
-    def play_music_skill(self, query: str, params: Dict[str, Any]) -> str:
-        """Play music from YouTube"""
-        result = play_music(query)
-        return result
-    
-    def open_website_skill(self, query: str, params: Dict[str, Any]) -> str:
-        """Open a website in the browser"""
-        # Extract URL from query
-        words = query.split()
-        url = None
-        
-        for word in words:
-            if '.' in word and not word.startswith('.'):
-                url = word
-                if not url.startswith('http'):
-                    url = 'https://' + url
-                break
-        
-        if url:
-            webbrowser.open(url)
-            return f"Opening {url} in your browser"
-        else:
-            return "Please specify a website URL"
-    
-    def search_web_skill(self, query: str, params: Dict[str, Any]) -> str:
-        """Search the web"""
-        # Remove search keywords
-        search_query = query.lower()
-        for keyword in ['search', 'google', 'find', 'look up']:
-            search_query = search_query.replace(keyword, '')
-        search_query = search_query.strip()
-        
-        if search_query:
-            url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
-            webbrowser.open(url)
-            return f"Searching for: {search_query}"
-        else:
-            return "Please specify what to search for"
-    
-    def open_application_skill(self, query: str, params: Dict[str, Any]) -> str:
-        """Open a system application"""
-        query_lower = query.lower()
-        
-        # Common applications mapping
-        apps = {
-            'notepad': 'notepad.exe',
-            'calculator': 'calc.exe',
-            'paint': 'mspaint.exe',
-            'explorer': 'explorer.exe',
-            'cmd': 'cmd.exe',
-            'powershell': 'powershell.exe',
-            'chrome': 'chrome.exe',
-            'edge': 'msedge.exe',
-            'firefox': 'firefox.exe'
-        }
-        
-        for app_name, app_exe in apps.items():
-            if app_name in query_lower:
-                try:
-                    subprocess.Popen(app_exe)
-                    return f"Opening {app_name.title()}"
-                except Exception as e:
-                    return f"Failed to open {app_name}: {str(e)}"
-        
-        return "Application not found. Try: notepad, calculator, paint, explorer, chrome, edge"
-    
-    def system_command_skill(self, query: str, params: Dict[str, Any]) -> str:
-        """Execute system commands (with safety checks)"""
-        # For safety, only allow specific safe commands
-        safe_commands = {
-            'time': 'echo %time%',
-            'date': 'echo %date%',
-            'username': 'echo %username%',
-            'computer name': 'hostname',
-            'ip address': 'ipconfig | findstr IPv4'
-        }
-        
-        query_lower = query.lower()
-        for cmd_name, cmd in safe_commands.items():
-            if cmd_name in query_lower:
-                try:
-                    result = subprocess.run(
-                        cmd,
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    return result.stdout.strip() or "Command executed"
-                except Exception as e:
-                    return f"Error executing command: {str(e)}"
-        
-        return "For safety, only specific system info commands are allowed"
-    
-    def file_operations_skill(self, query: str, params: Dict[str, Any]) -> str:
-        """Handle file operations"""
-        query_lower = query.lower()
+    async def execute_skill_async(self, skill_id: str, query: str,
+                                  params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute a skill off the event loop, within its timeout and concurrency limit.
+        Skills can watch params["cancel_event"] to stop early after a timeout.
+        """
+        if skill_id not in self.available_skills:
+            return {
+                "success": False,
+                "message": f"Unknown skill: {skill_id}"
+            }
         
-        if 'create' in query_lower or 'new' in query_lower:
-            return "File creation requires specific path and content. Please provide details."
-        elif 'read' in query_lower or 'open' in query_lower:
-            return "File reading requires specific file path. Please provide the path."
-        elif 'delete' in query_lower:
-            return "File deletion requires explicit confirmation and path for safety."
-        else:
-            return "Available file operations: create, read, open, delete. Please specify."
+        skill = self.available_skills[skill_id]
+        blocked = self._check_policy(skill_id, query)
+        if blocked:
+            return blocked
+        # Params come from the client; the cancel event is always ours, never theirs
+        params = dict(params) if isinstance(params, dict) else {}
+        cancel_event = params["cancel_event"] = threading.Event()
+        try:
+            result = await self.executor.run(skill_id, skill["function"], query, params,
+                                             cancel_event=cancel_event)
+            return {
+                "success": True,
+                "skill": skill["name"],
+                "result": result
+            }
+        except SkillTimeout as e:
+            return {
+                "success": False,
+                "skill": skill["name"],
+                "error": str(e),
+                "timed_out": True
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "skill": skill["name"],
+                "error": str(e)
+            }
 
 
 # Global instance
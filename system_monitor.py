@@ -1,23 +1,302 @@
 """
 Real-time system monitoring module for OmniMind OS.
-Provides CPU, memory, disk, network, and WiFi information.
+Provides CPU, memory, disk, network, and WiFi information,
+plus stats for the OmniMind process itself.
 """
 
 import psutil
 import platform
 import time
-from typing import Dict, List, Optional
+import heapq
+import threading
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
 import subprocess
 import re
 
+from metric_history import MetricStore
+from utils.metrics import metrics
+
+
+class ProcessTracker:
+    """
+    Persistent process table for top-process reporting.
+
+    psutil.Process handles are kept across samples so cpu_percent() measures
+    the delta since the previous refresh instead of returning 0 for a fresh
+    handle. Births and deaths are found by diffing the pid set, and the top-K
+    by CPU and memory are selected with a heap rather than a full sort.
+    """
+    
+    def __init__(self, top_k: int = 5, min_interval: float = 1.0):
+        self.top_k = top_k
+        self.min_interval = min_interval  # Refreshes closer together than this reuse the last result
+        self._procs: Dict[int, Tuple[psutil.Process, str]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.top_cpu: List[Dict] = []
+        self.top_memory: List[Dict] = []
+        self.active = 0
+        self.births = 0
+        self.deaths = 0
+        self.last_refresh = 0.0
+    
+    def refresh(self, force: bool = False):
+        """Update the table and the top-K lists (skipped if refreshed very recently)"""
+        with self._lock:
+            if not force and time.monotonic() - self.last_refresh < self.min_interval:
+                return
+            
+            pids = set(psutil.pids())
+            known = set(self._procs)
+            
+            for pid in known - pids:
+                del self._procs[pid]
+                self.deaths += 1
+            
+            for pid in pids - known:
+                try:
+                    proc = psutil.Process(pid)
+                    proc.cpu_percent(None)  # Prime the counter; first real value comes next refresh
+                    self._procs[pid] = (proc, proc.name())
+                    self.births += 1
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    pass
+            
+            rows = []
+            gone = []
+            for pid, (proc, name) in self._procs.items():
+                try:
+                    with proc.oneshot():
+                        cpu = proc.cpu_percent(None)
+                        mem = proc.memory_percent()
+                except psutil.NoSuchProcess:
+                    gone.append(pid)
+                    continue
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                rows.append((cpu, mem, pid, name))
+            
+            for pid in gone:
+                del self._procs[pid]
+                self.deaths += 1
+            
+            self.active = sum(1 for row in rows if row[0] > 0)
+            self.top_cpu = [self._row(r) for r in heapq.nlargest(self.top_k, rows, key=lambda r: r[0]) if r[0] > 0]
+            self.top_memory = [self._row(r) for r in heapq.nlargest(self.top_k, rows, key=lambda r: r[1])]
+            self.last_refresh = time.monotonic()
+    
+    @staticmethod
+    def _row(row: tuple) -> Dict:
+        cpu, mem, pid, name = row
+        return {
+            'pid': pid,
+            'name': name,
+            'cpu_percent': round(cpu, 1),
+            'memory_percent': round(mem, 1)
+        }
+    
+    def summary(self) -> Dict:
+        """Table size and lifecycle counters"""
+        return {
+            "total": len(self._procs),
+            "active": self.active,
+            "births": self.births,
+            "deaths": self.deaths
+        }
+    
+    def start(self, interval: float = 2.0):
+        """Refresh in a daemon thread so status requests only read the cached top-K"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    self.refresh(force=True)
+                except Exception as e:
+                    print(f"Process tracker refresh failed: {e}")
+                self._stop.wait(interval)
+        
+        self._thread = threading.Thread(target=_loop, name="process-tracker", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+
+COUNTER_WIDTH = 2 ** 32  # Some platforms still expose 32-bit NIC counters
+
+
+def counter_delta(new: int, old: int, width: int = COUNTER_WIDTH) -> int:
+    """
+    Difference between two monotonically increasing counter readings.
+    A drop is treated as a 32-bit wrap if that gives a plausible delta,
+    otherwise as a reset (interface re-created), in which case `new` is
+    the amount counted since the reset.
+    """
+    if new >= old:
+        return new - old
+    if old < width:
+        wrapped = new + width - old
+        if wrapped < width // 2:
+            return wrapped
+    return new
+
+
+class NetworkRateTracker:
+    """Per-second network rates from successive psutil counter snapshots, total and per NIC"""
+    
+    FIELDS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+              'errin', 'errout', 'dropin', 'dropout')
+    
+    def __init__(self):
+        self._last_ts: Optional[float] = None
+        self.last_total = None
+        self._last_pernic: Dict[str, object] = {}
+    
+    def _rates(self, new, old, elapsed: float) -> Dict:
+        if old is None or elapsed <= 0:
+            return {}
+        deltas = {f: counter_delta(getattr(new, f), getattr(old, f)) for f in self.FIELDS}
+        return {
+            "sent_bytes_per_sec": round(deltas['bytes_sent'] / elapsed, 1),
+            "recv_bytes_per_sec": round(deltas['bytes_recv'] / elapsed, 1),
+            "sent_packets_per_sec": round(deltas['packets_sent'] / elapsed, 1),
+            "recv_packets_per_sec": round(deltas['packets_recv'] / elapsed, 1),
+            "errors": deltas['errin'] + deltas['errout'],
+            "drops": deltas['dropin'] + deltas['dropout']
+        }
+    
+    def sample(self, now: Optional[float] = None) -> Tuple[Dict, Dict[str, Dict]]:
+        """Returns (total rates, {nic: rates}); rates are empty on the first sample"""
+        now = time.time() if now is None else now
+        total = psutil.net_io_counters()
+        try:
+            pernic = psutil.net_io_counters(pernic=True)
+        except Exception:
+            pernic = {}
+        
+        elapsed = now - self._last_ts if self._last_ts is not None else 0.0
+        total_rates = self._rates(total, self.last_total, elapsed)
+        nic_rates = {
+            nic: self._rates(counters, self._last_pernic.get(nic), elapsed)
+            for nic, counters in pernic.items()
+        }
+        
+        self._last_ts = now
+        self.last_total = total
+        self._last_pernic = pernic
+        return total_rates, nic_rates
+
+
+class SelfMonitor:
+    """
+    Telemetry for the OmniMind process itself rather than the host:
+    RSS, CPU, thread count, open file descriptors, per-thread CPU and
+    asyncio event-loop lag.
+    """
+    
+    def __init__(self, lag_interval: float = 0.5):
+        self.proc = psutil.Process(os.getpid())
+        self.proc.cpu_percent(None)  # Prime so the first reading is a real delta
+        self.lag_interval = lag_interval
+        self.loop_lag_ms = 0.0
+        self.loop_lag_max_ms = 0.0  # Worst lag since the last snapshot
+        self._lag_task: Optional[asyncio.Task] = None
+        self._last_thread_times: Dict[int, float] = {}
+        self._last_thread_ts: Optional[float] = None
+        metrics.gauge("process_resident_memory_bytes", "RSS of the OmniMind process",
+                      fn=lambda: self.proc.memory_info().rss)
+        metrics.gauge("process_threads", "Threads in the OmniMind process", fn=self.proc.num_threads)
+        metrics.counter("process_cpu_seconds_total", "User and system CPU time of the OmniMind process",
+                        fn=lambda: sum(self.proc.cpu_times()[:2]))
+        metrics.gauge("event_loop_lag_seconds", "Latest asyncio event-loop lag sample",
+                      fn=lambda: self.loop_lag_ms / 1000 if self._lag_task else [])
+    
+    def start_lag_probe(self):
+        """Start the event-loop lag probe on the running loop"""
+        if self._lag_task and not self._lag_task.done():
+            return
+        self._lag_task = asyncio.get_running_loop().create_task(self._probe_lag())
+    
+    async def _probe_lag(self):
+        # Sleep a fixed interval and measure how late the loop wakes us up
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - expected) * 1000
+            self.loop_lag_ms = round(lag, 2)
+            self.loop_lag_max_ms = max(self.loop_lag_max_ms, self.loop_lag_ms)
+    
+    def _open_files(self) -> Optional[int]:
+        try:
+            if hasattr(self.proc, 'num_fds'):
+                return self.proc.num_fds()
+            return self.proc.num_handles()  # Windows
+        except (psutil.AccessDenied, AttributeError):
+            return None
+    
+    def _thread_cpu(self, now: float) -> List[Dict]:
+        """Per-thread CPU% since the previous snapshot, busiest first"""
+        try:
+            threads = self.proc.threads()
+        except (psutil.AccessDenied, AttributeError):
+            return []
+        names = {t.native_id: t.name for t in threading.enumerate() if t.native_id is not None}
+        elapsed = now - self._last_thread_ts if self._last_thread_ts else 0.0
+        current: Dict[int, float] = {}
+        rows = []
+        for t in threads:
+            total = t.user_time + t.system_time
+            current[t.id] = total
+            prev = self._last_thread_times.get(t.id)
+            cpu = (total - prev) / elapsed * 100 if prev is not None and elapsed > 0 else 0.0
+            rows.append({"id": t.id, "name": names.get(t.id, ""), "cpu_percent": round(max(cpu, 0.0), 1)})
+        self._last_thread_times = current
+        self._last_thread_ts = now
+        rows.sort(key=lambda r: r["cpu_percent"], reverse=True)
+        return rows[:10]
+    
+    def snapshot(self) -> Dict:
+        """Current process stats; resets the max-lag window"""
+        now = time.monotonic()
+        with self.proc.oneshot():
+            cpu = self.proc.cpu_percent(None)
+            rss = self.proc.memory_info().rss
+            num_threads = self.proc.num_threads()
+        
+        stats = {
+            "pid": self.proc.pid,
+            "cpu_percent": round(cpu, 1),
+            "rss_mb": round(rss / (1024**2), 1),
+            "threads": num_threads,
+            "open_files": self._open_files(),
+            "loop_lag_ms": self.loop_lag_ms if self._lag_task else None,
+            "loop_lag_max_ms": self.loop_lag_max_ms if self._lag_task else None,
+            "thread_cpu": self._thread_cpu(now)
+        }
+        self.loop_lag_max_ms = self.loop_lag_ms
+        return stats
+
 
 class SystemMonitor:
     """Monitor system resources in real-time"""
     
     def __init__(self):
-        self.cpu_percent_history: List[float] = []
-        self.memory_percent_history: List[float] = []
-        self.max_history = 60  # Keep last 60 readings
+        # Ring-buffer history with 1s / 1m / 1h downsampling tiers
+        self.history = MetricStore()
+        self.network = NetworkRateTracker()
+        self.processes = ProcessTracker(top_k=5)
+        self.self_monitor = SelfMonitor()
     
     def get_cpu_info(self) -> Dict:
         """Get CPU usage and information"""
@@ -26,15 +305,13 @@ class SystemMonitor:
         cpu_count = psutil.cpu_count()
         
         # Update history
-        self.cpu_percent_history.append(cpu_percent)
-        if len(self.cpu_percent_history) > self.max_history:
-            self.cpu_percent_history.pop(0)
+        self.history.record("cpu.percent", cpu_percent)
         
         return {
             "usage_percent": round(cpu_percent, 1),
             "frequency_ghz": round(cpu_freq.current / 1000, 2) if cpu_freq else 0,
             "cores": cpu_count,
-            "history": self.cpu_percent_history[-20:]  # Last 20 readings
+            "history": self.history.recent("cpu.percent", 20)  # Last 20 readings
         }
     
     def get_memory_info(self) -> Dict:
@@ -42,21 +319,20 @@ class SystemMonitor:
         memory = psutil.virtual_memory()
         
         # Update history
-        self.memory_percent_history.append(memory.percent)
-        if len(self.memory_percent_history) > self.max_history:
-            self.memory_percent_history.pop(0)
+        self.history.record("memory.percent", memory.percent)
         
         return {
             "usage_percent": round(memory.percent, 1),
             "used_gb": round(memory.used / (1024**3), 2),
             "total_gb": round(memory.total / (1024**3), 2),
             "available_gb": round(memory.available / (1024**3), 2),
-            "history": self.memory_percent_history[-20:]
+            "history": self.history.recent("memory.percent", 20)
         }
     
     def get_disk_info(self) -> Dict:
         """Get disk usage information"""
         disk = psutil.disk_usage('/')
+        self.history.record("disk.percent", disk.percent)
         
         return {
             "usage_percent": round(disk.percent, 1),
@@ -66,14 +342,31 @@ class SystemMonitor:
         }
     
     def get_network_info(self) -> Dict:
-        """Get network usage information"""
-        net_io = psutil.net_io_counters()
+        """Get network usage information with per-second rates, total and per interface"""
+        now = time.time()
+        rates, nic_rates = self.network.sample(now)
+        net_io = self.network.last_total
+        
+        if rates:
+            samples = {
+                "net.sent_bps": rates["sent_bytes_per_sec"],
+                "net.recv_bps": rates["recv_bytes_per_sec"],
+                "net.sent_pps": rates["sent_packets_per_sec"],
+                "net.recv_pps": rates["recv_packets_per_sec"]
+            }
+            for nic, r in nic_rates.items():
+                if r:
+                    samples[f"net.{nic}.sent_bps"] = r["sent_bytes_per_sec"]
+                    samples[f"net.{nic}.recv_bps"] = r["recv_bytes_per_sec"]
+            self.history.record_many(samples, now)
         
         return {
             "bytes_sent_mb": round(net_io.bytes_sent / (1024**2), 2),
             "bytes_recv_mb": round(net_io.bytes_recv / (1024**2), 2),
             "packets_sent": net_io.packets_sent,
-            "packets_recv": net_io.packets_recv
+            "packets_recv": net_io.packets_recv,
+            "rates": rates,
+            "interfaces": nic_rates
         }
     
     def get_wifi_signal_strength(self) -> Optional[int]:
@@ -136,25 +429,41 @@ class SystemMonitor:
     def get_process_info(self) -> List[Dict]:
         """Get top 5 processes by CPU usage"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    info = proc.info
-                    if info['cpu_percent'] > 0:
-                        processes.append({
-                            'name': info['name'],
-                            'cpu_percent': round(info['cpu_percent'], 1),
-                            'memory_percent': round(info['memory_percent'], 1)
-                        })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+            # The background sampler keeps the table fresh; refresh inline only if it isn't running
+            if not self.processes.running:
+                self.processes.refresh()
             
-            # Sort by CPU usage and return top 5
-            processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-            return processes[:5]
+            summary = self.processes.summary()
+            self.history.record_many({
+                "processes.active": summary["active"],
+                "processes.total": summary["total"]
+            })
+            return self.processes.top_cpu
         except Exception:
             return []
     
+    def get_self_info(self) -> Dict:
+        """Get stats for the OmniMind process itself"""
+        try:
+            stats = self.self_monitor.snapshot()
+        except Exception:
+            return {}
+        self.history.record_many({
+            "self.cpu_percent": stats["cpu_percent"],
+            "self.rss_mb": stats["rss_mb"],
+            "self.threads": stats["threads"],
+            "self.open_files": stats["open_files"],
+            "self.loop_lag_ms": stats["loop_lag_max_ms"]
+        })
+        return stats
+    
+    def get_history(self, metric: Optional[str] = None, start: Optional[float] = None,
+                    end: Optional[float] = None, resolution: Optional[int] = None) -> Dict:
+        """Query recorded metric history by time range, or list known metrics"""
+        if not metric:
+            return {"metrics": self.history.names(), "memory_bytes": self.history.memory_bytes()}
+        return self.history.query(metric, start, end, resolution)
+    
     def get_all_stats(self) -> Dict:
         """Get all system statistics"""
         return {
@@ -166,5 +475,8 @@ class SystemMonitor:
             "battery": self.get_battery_info(),
             "temperature": self.get_temperature(),
             "top_processes": self.get_process_info(),
+            "top_processes_memory": self.processes.top_memory,
+            "process_table": self.processes.summary(),
+            "self": self.get_self_info(),
             "timestamp": time.time()
         }
\ No newline at end of file
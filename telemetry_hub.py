@@ -0,0 +1,191 @@
+"""
+Telemetry push hub for OmniMind OS.
+Samples system stats once per tick and fans them out to WebSocket subscribers as deltas.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+MIN_INTERVAL = 0.5   # Fastest rate a client may ask for (seconds)
+MAX_INTERVAL = 60.0
+DEFAULT_INTERVAL = 2.0
+
+
+def clamp_interval(value: Any, default: float = DEFAULT_INTERVAL) -> float:
+    """Parse a client-supplied interval and clamp it to the allowed range"""
+    try:
+        interval = float(value)
+    except (TypeError, ValueError):
+        return default
+    return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+
+def compute_delta(old: Dict[str, Any], new: Dict[str, Any], removed: Optional[List[List[str]]] = None,
+                  path: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """
+    Recursive diff of two snapshots. Nested dicts are diffed key by key,
+    everything else (numbers, lists, strings, None) is replaced whole when
+    changed. Keys missing from `new` are appended to `removed` as key paths
+    (None is a real value, e.g. no battery, so it can't mark a removal).
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+            continue
+        prev = old[key]
+        if isinstance(value, dict) and isinstance(prev, dict):
+            sub = compute_delta(prev, value, removed, path + (key,))
+            if sub:
+                delta[key] = sub
+        elif value != prev:
+            delta[key] = value
+    if removed is not None:
+        removed.extend([*path, key] for key in old if key not in new)
+    return delta
+
+
+class TelemetrySubscriber:
+    """Per-connection state: requested rate and the last snapshot it was sent"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = clamp_interval(interval)
+        self.last_sent: Optional[Dict[str, Any]] = None
+        self.last_seq = 0
+
+    def next_message(self, snapshot: Dict[str, Any], seq: int) -> Optional[Dict[str, Any]]:
+        """Build the message for this subscriber, or None if nothing changed"""
+        if self.last_sent is None:
+            message = {"type": "snapshot", "seq": seq, "data": snapshot}
+        else:
+            removed: List[List[str]] = []
+            delta = compute_delta(self.last_sent, snapshot, removed)
+            if not delta and not removed:
+                self.last_seq = seq
+                return None
+            message = {"type": "delta", "seq": seq, "data": delta}
+            if removed:
+                message["removed"] = removed
+        self.last_sent = snapshot
+        self.last_seq = seq
+        return message
+
+
+class TelemetryHub:
+    """
+    Shared sampler for live telemetry.
+
+    A single background task calls `sample_fn` (in a worker thread, since psutil
+    sampling blocks) at the rate of the fastest subscriber. Every subscriber reads
+    the same snapshot, so the cost per tick is one sampling pass no matter how many
+    dashboards are connected. The task only runs while someone is subscribed.
+    """
+
+    def __init__(self, sample_fn: Callable[[], Dict[str, Any]]):
+        self.sample_fn = sample_fn
+        self.subscribers: Dict[int, TelemetrySubscriber] = {}
+        self.latest: Optional[Dict[str, Any]] = None
+        self.latest_at = 0.0
+        self.seq = 0
+        self._task: Optional[asyncio.Task] = None
+        self._updated: Optional[asyncio.Condition] = None
+        self._sample_lock: Optional[asyncio.Lock] = None
+
+    # Subscription management
+
+    def subscribe(self, interval: float = DEFAULT_INTERVAL) -> TelemetrySubscriber:
+        """Register a subscriber and make sure the sampler is running"""
+        sub = TelemetrySubscriber(interval)
+        self.subscribers[id(sub)] = sub
+        self._ensure_running()
+        return sub
+
+    def unsubscribe(self, sub: TelemetrySubscriber):
+        """Remove a subscriber; the sampler stops itself once nobody is left"""
+        self.subscribers.pop(id(sub), None)
+
+    def tick_interval(self) -> float:
+        """The sampler runs as fast as the fastest subscriber asks for"""
+        if not self.subscribers:
+            return DEFAULT_INTERVAL
+        return min(sub.interval for sub in self.subscribers.values())
+
+    # Sampling
+
+    async def sample(self) -> Dict[str, Any]:
+        """Take one sample now and wake up anyone waiting for it"""
+        self._init_primitives()
+        async with self._sample_lock:
+            return await self._sample_locked()
+
+    async def _sample_locked(self) -> Dict[str, Any]:
+        snapshot = await asyncio.to_thread(self.sample_fn)
+        self.latest = snapshot
+        self.latest_at = time.monotonic()
+        self.seq += 1
+        async with self._updated:
+            self._updated.notify_all()
+        return snapshot
+
+    def _fresh(self, max_age: float) -> bool:
+        return self.latest is not None and time.monotonic() - self.latest_at <= max_age
+
+    async def get_snapshot(self, max_age: float = MIN_INTERVAL) -> Dict[str, Any]:
+        """Return the latest snapshot if it is fresh enough, otherwise sample"""
+        if self._fresh(max_age):
+            return self.latest
+        self._init_primitives()
+        async with self._sample_lock:
+            # Concurrent callers queue here and share the sample the first one took
+            if self._fresh(max_age):
+                return self.latest
+            return await self._sample_locked()
+
+    async def wait_for(self, sub: TelemetrySubscriber) -> Dict[str, Any]:
+        """Wait until a snapshot newer than the one `sub` last saw is available"""
+        self._init_primitives()
+        async with self._updated:
+            await self._updated.wait_for(lambda: self.seq > sub.last_seq and self.latest is not None)
+            return self.latest
+
+    async def stream(self, sub: TelemetrySubscriber, send: Callable[[Dict[str, Any]], Any]):
+        """
+        Push messages to one subscriber at its own rate until `send` raises.
+        Only changed fields are sent after the initial snapshot.
+        """
+        next_due = time.monotonic()
+        while True:
+            snapshot = await self.wait_for(sub)
+            message = sub.next_message(snapshot, self.seq)
+            if message is not None:
+                await send(message)
+            next_due += sub.interval
+            delay = next_due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                next_due = time.monotonic()
+
+    def _init_primitives(self):
+        # Created lazily so they bind to the running event loop
+        if self._updated is None:
+            self._updated = asyncio.Condition()
+            self._sample_lock = asyncio.Lock()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._init_primitives()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while self.subscribers:
+            started = time.monotonic()
+            try:
+                await self.sample()
+            except Exception as e:
+                print(f"Telemetry sampling failed: {e}")
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(0.0, self.tick_interval() - elapsed))
+        self._task = None
@@ -0,0 +1,73 @@
+"""
+Test the AST calculator: limits, functions and ranges
+"""
+
+import pytest
+
+from skills.calculator import CalcError, Calculator, math_expression
+
+numpy = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def calc():
+    return Calculator()
+
+
+def values(result):
+    return [v.item() if hasattr(v, "item") else v for v in result]
+
+
+def test_arithmetic_and_variables(calc):
+    assert calc.evaluate("2+3*4") == 14
+    calc.evaluate("x = 5")
+    assert calc.evaluate("x^2") == 25
+    assert calc.evaluate("ans + 1") == 26
+    assert calc.evaluate("sum(range(1, 11))") == 55
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("1/0", "division by zero"),
+    ("factorial(501)", "result too large"),
+    ("2^5000", "result too large"),
+    ("lcm(2^4000, 2^4000-1)", "result too large"),  # Function results are size-checked too
+    ("round(2.5, 1.5)", "whole number of digits"),
+    ("__import__('os')", None),
+])
+def test_rejected_expressions(calc, expression, error):
+    with pytest.raises(CalcError, match=error):
+        calc.evaluate(expression)
+
+
+def test_round_digits_are_clamped(calc):
+    assert calc.evaluate("round(1, -1000000000)") == 0
+    assert calc.evaluate("round(123.456, 1)") == 123.5
+
+
+def test_range_is_vectorised(calc):
+    assert values(calc.evaluate("x^2 for x in 1..5")) == [1, 4, 9, 16, 25]
+    assert values(calc.evaluate("x/2 for x in 1..4")) == [0.5, 1, 1.5, 2]
+    assert values(calc.evaluate("5 for x in 1..3")) == [5, 5, 5]
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("x^100 for x in 1..3", [1, 2 ** 100, 3 ** 100]),
+    ("x*9223372036854775807 for x in 1..3", [9223372036854775807 * x for x in (1, 2, 3)]),
+    ("2^62+x for x in 1..3", [2 ** 62 + x for x in (1, 2, 3)]),
+    ("(x^100) % 7 for x in 1..4", [x ** 100 % 7 for x in (1, 2, 3, 4)]),
+])
+def test_range_never_wraps_int64(calc, expression, expected):
+    # NumPy int64 overflow wraps silently; these must match the exact scalar results
+    assert values(calc.evaluate(expression)) == expected
+
+
+def test_range_too_large_for_exact_ints(calc):
+    with pytest.raises(CalcError, match="result too large"):
+        calc.evaluate("x^10000 for x in 1..3")
+    with pytest.raises(CalcError, match="result too large"):
+        calc.evaluate("x^30 for x in 1..100000")
+
+
+def test_math_expression_detection():
+    assert math_expression("what is 2 + 2") == "2 + 2"
+    assert math_expression("hello there") is None
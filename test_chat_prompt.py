@@ -0,0 +1,31 @@
+"""
+Test the chat prompt's history window
+"""
+
+from api_server import HISTORY_WINDOW, chat_messages, history_window
+
+
+def exchanges(n, reply_chars=40):
+    return [{"user": f"question {i}", "assistant": "a" * reply_chars} for i in range(n)]
+
+
+def test_window_start_only_moves_every_block():
+    starts = [history_window(exchanges(n))[0]["user"] for n in range(HISTORY_WINDOW, 2 * HISTORY_WINDOW)]
+    assert set(starts) == {"question 0"}
+    assert history_window(exchanges(2 * HISTORY_WINDOW))[0]["user"] == f"question {HISTORY_WINDOW}"
+
+
+def test_window_fits_the_token_budget():
+    history = exchanges(19, reply_chars=2400)  # ~600 tokens per reply
+    window = history_window(history, budget=7000)
+    assert len(window) == 9  # A whole block dropped, so the start stays put for later turns
+    assert history_window(history + exchanges(1, 2400), budget=7000)[0] is window[0]
+    # A single oversized block is trimmed one exchange at a time
+    assert len(history_window(exchanges(5, reply_chars=8000), budget=5000)) == 2
+
+
+def test_system_prompt_is_always_first():
+    messages = chat_messages("likes tea", exchanges(19, reply_chars=2400), "hello", budget=3000)
+    assert messages[0]["role"] == "system" and "likes tea" in messages[0]["content"]
+    assert messages[-1] == {"role": "user", "content": "hello"}
+    assert len(messages) < 2 * 19 + 2
@@ -0,0 +1,91 @@
+"""
+Test ranged and streamed file reads
+"""
+
+import pytest
+
+from skills import file_manager
+from skills.file_manager import manage_files, read_lines, read_range, tail_lines
+from utils import safety_guard
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setattr(safety_guard, "SAFE_BASE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def write_lines(path, count):
+    path.write_text("".join(f"line {i}\n" for i in range(count)), encoding="utf-8")
+    return str(path)
+
+
+def test_read_range_pages_through_file(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"0123456789")
+    first = read_range(str(path), 0, 4)
+    assert (first["content"], first["next_offset"], first["truncated"]) == ("0123", 4, True)
+    last = read_range(str(path), 8, 100)
+    assert (last["content"], last["next_offset"], last["truncated"]) == ("89", None, False)
+    assert read_range(str(path), -5, 2)["content"] == "01"
+
+
+def test_read_range_does_not_split_utf8(tmp_path):
+    path = tmp_path / "u.txt"
+    path.write_bytes("aé".encode("utf-8"))
+    part = read_range(str(path), 0, 2)
+    assert part["content"] == "a"
+    assert part["next_offset"] == 1
+
+
+def test_read_range_uses_mmap_for_large_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_manager, "MMAP_THRESHOLD", 4)
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"abcdefgh")
+    assert read_range(str(path), 2, 3)["content"] == "cde"
+
+
+def test_read_range_sees_a_grown_file(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_bytes(b"abc")
+    assert read_range(str(path))["size"] == 3
+    with open(path, "ab") as f:
+        f.write(b"def")
+    grown = read_range(str(path))
+    assert (grown["size"], grown["content"]) == (6, "abcdef")
+
+
+def test_read_lines_pages(tmp_path):
+    path = write_lines(tmp_path / "l.txt", 5)
+    page = read_lines(path, 1, 2)
+    assert page["lines"] == ["line 1", "line 2"]
+    assert page["next_line"] == 3
+    assert read_lines(path, 3, 10)["next_line"] is None
+
+
+def test_read_lines_rejects_negative_start(home):
+    path = write_lines(home / "l.txt", 3)
+    with pytest.raises(ValueError, match="start_line"):
+        read_lines(path, -1)
+    with pytest.raises(ValueError, match="start_line"):
+        manage_files("read", path, start_line=-2)
+
+
+def test_tail_lines(tmp_path):
+    path = write_lines(tmp_path / "t.txt", 100)
+    assert tail_lines(path, 3)["lines"] == ["line 97", "line 98", "line 99"]
+    assert tail_lines(write_lines(tmp_path / "s.txt", 2), 10)["lines"] == ["line 0", "line 1"]
+
+
+def test_tail_lines_of_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert tail_lines(str(path)) == {"path": str(path), "lines": [], "size": 0}
+
+
+def test_manage_files_stays_inside_base_dir(home, tmp_path_factory):
+    outside = write_lines(tmp_path_factory.mktemp("outside") / "x.txt", 1)
+    with pytest.raises(ValueError, match="outside"):
+        manage_files("read", outside)
+    inside = write_lines(home / "in.txt", 2)
+    assert manage_files("tail", inside, lines=1)["lines"] == ["line 1"]
@@ -0,0 +1,35 @@
+"""
+Test the on-device intent classifier's training labels
+"""
+
+import pytest
+
+from brain.intent_classifier import CHAT_LABEL, label_for_turn
+from skills_manager import skills_manager
+
+
+@pytest.mark.parametrize("turn, label", [
+    ({"user": "play lofi", "assistant": "✓ Play Music: playing", "skill_executed": "play_music"}, "play_music"),
+    ({"user": "latest news", "assistant": "📰 ...", "route": "news", "routed_by": "rules"}, "news"),
+    ({"user": "hello", "assistant": "Hi!"}, CHAT_LABEL),
+    ({"user": "old search", "assistant": "🔍 results"}, "search"),
+])
+def test_keyword_routed_turns_are_labelled(turn, label):
+    assert label_for_turn(turn) == label
+
+
+@pytest.mark.parametrize("turn", [
+    {"user": "lofi please", "assistant": "✓ Play Music: playing", "skill_executed": "play_music",
+     "routed_by": "classifier"},
+    {"user": "whats new", "assistant": "📰 ...", "route": "news", "routed_by": "classifier"},
+    {"user": "play xyz", "assistant": "✗ Play Music: not found", "skill_executed": "play_music"},
+    {"user": "hello", "assistant": "[Error] Failed to reach local Ollama server"},
+])
+def test_guesses_and_failures_are_not_training_data(turn):
+    assert label_for_turn(turn) is None
+
+
+def test_side_effecting_skills_are_flagged():
+    flagged = {sid for sid, skill in skills_manager.available_skills.items() if skill["side_effects"]}
+    assert {"open_application", "system_command", "file_operations"} <= flagged
+    assert "play_music" not in flagged
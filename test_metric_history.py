@@ -0,0 +1,53 @@
+"""
+Test the tiered metric history ring buffers
+"""
+
+from metric_history import MetricStore
+
+
+def test_footprint_stays_in_a_few_kb():
+    store = MetricStore()
+    for t in range(4000):
+        store.record("cpu.percent", t % 100, ts=1_000_000 + t)
+    assert store.memory_bytes() < 8 * 1024
+
+
+def test_tiers_downsample():
+    store = MetricStore()
+    for t in range(180):
+        store.record("cpu", t % 60, ts=6000 + t)
+    minutes = store.query("cpu", 6000, 6179, resolution=60)
+    assert minutes["resolution"] == 60
+    assert minutes["points"][0] == {"t": 6000, "min": 0, "avg": 29.5, "max": 59}
+    seconds = store.query("cpu", 6170, 6179)
+    assert seconds["resolution"] == 1
+    assert [p["avg"] for p in seconds["points"]] == list(range(50, 60))
+
+
+def test_gaps_leave_no_points_and_keep_bucket_times():
+    store = MetricStore()
+    store.record("cpu", 1.0, ts=100)
+    store.record("cpu", 2.0, ts=105)
+    store.record("cpu", 3.0, ts=106)
+    points = store.query("cpu", 100, 106)["points"]
+    assert [(p["t"], p["avg"]) for p in points] == [(100, 1.0), (105, 2.0), (106, 3.0)]
+    assert store.recent("cpu") == [1.0, 2.0, 3.0]
+
+
+def test_long_gap_resets_the_ring():
+    store = MetricStore([(1, 10)])
+    store.record("cpu", 1.0, ts=100)
+    store.record("cpu", 2.0, ts=101)
+    store.record("cpu", 3.0, ts=500)
+    store.record("cpu", 4.0, ts=501)
+    assert store.recent("cpu") == [3.0, 4.0]
+    assert [p["t"] for p in store.query("cpu", 0, 600)["points"]] == [500, 501]
+
+
+def test_query_falls_back_to_coarser_tier_once_fine_tier_wraps():
+    store = MetricStore()
+    for t in range(0, 900):
+        store.record("cpu", 50.0, ts=60_000 + t)
+    result = store.query("cpu", 60_000, 60_899)
+    assert result["resolution"] == 60
+    assert result["points"][0]["t"] == 60_000
@@ -0,0 +1,43 @@
+"""
+Test skill detection from chat messages
+"""
+
+import pytest
+
+from skills_manager import skills_manager
+
+
+@pytest.mark.parametrize("query", [
+    "read file notes.txt",
+    "create file todo.md",
+    "write a file report.docx",
+    "delete old.log",
+    "read file example.com",
+])
+def test_file_names_go_to_file_operations(query):
+    assert skills_manager.detect_skill(query) == "file_operations"
+
+
+@pytest.mark.parametrize("query", [
+    "open github.com",
+    "open https://example.org/x",
+    "go to www.python.org",
+    "visit wikipedia.org",
+    "open youtube.com/watch?v=1",
+    "visit mail.google.com",
+])
+def test_urls_go_to_open_website(query):
+    assert skills_manager.detect_skill(query) == "open_website"
+
+
+@pytest.mark.parametrize("query", ["email me at bob@example.com", "open backup.com.txt"])
+def test_non_urls_are_not_matched_as_urls(query):
+    assert all("." not in term for c in skills_manager.matcher.rank(query) for term in c["matched"])
+
+
+def test_find_in_my_files_is_a_file_search():
+    assert skills_manager.detect_skill("find tax invoice in my documents") == "search_files"
+
+
+def test_open_application():
+    assert skills_manager.detect_skill("open notepad") == "open_application"
@@ -0,0 +1,32 @@
+"""
+Test skill executor outcome counting
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from skill_executor import SkillExecutor, SkillTimeout
+
+
+def fail():
+    raise RuntimeError("boom")
+
+
+def test_each_outcome_is_counted_once():
+    executor = SkillExecutor(max_workers=2)
+
+    async def main():
+        await executor.run("s", lambda: "ok")
+        with pytest.raises(RuntimeError):
+            await executor.run("s", fail)
+        with pytest.raises(SkillTimeout):
+            await executor.run("s", time.sleep, 0.3, timeout=0.05)
+
+    asyncio.run(main())
+    stat = executor.stats()["s"]
+    assert (stat["calls"], stat["succeeded"], stat["failed"], stat["timed_out"]) == (3, 1, 1, 1)
+    assert stat["in_flight"] == 0
+    assert stat["last_error"].startswith("SkillTimeout")
+    executor.pool.shutdown(wait=True)
@@ -0,0 +1,33 @@
+"""
+Test the lazy skill registry
+"""
+
+import sys
+import threading
+import time
+
+from skills.registry import SkillRegistry
+
+
+def test_half_imported_module_is_not_returned(tmp_path, monkeypatch):
+    (tmp_path / "slow_skill.py").write_text(
+        "import time\ntime.sleep(0.3)\ndef run():\n    return 'done'\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "slow_skill", raising=False)
+    registry = SkillRegistry(str(tmp_path / "manifest.json"))
+
+    results = []
+
+    def call():
+        try:
+            results.append(registry.lazy("slow_skill:run")())
+        except Exception as e:
+            results.append(repr(e))
+
+    first = threading.Thread(target=call)
+    first.start()
+    time.sleep(0.1)  # First import is now running the module body
+    call()
+    first.join(2)
+    assert results == ["done", "done"]
+    assert registry.import_stats()["slow_skill"]["ok"]
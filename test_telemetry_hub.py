@@ -0,0 +1,45 @@
+"""
+Test telemetry deltas and the shared sampler
+"""
+
+import asyncio
+import time
+
+from telemetry_hub import TelemetryHub, TelemetrySubscriber, compute_delta
+
+
+def test_delta_reports_only_changes():
+    old = {"cpu": {"usage": 10, "cores": 8}, "battery": {"percent": 50}}
+    new = {"cpu": {"usage": 12, "cores": 8}, "battery": {"percent": 50}}
+    assert compute_delta(old, new) == {"cpu": {"usage": 12}}
+
+
+def test_null_values_are_not_removals():
+    sub = TelemetrySubscriber()
+    sub.next_message({"wifi_signal": 70, "battery": {"percent": 50}, "gpu": 1}, 1)
+    message = sub.next_message({"wifi_signal": None, "battery": {}}, 2)
+    assert message["data"] == {"wifi_signal": None}
+    assert sorted(message["removed"]) == [["battery", "percent"], ["gpu"]]
+
+
+def test_unchanged_snapshot_sends_nothing():
+    sub = TelemetrySubscriber()
+    assert sub.next_message({"a": 1}, 1)["type"] == "snapshot"
+    assert sub.next_message({"a": 1}, 2) is None
+
+
+def test_concurrent_stale_reads_share_one_sample():
+    calls = []
+
+    def sample():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"n": len(calls)}
+
+    async def main():
+        hub = TelemetryHub(sample)
+        return await asyncio.gather(*(hub.get_snapshot() for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r == {"n": 1} for r in results)
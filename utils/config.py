@@ -2,7 +2,8 @@ import json
 import os
 from typing import Any, Dict
 
-CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
+# OMNIMIND_CONFIG points at an alternative file (the benchmark harness uses a temporary one)
+CONFIG_PATH = os.environ.get('OMNIMIND_CONFIG') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
 
 _cached: Dict[str, Any] = {}
 
@@ -0,0 +1,249 @@
+"""
+Process-wide counters, gauges and histograms.
+
+`render_prometheus()` writes everything in the Prometheus text exposition
+format (served at /metrics); `snapshot()` is the JSON view with quantiles.
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# Seconds, from a fast cached reply to a cold 7B load
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 200, 500, 1000, 5000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+SampleValue = Union[float, List[Tuple[Dict[str, Any], float]]]
+
+
+class Counter:
+    """
+    Monotonic count per label set. Either inc() it, or give it a callback
+    returning a number or [(labels, value), ...] that is read at scrape time
+    (for subsystems that already keep their own counts).
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "", fn: Optional[Callable[[], SampleValue]] = None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        if self.fn is not None:
+            try:
+                value = self.fn()
+            except Exception:
+                return []  # A failing collector must not break the whole scrape
+            if isinstance(value, (int, float)):
+                return [((), float(value))]
+            return [(_label_key(labels), float(v)) for labels, v in value]
+        with self._lock:
+            return list(self._values.items())
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [{"labels": dict(key), "value": value} for key, value in self.samples()]
+
+
+class Gauge(Counter):
+    """Current value per label set; like Counter but it may go down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set; quantiles are interpolated within buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)  # Bucket upper bounds are inclusive
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self) -> List[Tuple[LabelKey, Dict[str, Any]]]:
+        with self._lock:
+            return [(key, {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]})
+                    for key, s in self._series.items()]
+
+    def quantile(self, q: float, counts: Sequence[int]) -> Optional[float]:
+        total = sum(counts)
+        if not total:
+            return None
+        target = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= target:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i >= len(self.buckets):
+                    return self.buckets[-1]  # Overflow bucket has no upper bound
+                return lower + (self.buckets[i] - lower) * (target - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        result = []
+        for key, s in self.samples():
+            result.append({
+                "labels": dict(key),
+                "count": s["count"],
+                "sum": round(s["sum"], 4),
+                "mean": round(s["sum"] / s["count"], 4) if s["count"] else None,
+                "p50": self._round(self.quantile(0.5, s["counts"])),
+                "p95": self._round(self.quantile(0.95, s["counts"])),
+                "p99": self._round(self.quantile(0.99, s["counts"])),
+            })
+        return result
+
+    @staticmethod
+    def _round(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value, 4)
+
+
+class MetricsRegistry:
+    """Named counters, gauges and histograms shared across the process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "", fn: Optional[Callable[[], SampleValue]] = None) -> Counter:
+        counter = self._get(Counter, name, help)
+        if fn is not None:
+            counter.fn = fn
+        return counter
+
+    def histogram(self, name: str, help: str = "", buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def gauge(self, name: str, help: str = "", fn: Optional[Callable[[], SampleValue]] = None) -> Gauge:
+        gauge = self._get(Gauge, name, help)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def all(self) -> List[Any]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Any]:
+        return {
+            m.name: {"type": m.kind, "help": m.help, "series": m.snapshot()}
+            for m in self.all() if m.name.startswith(prefix)
+        }
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)"""
+        lines: List[str] = []
+        for m in sorted(self.all(), key=lambda m: m.name):
+            lines.append(f"# HELP {m.name} {_escape_help(m.help)}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            if m.kind == "histogram":
+                for key, s in m.samples():
+                    cumulative = 0
+                    for bound, n in zip(m.buckets, s["counts"]):
+                        cumulative += n
+                        lines.append(f"{m.name}_bucket{_labels(key, le=_number(bound))} {cumulative}")
+                    lines.append(f"{m.name}_bucket{_labels(key, le='+Inf')} {s['count']}")
+                    lines.append(f"{m.name}_sum{_labels(key)} {_number(s['sum'])}")
+                    lines.append(f"{m.name}_count{_labels(key)} {s['count']}")
+            else:
+                for key, value in m.samples():
+                    lines.append(f"{m.name}{_labels(key)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_value(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: LabelKey, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_value(str(v))}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+@contextmanager
+def track(histogram: Histogram, counter: Optional[Counter] = None, **labels) -> Iterator[Dict[str, str]]:
+    """
+    Time a block into `histogram` and count it in `counter` with an outcome
+    label ("ok", or "error" if it raised). The block may set
+    `outcome["outcome"]` itself, e.g. to "empty".
+    """
+    outcome = {"outcome": "ok"}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        outcome["outcome"] = "error"
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+        if counter is not None:
+            counter.inc(outcome=outcome["outcome"], **labels)
+
+
+# Global instance
+metrics = MetricsRegistry()
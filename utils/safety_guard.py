@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Optional
 
 # Simple denylist of dangerous command tokens; expand as needed
 DANGEROUS_TOKENS: List[str] = [
@@ -12,9 +12,14 @@ DANGEROUS_TOKENS: List[str] = [
 SAFE_BASE_DIR = os.path.expanduser('~')
 
 
-def is_safe_command(text: str) -> bool:
-    lower = (text or '').lower()
-    return not any(tok in lower for tok in DANGEROUS_TOKENS)
+def is_safe_command(text: str, skill: Optional[str] = None) -> bool:
+    """
+    True if no safety policy rule denies the text (for `skill`, if given).
+    Rules are word-boundary tokens and regexes, see utils/safety_policy.py;
+    DANGEROUS_TOKENS is the built-in rule set when no policy file exists.
+    """
+    from utils.safety_policy import safety_policy
+    return safety_policy.is_allowed(text, skill)
 
 
 def normalize_safe_path(path: str) -> str:
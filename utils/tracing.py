@@ -0,0 +1,210 @@
+"""
+Lightweight per-request tracing.
+
+A trace is a tree of timed spans. The current span lives in a contextvar, so
+`span()` nests correctly across awaits and asyncio tasks; work handed to a
+thread pool keeps its parent if the callable is wrapped with `bind()` (the
+skill executor and the search fan-out do this). Outside a trace, `span()`
+costs one contextvar lookup and records nothing.
+
+Finished traces are kept in a ring buffer of the last TRACE_BUFFER traces,
+mirrored to a JSON-lines file (config.json "trace_file", default
+memory/traces.jsonl) for offline analysis. Which traces are kept is decided
+when they finish: a "trace_sample_rate" fraction of them (default 0.1), every
+trace slower than "trace_slow_ms" (default 2000) or that failed (raised, or
+set status="error" on its root span), and every trace a caller asked to see
+(/api/chat?debug=timing).
+"""
+
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from utils.config import get as config_get
+
+
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'memory', 'traces.jsonl')
+TRACE_BUFFER = 200          # Traces kept in memory and in the file
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_SLOW_MS = 2000.0
+
+
+class Span:
+    """One timed stage; children are the stages it ran"""
+
+    __slots__ = ("name", "attrs", "start", "end", "error", "children", "_lock")
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attrs: Dict[str, Any] = dict(attrs or {})
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+        self._lock = threading.Lock()  # Children may finish on pool threads
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def child(self, name: str, attrs: Optional[Dict[str, Any]] = None) -> "Span":
+        span = Span(name, attrs)
+        with self._lock:
+            self.children.append(span)
+        return span
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """Offsets and durations in ms, relative to the root span's start"""
+        origin = self.start if origin is None else origin
+        with self._lock:
+            children = list(self.children)
+        result: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration_ms, 2),
+        }
+        if self.attrs:
+            result["attrs"] = self.attrs
+        if self.error:
+            result["error"] = self.error
+        if children:
+            result["children"] = [c.to_dict(origin) for c in sorted(children, key=lambda c: c.start)]
+        return result
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def annotate(**attrs):
+    """Add attributes to the innermost open span, if any"""
+    span = _current.get()
+    if span is not None:
+        span.set(**attrs)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """Time a stage as a child of the current span; a no-op outside a trace"""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current.reset(token)
+
+
+def bind(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    `fn` bound to the caller's context, for executor.submit() and threads,
+    which would otherwise start without the current span.
+    """
+    if _current.get() is None:
+        return fn
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+class Tracer:
+    """Starts root spans and keeps a sample of finished traces"""
+
+    def __init__(self, path: Optional[str] = None, capacity: int = TRACE_BUFFER):
+        self.path = path or config_get('trace_file') or DEFAULT_TRACE_FILE
+        self.capacity = capacity
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._written: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._appended = 0  # Lines appended since the file was last compacted
+        self._lock = threading.Lock()
+        # File writes happen off the request path, one at a time
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-writer")
+        self.started = 0
+        self.kept = 0
+
+    def sample_rate(self) -> float:
+        value = config_get('trace_sample_rate')
+        return DEFAULT_SAMPLE_RATE if value is None else float(value)
+
+    def slow_ms(self) -> float:
+        value = config_get('trace_slow_ms')
+        return DEFAULT_SLOW_MS if value is None else float(value)
+
+    @contextmanager
+    def trace(self, name: str, keep: bool = False, **attrs) -> Iterator[Span]:
+        """Root span for one request; `keep` forces it into the buffer"""
+        root = Span(name, attrs)
+        token = _current.set(root)
+        with self._lock:
+            self.started += 1
+        try:
+            yield root
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            root.end = time.perf_counter()
+            _current.reset(token)
+            # Handlers that catch their own errors report them as status="error"
+            failed = root.error or root.attrs.get("status") == "error"
+            if keep or failed or root.duration_ms >= self.slow_ms() or random.random() < self.sample_rate():
+                self.keep(root)
+
+    def keep(self, root: Span):
+        record = {"trace_id": uuid.uuid4().hex[:16], "timestamp": time.time(), **root.to_dict()}
+        with self._lock:
+            self._recent.append(record)
+            self.kept += 1
+        self._writer.submit(self._write, record)
+
+    def _write(self, record: Dict[str, Any]):
+        # Runs on the single writer thread, which alone touches _written and _appended
+        self._written.append(record)
+        self._appended += 1
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if self._appended >= self.capacity:
+                # Rewrite with just the last `capacity` traces so the file stays bounded
+                self._appended = 0
+                tmp = f"{self.path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in self._written)
+                os.replace(tmp, self.path)
+            else:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"Could not write trace: {e}")
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"started": self.started, "kept": self.kept, "buffered": len(self._recent),
+                    "sample_rate": self.sample_rate(), "slow_ms": self.slow_ms(), "file": self.path}
+
+
+# Global instance
+tracer = Tracer()